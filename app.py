@@ -4,34 +4,25 @@ from pathlib import Path
 # ensure repository root is on sys.path so local packages like `models` and `utils` can be imported
 sys.path.insert(0, str(Path(__file__).resolve().parent))
 
+from utils.startup import mark as mark_startup
+
 import streamlit as st
-# try import from the local package — support both `model` and `models` directories
-try:
-    from model.predict import Predictor
-except Exception:
-    try:
-        from model.predict import Predictor
-    except Exception:
-        # fallback: load Predictor directly from an expected file path
-        import importlib.util
-        base = Path(__file__).resolve().parent
-        candidate = None
-        for sub in ('model', 'models'):
-            p = base / sub / 'predict.py'
-            if p.exists():
-                candidate = p
-                break
-        if candidate is None:
-            raise ImportError('Could not find predict.py in model/ or models/ folders')
-        spec = importlib.util.spec_from_file_location('predictor_module', str(candidate))
-        mod = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(mod)
-        Predictor = mod.Predictor
-from extract.pdf_extract import extract_text_from_pdf
-from extract.image_extract import extract_text_from_image
+# Only lightweight modules are imported up front. pdfplumber / pytesseract / PIL are
+# imported when a resume is first extracted, and joblib / scikit-learn when the model is
+# first needed, so sessions that never upload anything start fast.
+from model.registry import artifacts_present, find_artifacts_dir, get_predictor, peek_predictor
+from extract.cache import content_key, get_extraction_cache
 from utils.clean import clean_text
 from utils.suggestions import generate_suggestions, generate_deep_suggestions
+from utils.jobs import QueueFull, get_scheduler
+from utils.metrics import begin_trace, end_trace, flush_file, inc
 import io
+import math
+import os
+import threading
+import time
+
+mark_startup('app_imports')
 
 st.set_page_config(page_title='ATS Resume Analyzer', layout='wide')
 st.title('ATS Resume Analyzer')
@@ -42,71 +33,77 @@ upload_model = st.sidebar.file_uploader('(Optional) Upload trained artifacts zip
 # Always render the Extract & Predict button (so it appears in the deployed app UI). We
 # capture the click into `extract_button` and use it below only when a file is uploaded.
 extract_button = st.sidebar.button('Extract & Predict')
+# Stop reading a long PDF once this many cleaned tokens have arrived (0 = read every page)
+stop_tokens = st.sidebar.number_input('Stop PDF extraction after N tokens (0 = all pages)', min_value=0, value=0, step=50)
 run_button = st.sidebar.button('Load model / Predict')
 
 # Auto-detect artifacts directory on startup so model is always available when the app runs.
+# Both the directory search and the loaded Predictor are shared process-wide, so reruns and
+# other sessions reuse them; the Predictor is reloaded only when the artifact files change.
 base = Path(__file__).resolve().parent
-candidate_dirs = [
-    base / 'artifacts',
-    base / 'model' / 'artifacts',
-    base / 'models' / 'artifacts',
-]
-detected = None
-for d in candidate_dirs:
-    if d.exists():
-        detected = d
-        break
-
-if detected is None:
-    # also check for artifacts inside a nested package (common when running from different cwd)
-    possible = list(base.rglob('artifacts'))
-    if possible:
-        detected = possible[0]
-
-if detected is None:
-    artifacts_dir = str(base / 'artifacts')
-else:
-    artifacts_dir = str(detected)
-
-predictor = Predictor(artifacts_dir=artifacts_dir)
+artifacts_dir = find_artifacts_dir(str(base))
+
+# the model itself is loaded on first prediction (or reload); until then only its files are checked
+predictor = peek_predictor(artifacts_dir)
 
 # Sidebar status + reload control
 with st.sidebar.expander('Model status', expanded=True):
     st.write(f'Artifacts path: `{artifacts_dir}`')
-    if predictor.ready:
+    if predictor is not None and predictor.ready:
         st.success('Model loaded and ready')
+    elif predictor is None and artifacts_present(artifacts_dir):
+        st.info('Model artifacts found — the model loads on first prediction')
     else:
         st.warning('No artifacts found at path — model not ready')
     if st.button('Reload model'):
-        predictor = Predictor(artifacts_dir=artifacts_dir)
+        predictor = get_predictor(artifacts_dir, force=True)
         if predictor.ready:
             st.success('Model reloaded successfully')
         else:
             st.error('Reload failed — no artifacts found or load error')
+    if (Path(artifacts_dir) / 'history.json').exists():
+        from model.store import ArtifactError, get_store
+        store = get_store(artifacts_dir)
+        st.write(f"Active version: `{store.current() or 'loose files'}`")
+        if st.button('Roll back model'):
+            try:
+                st.success(f"Rolled back to `{store.rollback() or 'loose files'}`")
+                predictor = peek_predictor(artifacts_dir)
+            except ArtifactError as e:
+                st.error(f'Rollback failed: {e}')
 
 if upload_model is not None:
-    st.sidebar.info('You uploaded an artifacts zip — extracting to artifacts folder')
-    import zipfile, tempfile, shutil
-    tmp = tempfile.NamedTemporaryFile(delete=False)
-    tmp.write(upload_model.read())
-    tmp.flush()
-    with zipfile.ZipFile(tmp.name, 'r') as z:
-        # extract into the detected artifacts dir (or default)
-        target = Path(artifacts_dir)
-        target.mkdir(parents=True, exist_ok=True)
-        z.extractall(str(target))
-    st.sidebar.success(f'Artifacts extracted to `{artifacts_dir}`.')
-    # reload predictor to pick up newly extracted files
-    predictor = Predictor(artifacts_dir=artifacts_dir)
-    if predictor.ready:
-        st.sidebar.success('Model loaded and ready')
+    from model.store import ArtifactError, get_store
+    store = get_store(artifacts_dir)
+    # the uploader keeps its file across reruns; stage each upload only once
+    upload_id = getattr(upload_model, 'file_id', None) or (upload_model.name, upload_model.size)
+    staged = st.session_state.setdefault('staged_artifacts', {})
+    if upload_id not in staged:
+        try:
+            # validated and streamed into a new version dir; the live files are never touched
+            version = store.stage(upload_model)
+            staged[upload_id] = (version, store.activate_async(version), None)
+        except ArtifactError as e:
+            staged[upload_id] = (None, None, str(e))
+    version, activation, error = staged[upload_id]
+    if error is not None:
+        st.sidebar.error(f'Artifacts zip rejected: {error}')
+    elif not activation.done():
+        st.sidebar.info(f'Loading version `{version}` in the background — predictions keep using '
+                        'the current model until it passes its smoke test.')
+    elif activation.exception() is not None:
+        st.sidebar.error(f'Version `{version}` was not activated: {activation.exception()}')
     else:
-        st.sidebar.error('Artifacts extracted but model failed to load; check files.')
+        st.sidebar.success(f'Version `{version}` is live.')
+        predictor = peek_predictor(artifacts_dir)
 
 if uploaded_file is None:
     st.sidebar.info('Upload a resume file to enable the Extract & Predict action.')
 
 if uploaded_file is not None and extract_button:
+    from extract.pdf_extract import collect_pdf_pages, PdfExtraction
+    from extract.image_extract import ocr_image
+    from extract.detect import sniff_kind
     # extract text
     text = ''
     # Read raw bytes once — mobile browsers sometimes omit or set incorrect MIME types,
@@ -121,111 +118,241 @@ if uploaded_file is not None and extract_button:
     import binascii
     buf = _io.BytesIO(raw)
 
-    # Debug info for troubleshooting mobile uploads (also write a small server-side log)
+    # Debug info for troubleshooting mobile uploads; timings and counters go to the
+    # metrics registry (ATS_METRICS*), nothing about the file is written to disk
     try:
         meta = f"Uploaded: {getattr(uploaded_file, 'name', '<unknown>')} | type: {getattr(uploaded_file, 'type', '<none>')} | size: {len(raw)} bytes"
         st.sidebar.write(meta)
         st.sidebar.write('First bytes: ' + binascii.hexlify(raw[:16]).decode(errors='ignore'))
-        # append to debug log
-        try:
-            logp = Path(__file__).resolve().parent / 'tmp'
-            logp.mkdir(exist_ok=True)
-            with open(logp / 'upload_debug.log', 'a', encoding='utf-8') as lf:
-                lf.write(meta + '\n')
-                lf.write('first_bytes:' + binascii.hexlify(raw[:32]).decode() + '\n')
-        except Exception:
-            pass
     except Exception:
         pass
 
-    # Detect pdf by magic bytes, filename, or MIME type
-    is_pdf = False
-    if (len(raw) >= 4 and raw[:4] == b'%PDF') or (hasattr(uploaded_file, 'type') and getattr(uploaded_file, 'type') == 'application/pdf') or (hasattr(uploaded_file, 'name') and getattr(uploaded_file, 'name').lower().endswith('.pdf')):
-        is_pdf = True
+    scheduler = get_scheduler()
+    queue_slot = st.empty()
 
-    # Detect common image formats
-    img_format = None
-    img_format = None
-    if imghdr is not None:
-        try:
-            img_format = imghdr.what(None, h=raw)
-        except Exception:
-            img_format = None
+    def follow_job(job, pages=None, on_pages=None, stop=None):
+        """Wait for a scheduler job, showing its queue position while it waits and
+        handing newly arrived PDF pages to `on_pages` while it runs.
 
-    # Detect HEIC/HEIF by ftyp box
-    heic = False
-    try:
-        if b'ftypheic' in raw[:64] or b'ftypheix' in raw[:64] or b'ftyphevc' in raw[:64] or b'ftypmif1' in raw[:64]:
-            heic = True
-    except Exception:
-        heic = False
+        Raises TimeoutError once the job has run longer than its budget. The `stop` event
+        is set then so a PDF job ends after its current page; OCR is given the same budget
+        (`ocr_timeout`), so tesseract is killed and the worker slot freed soon after."""
+        seen = 0
+        while True:
+            finished = job.done()
+            if not finished and job.timed_out():
+                if stop is not None:
+                    stop.set()
+                queue_slot.empty()
+                inc('failures', stage='job_timeout')
+                raise TimeoutError(f'extraction took longer than {job.timeout:g}s')
+            if job.status == 'queued':
+                queue_slot.info(f'Queued for {job.lane} extraction, position {job.position()}...')
+            else:
+                queue_slot.empty()
+                if pages is not None and len(pages) > seen:
+                    seen = len(pages)
+                    on_pages(list(pages[:seen]))
+            if finished:
+                break
+            time.sleep(0.2)
+        queue_slot.empty()
+        return job.result()
 
-    # If mobile returned HEIC, try to convert if pillow_heif is available
-    if heic:
-        try:
-            import pillow_heif
-            pillow_heif.register_heif_opener()
-            buf.seek(0)
-            from PIL import Image
-            img = Image.open(buf).convert('RGB')
-            out = _io.BytesIO()
-            img.save(out, format='JPEG')
-            raw = out.getvalue()
-            buf = _io.BytesIO(raw)
-            img_format = 'jpeg'
-            st.sidebar.info('HEIC image converted to JPEG on server (pillow_heif available).')
-        except Exception:
-            st.sidebar.warning('HEIC image detected. If extraction fails, convert the image to JPG/PNG on your phone before uploading.')
-
-    # If file size looks very large, warn the user (common on mobile photos)
-    if len(raw) > 10 * 1024 * 1024:
-        st.sidebar.warning('Uploaded file is large (>10MB). Mobile uploads can fail if the host blocks large files. Consider compressing.')
-
-    # Extraction
-    if is_pdf:
-        try:
-            buf.seek(0)
-            text = extract_text_from_pdf(buf)
-        except Exception as e:
+    # Content-addressed cache: a repeat upload of the same bytes skips HEIC conversion,
+    # pdfplumber and OCR entirely.
+    extraction_cache = get_extraction_cache()
+    upload_key = content_key(raw)
+    # one trace per upload, keyed by content hash rather than the file name
+    trace_token = begin_trace(source='app', upload=upload_key[:16], bytes=len(raw))
+    cached_text = extraction_cache.get(upload_key)
+    extract_failed = False
+    incomplete = False  # text is not the whole document (stopped early or OCR budget spent)
+    st.subheader('Extracted text')
+    text_slot = st.empty()
+    if cached_text is not None:
+        text = cached_text
+        st.sidebar.info('Extracted text served from cache (identical file seen before).')
+    else:
+        # Detect pdf by magic bytes, filename, or MIME type (and HEIC by its ftyp box)
+        kind = sniff_kind(raw, getattr(uploaded_file, 'name', None), getattr(uploaded_file, 'type', None))
+        is_pdf = kind == 'pdf'
+        inc('bytes_processed', len(raw))
+
+        # Detect common image formats
+        img_format = None
+        img_format = None
+        if imghdr is not None:
+            try:
+                img_format = imghdr.what(None, h=raw)
+            except Exception:
+                img_format = None
+
+        heic = kind == 'heic'
+
+        # If mobile returned HEIC, check pillow_heif is available; the image pipeline decodes
+        # it and shrinks it straight away instead of re-encoding a full-size JPEG first
+        if heic:
+            try:
+                import pillow_heif
+                img_format = 'heic'
+                st.sidebar.info('HEIC image detected; decoding on server (pillow_heif available).')
+            except Exception:
+                st.sidebar.warning('HEIC image detected. If extraction fails, convert the image to JPG/PNG on your phone before uploading.')
+
+        # If file size looks very large, warn the user (common on mobile photos)
+        if len(raw) > 10 * 1024 * 1024:
+            st.sidebar.warning('Uploaded file is large (>10MB). Mobile uploads can fail if the host blocks large files. Consider compressing.')
+
+        # Extraction runs on the shared job scheduler rather than in this script thread:
+        # text-layer work goes to the 'light' lane and anything that needs tesseract to the
+        # capped 'ocr' lane, so one large scan cannot stall every other session.
+        if is_pdf:
             try:
-                text = extract_text_from_pdf(_io.BytesIO(raw))
-            except Exception as e2:
-                st.error('Failed to extract text from PDF: ' + str(e2))
+                progress = st.progress(0.0, text='Extracting PDF pages...')
+                stop_event = threading.Event()
+                render_count = [0]
+
+                def show_pages(pages):
+                    partial = PdfExtraction(pages).text
+                    total = pages[-1].total
+                    progress.progress(len(pages) / total, text=f'Extracted page {len(pages)} of {total}')
+                    render_count[0] += 1
+                    text_slot.text_area('Resume text', value=partial, height=300, key=f'resume_text_{render_count[0]}')
+                    if stop_tokens and len(pages) < total and not stop_event.is_set() and len(clean_text(partial).split()) >= stop_tokens:
+                        # enough text for a confident prediction; skip (and cancel OCR for) the rest
+                        stop_event.set()
+                        st.sidebar.info(f'Stopped after {len(pages)} of {total} pages ({stop_tokens}+ tokens).')
+
+                # pass 1: text layer only, cheap
+                pages = []
+                job = scheduler.submit(collect_pdf_pages, raw, pages, stop_event, ocr=False, lane='light')
+                follow_job(job, pages, show_pages, stop_event)
+                # pass 2: only if some page has no usable text layer, OCR just those pages on
+                # the ocr lane; the text layers read in pass 1 are reused, not parsed again
+                if not stop_event.is_set() and any(p.needs_ocr for p in pages):
+                    text_pages, pages = pages, []
+                    job = scheduler.submit(collect_pdf_pages, raw, pages, stop_event, ocr=True,
+                                           ocr_timeout=scheduler.default_timeout, text_pages=text_pages,
+                                           lane='ocr')
+                    follow_job(job, pages, show_pages, stop_event)
+                extraction = PdfExtraction(pages)
+                text = extraction.text
+                incomplete = stop_event.is_set() or not extraction.complete
+                progress.empty()
+                with st.sidebar.expander('PDF pages'):
+                    st.table(extraction.report())
+            except QueueFull:
+                st.error('The server is busy extracting other resumes. Please try again in a minute.')
+                inc('queue_full')
                 text = ''
-    else:
-        # If imghdr couldn't detect format but filename indicates image, still try
-        if img_format is None and (hasattr(uploaded_file, 'name') and getattr(uploaded_file, 'name').lower().endswith(('.png', '.jpg', '.jpeg'))):
-            img_format = 'jpeg'
-        if img_format is None and not heic:
-            st.sidebar.info('Uploaded file does not look like a standard image (imghdr unknown). We will still try image OCR.')
-        try:
-            buf.seek(0)
-            text = extract_text_from_image(buf)
-        except Exception as e:
+                extract_failed = True
+            except TimeoutError as e:
+                st.error(f'PDF extraction was stopped: {e}. Try a smaller file or paste the text instead.')
+                text = ''
+                extract_failed = True
+            except Exception as e:
+                st.error('Failed to extract text from PDF: ' + str(e))
+                inc('failures', stage='extract_pdf')
+                text = ''
+                extract_failed = True
+        else:
+            # If imghdr couldn't detect format but filename indicates image, still try
+            if img_format is None and (hasattr(uploaded_file, 'name') and getattr(uploaded_file, 'name').lower().endswith(('.png', '.jpg', '.jpeg'))):
+                img_format = 'jpeg'
+            if img_format is None and not heic:
+                st.sidebar.info('Uploaded file does not look like a standard image (imghdr unknown). We will still try image OCR.')
             try:
-                text = extract_text_from_image(_io.BytesIO(raw))
-            except Exception as e2:
-                st.error('Failed to extract text from image: ' + str(e2))
+                buf.seek(0)
+                with st.spinner('Running OCR on the image...'):
+                    # downscale / grayscale / crop / binarize before tesseract
+                    text, prep_report = follow_job(scheduler.submit(ocr_image, buf, ocr_timeout=scheduler.default_timeout,
+                                                                    lane='ocr'))
+                with st.sidebar.expander('Image preprocessing'):
+                    st.table(prep_report)
+            except QueueFull:
+                st.error('The server is busy extracting other resumes. Please try again in a minute.')
+                inc('queue_full')
+                text = ''
+                extract_failed = True
+            except TimeoutError as e:
+                st.error(f'Image OCR was stopped: {e}. Try a smaller photo or paste the text instead.')
+                text = ''
+                extract_failed = True
+            except Exception as e:
+                st.error('Failed to extract text from image: ' + str(e))
+                inc('failures', stage='extract_image')
                 text = ''
+                extract_failed = True
+        if not extract_failed and not incomplete:
+            extraction_cache.put(upload_key, text)
+    cache_stats = extraction_cache.stats()
+    st.sidebar.caption(f"Extraction cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses")
 
     # Provide a paste-text fallback for mobile users
     if not text.strip():
         pasted = st.sidebar.text_area('Or paste resume text here (mobile fallback)', value='')
         if pasted and not text:
             text = pasted
-    st.subheader('Extracted text')
-    st.text_area('Resume text', value=text, height=300)
+    text_slot.text_area('Resume text', value=text, height=300)
 
     # clean + predict
     cleaned = clean_text(text)
+    predictor = get_predictor(artifacts_dir)
     if not predictor.ready:
         st.warning('No trained model artifacts found. Train model or upload artifacts.zip in the sidebar.')
     else:
-        pred, score = predictor.predict_text(cleaned)
+        # concurrent sessions' predictions are coalesced into one model call
+        from model.batcher import get_batcher
+        # the explanation comes from the same feature row as the prediction
+        try:
+            pred, score, explanation = get_batcher(predictor).predict(cleaned, explain_k=8)
+        except RuntimeError:
+            # the batcher was closed under us (e.g. mid model swap): score directly
+            inc('failures', stage='batcher')
+            labels, scores, explanations = predictor.predict_batch([cleaned], explain_k=8)
+            pred, score, explanation = labels[0], float(scores[0]), explanations[0]
+            score = None if math.isnan(score) else score
         st.subheader('Prediction')
         st.write(f'Match prediction: **{pred}**')
         if score is not None:
             st.write(f'Confidence / score: **{score:.3f}**')
+        # why: the terms pulling the score toward / away from this prediction
+        if explanation is not None and (explanation.positive or explanation.negative):
+            with st.expander('Why this prediction?'):
+                col_pos, col_neg = st.columns(2)
+                col_pos.caption(f'Terms supporting "{pred}"')
+                col_pos.table([{'term': t, 'weight': round(w, 3)} for t, w in explanation.positive])
+                col_neg.caption('Terms working against it')
+                if explanation.negative:
+                    col_neg.table([{'term': t, 'weight': round(w, 3)} for t, w in explanation.negative])
+                else:
+                    col_neg.write('none')
+        # rank against open postings when a job index has been built (python -m model.jobmatch build)
+        from model.jobmatch import get_job_index
+        try:
+            job_index = get_job_index(os.environ.get('ATS_JOB_INDEX') or Path(artifacts_dir) / 'jobs', predictor)
+            matches = [m for m in job_index.top_k(text, k=10) if m[1] > 0] if job_index is not None else []
+        except Exception as e:
+            matches = []
+            st.sidebar.warning(f'Could not rank job postings: {e}')
+        if matches:
+            st.subheader('Top matching postings')
+            st.table([{'posting': pid, 'title': meta.get('title', ''), 'similarity': round(sim, 3)}
+                      for pid, sim, meta in matches])
+        # remember the resume for recruiter search (once per file, not on every rerun)
+        corpus_dir = os.environ.get('ATS_CORPUS_INDEX')
+        indexed = st.session_state.setdefault('corpus_indexed', set())
+        if corpus_dir and cleaned and upload_key not in indexed:
+            from model.corpus_index import get_corpus_index
+            try:
+                get_corpus_index(corpus_dir, predictor).append(
+                    [cleaned], [{'id': upload_key, 'file': getattr(uploaded_file, 'name', ''),
+                                 'label': pred.item() if hasattr(pred, 'item') else pred,
+                                 'score': score, 'chars': len(text), 'indexed_at': int(time.time())}])
+                indexed.add(upload_key)
+            except Exception as e:
+                st.sidebar.warning(f'Could not add resume to the corpus index: {e}')
         # suggestions: short or deep (long-form)
         # default to deep suggestions on so users see full paragraphs by default
         deep = st.checkbox('Deep suggestions (long, tailored)', value=True)
@@ -243,6 +370,33 @@ if uploaded_file is not None and extract_button:
                 st.subheader('Suggestions to improve this resume')
                 for s in suggestions:
                     st.write('- ' + s)
+    end_trace(trace_token)
+    flush_file()
+
+# recruiter search over every resume indexed so far (enabled by ATS_CORPUS_INDEX)
+if os.environ.get('ATS_CORPUS_INDEX'):
+    with st.expander('Recruiter search: best resumes for a job description'):
+        job_text = st.text_area('Job description', value='', key='recruiter_jd')
+        top_n = st.number_input('Results', min_value=1, max_value=200, value=20)
+        if st.button('Search resumes') and job_text.strip():
+            predictor = get_predictor(artifacts_dir)
+            if not predictor.ready:
+                st.warning('No trained model artifacts found.')
+            else:
+                from model.corpus_index import get_corpus_index
+                try:
+                    results, shard_stats = get_corpus_index(os.environ['ATS_CORPUS_INDEX'], predictor).search(job_text, k=int(top_n))
+                    if results:
+                        st.table(results)
+                    else:
+                        st.info('No matching resumes.')
+                    st.caption('Per-shard query latency and mapped memory')
+                    st.table(shard_stats)
+                except Exception as e:
+                    st.error(f'Search failed: {e}')
 
 st.markdown('---')
-st.info('To train a model, run `models/train.py` locally and copy the artifacts to `./artifacts` or upload an artifacts zip in the sidebar.')
\ No newline at end of file
+st.info('To train a model, run `models/train.py` locally and copy the artifacts to `./artifacts` or upload an artifacts zip in the sidebar.')
+
+startup_s = mark_startup('first_render')
+st.sidebar.caption(f"Cold start: {startup_s:.2f}s to first render (imports done at {mark_startup('app_imports'):.2f}s)")
@@ -0,0 +1,402 @@
+"""Headless bulk scoring for ATS Resume Analyzer.
+
+Scores every resume (pdf / png / jpg / heic) in a directory or a zip archive and streams
+one result per file to JSONL or CSV. Extraction runs in a process pool, cleaned text is
+fed to the Predictor in batches, and progress is checkpointed next to the output so an
+interrupted run picks up where it stopped:
+
+    python batch_score.py resumes.zip --out results.jsonl
+    python batch_score.py ./resumes --out results.csv --workers 8 --batch-size 64
+    python batch_score.py resumes.zip --out results.jsonl --explain 5
+"""
+import sys
+from pathlib import Path
+
+# ensure repository root is on sys.path so local packages like `model` and `utils` can be imported
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import argparse
+import csv
+import io
+import json
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+
+from extract.cache import content_key, get_extraction_cache
+from extract.detect import RESUME_SUFFIXES, extract_text_from_bytes, sniff_kind
+from extract.pdf_extract import extract_pdf
+from model.registry import get_predictor
+from utils import metrics
+from utils.clean import clean_text
+from utils.dedup import NearDupDetector
+from utils.suggestions import generate_suggestions, generate_deep_suggestions
+
+FIELDS = ['file', 'label', 'score', 'chars', 'extract_s', 'suggestions', 'error', 'duplicate_of', 'similarity',
+          'explanation']
+
+
+def iter_inputs(source):
+    """Yield (key, payload) pairs for every resume in a directory or zip archive.
+
+    `payload` is a file path for directories (workers read the file themselves) and the
+    member bytes for zip archives. Keys are relative paths, so they stay stable between
+    runs and can be used to resume.
+    """
+    source = Path(source)
+    if source.is_dir():
+        for p in sorted(source.rglob('*')):
+            if p.is_file() and p.suffix.lower() in RESUME_SUFFIXES:
+                yield p.relative_to(source).as_posix(), str(p)
+    elif zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as z:
+            for info in sorted(z.infolist(), key=lambda i: i.filename):
+                if info.is_dir() or not info.filename.lower().endswith(RESUME_SUFFIXES):
+                    continue
+                yield info.filename, z.read(info)
+    else:
+        raise ValueError(f'{source} is neither a directory nor a zip archive')
+
+
+# per worker process: read-only copy of the near-duplicate index saved by earlier runs
+_dedup_snapshots = {}
+
+
+def _dedup_snapshot(dedup_dir):
+    if dedup_dir not in _dedup_snapshots:
+        _dedup_snapshots[dedup_dir] = NearDupDetector.load(dedup_dir)
+    return _dedup_snapshots[dedup_dir]
+
+
+def _probe_pdf(raw, key, cache, snapshot):
+    """Cheap text-layer-only pass over a PDF, before any OCR.
+
+    Returns (text, match). `text` is the final extraction when no page needs OCR (and
+    is cached as such). Otherwise `match` is set when the partial text layer alone
+    already identifies a stored near-duplicate, so its OCR can be skipped.
+    """
+    probe = extract_pdf(raw, ocr=False)
+    if not any(p.needs_ocr for p in probe.pages):
+        cache.put(key, probe.text)
+        return probe.text, None
+    return None, snapshot.query(snapshot.signature(clean_text(probe.text)))
+
+
+def _extract_job(key, payload, deep=False, cache_dir=None, dedup_dir=None, reuse=False):
+    """Worker: `_extract_one`, plus the stage trace recorded while it ran (None when
+    metrics are off) for the parent to fold into its own metrics."""
+    with metrics.trace(write=False, source='batch') as t:
+        item = _extract_one(key, payload, deep, cache_dir, dedup_dir, reuse)
+    item['trace'] = None if t is None else dict(t.to_dict(), id=item['id'])
+    return item
+
+
+def _extract_one(key, payload, deep=False, cache_dir=None, dedup_dir=None, reuse=False):
+    """Extract, clean and build suggestions for one resume.
+
+    Extraction goes through the content-addressed cache, so duplicate files in a batch
+    (and, with `cache_dir`, files seen by earlier runs) skip pdfplumber / OCR. With
+    `dedup_dir` the item also carries its MinHash signature; with `reuse` a PDF that
+    matches a stored near-duplicate on its text layer alone skips OCR and suggestions.
+    """
+    t0 = time.perf_counter()
+    try:
+        if isinstance(payload, str):
+            with open(payload, 'rb') as f:
+                raw = f.read()
+        else:
+            raw = payload
+        cache = get_extraction_cache(disk_dir=cache_dir)
+        digest = content_key(raw)
+        text = cache.get(digest)
+        if text is None and dedup_dir and reuse and sniff_kind(raw, key) == 'pdf':
+            text, match = _probe_pdf(raw, digest, cache, _dedup_snapshot(dedup_dir))
+            if match is not None and match.record:
+                return {'file': key, 'id': digest, 'cleaned': '', 'chars': 0, 'suggestions': [],
+                        'signature': None, 'duplicate_of': match.id, 'similarity': match.similarity,
+                        'extract_s': round(time.perf_counter() - t0, 4), 'error': None}
+        if text is None:
+            # files are already spread over processes, so OCR pages one at a time per worker
+            text = extract_text_from_bytes(raw, name=key, ocr_workers=1)
+            cache.put(digest, text)
+        cleaned = clean_text(text)
+        signature = _dedup_snapshot(dedup_dir).signature(cleaned) if dedup_dir else None
+        suggestions = generate_deep_suggestions(text) if deep else generate_suggestions(text)
+        return {'file': key, 'id': digest, 'cleaned': cleaned, 'chars': len(text), 'suggestions': suggestions,
+                'signature': signature, 'duplicate_of': None, 'similarity': None,
+                'extract_s': round(time.perf_counter() - t0, 4), 'error': None}
+    except Exception as e:
+        return {'file': key, 'id': None, 'cleaned': '', 'chars': 0, 'suggestions': [],
+                'signature': None, 'duplicate_of': None, 'similarity': None,
+                'extract_s': round(time.perf_counter() - t0, 4), 'error': f'{type(e).__name__}: {e}'}
+
+
+class Checkpoint:
+    """Append-only progress log kept next to the output file.
+
+    Each line is `<output byte offset>\\t<key>`, written only after the record for `key`
+    has been flushed to the output. On resume the output is truncated back to the last
+    checkpointed offset, so a crash mid-write never leaves a torn or duplicated record.
+    """
+
+    def __init__(self, out_path):
+        self.path = Path(str(out_path) + '.ckpt')
+        self.done = set()
+        self.offset = 0
+        if self.path.exists():
+            complete = 0   # byte length of the complete lines
+            with open(self.path, 'r+b') as f:
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break  # partial line from a crash
+                    off, _, key = line.decode('utf-8').rstrip('\n').partition('\t')
+                    self.done.add(key)
+                    self.offset = int(off)
+                    complete += len(line)
+                # drop the torn tail, or the next mark() would be appended onto it
+                f.truncate(complete)
+        self._f = open(self.path, 'a', encoding='utf-8')
+
+    def mark(self, key, offset):
+        self._f.write(f'{offset}\t{key}\n')
+        self.offset = offset
+
+    def flush(self):
+        self._f.flush()
+        os.fsync(self._f.fileno())
+
+    def close(self):
+        self._f.close()
+
+
+class ResultWriter:
+    """Streams records to JSONL or CSV, truncating to the checkpointed offset on resume."""
+
+    def __init__(self, out_path, fmt, offset=0):
+        self.fmt = fmt
+        exists = Path(out_path).exists()
+        self._f = open(out_path, 'r+b' if exists else 'wb')
+        self._f.truncate(offset)
+        self._f.seek(offset)
+        if fmt == 'csv' and offset == 0:
+            self._write_csv_row(FIELDS)
+
+    def _write_csv_row(self, row):
+        s = io.StringIO()
+        csv.writer(s).writerow(row)
+        self._f.write(s.getvalue().encode('utf-8'))
+
+    def write(self, record):
+        if self.fmt == 'csv':
+            row = dict(record, suggestions=' | '.join(record['suggestions']),
+                       explanation=json.dumps(record.get('explanation'), ensure_ascii=False)
+                       if record.get('explanation') else None)
+            self._write_csv_row([row.get(k) for k in FIELDS])
+        else:
+            self._f.write((json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8'))
+        return self._f.tell()
+
+    def flush(self):
+        self._f.flush()
+        os.fsync(self._f.fileno())
+
+    def close(self):
+        self._f.close()
+
+
+def _to_builtin(value):
+    # numpy scalars (e.g. np.int64 labels) are not JSON serializable
+    return value.item() if hasattr(value, 'item') else value
+
+
+def _explanation_record(expl):
+    if expl is None:
+        return None
+    return {'positive': [[t, round(w, 6)] for t, w in expl.positive],
+            'negative': [[t, round(w, 6)] for t, w in expl.negative]}
+
+
+def _score_batch(predictor, batch, explain_k=0):
+    """Predict a batch of extracted items and return output records.
+
+    With `explain_k`, each record also gets the top contributing terms of its prediction.
+    """
+    ok = [i for i, item in enumerate(batch) if item['error'] is None]
+    labels, scores, explanations = {}, {}, {}
+    if ok and predictor.ready:
+        # one sparse matrix and one model evaluation for the whole batch
+        result = predictor.predict_batch((batch[i]['cleaned'] for i in ok), explain_k=explain_k)
+        for i, l, s in zip(ok, result[0], result[1]):
+            labels[i] = l
+            scores[i] = None if np.isnan(s) else s
+        if explain_k:
+            explanations = dict(zip(ok, map(_explanation_record, result[2])))
+    records = []
+    for i, item in enumerate(batch):
+        label, score = labels.get(i), scores.get(i)
+        records.append({'file': item['file'], 'label': _to_builtin(label),
+                        'score': None if score is None else round(float(score), 6),
+                        'chars': item['chars'], 'extract_s': item['extract_s'],
+                        'suggestions': item['suggestions'], 'error': item['error'],
+                        'duplicate_of': item.get('duplicate_of'), 'similarity': item.get('similarity'),
+                        'explanation': explanations.get(i)})
+    return records
+
+
+def _score_with_dedup(predictor, detector, batch, reuse, explain_k=0):
+    """Like `_score_batch`, resolving near-duplicates against `detector` first.
+
+    Each new resume is added to the detector before the next one is looked up, so
+    repeats inside one batch are caught too. With `reuse`, duplicates are not scored:
+    they get the label, score and suggestions stored for the earlier document.
+    """
+    for item in batch:
+        if item['error'] is not None or item.get('duplicate_of'):
+            continue
+        match = detector.query(item['signature'])
+        if match is not None:
+            item['duplicate_of'], item['similarity'] = match.id, match.similarity
+        elif item['signature'] is not None:
+            # the stored result is filled in below, once this batch has been scored
+            detector.add(item['id'], item['signature'], {})
+    reused = [bool(reuse and item.get('duplicate_of')) for item in batch]
+    scored = iter(_score_batch(predictor, [item for item, r in zip(batch, reused) if not r], explain_k))
+    records = [None if r else next(scored) for r in reused]
+    for item, rec in zip(batch, records):
+        if rec is not None and rec['error'] is None and item['id'] in detector.records:
+            stored = detector.records[item['id']]
+            if not stored:
+                stored.update(file=rec['file'], label=rec['label'], score=rec['score'],
+                              suggestions=rec['suggestions'], explanation=rec['explanation'])
+    for i, item in enumerate(batch):
+        if records[i] is None:
+            stored = detector.records.get(item['duplicate_of'], {})
+            records[i] = {'file': item['file'], 'label': stored.get('label'), 'score': stored.get('score'),
+                          'chars': item['chars'], 'extract_s': item['extract_s'],
+                          'suggestions': stored.get('suggestions', []), 'error': None,
+                          'duplicate_of': item['duplicate_of'], 'similarity': item['similarity'],
+                          'explanation': stored.get('explanation')}
+    return records
+
+
+def _index_batch(corpus, batch, records):
+    """Append the successfully scored resumes of a batch to the corpus index."""
+    rows = [(item, rec) for item, rec in zip(batch, records) if item['error'] is None and item['cleaned']]
+    corpus.append([item['cleaned'] for item, _ in rows],
+                  [{'id': item['id'], 'file': rec['file'], 'label': rec['label'], 'score': rec['score'],
+                    'chars': rec['chars'], 'indexed_at': int(time.time())} for item, rec in rows])
+
+
+def run(source, out, artifacts_dir, fmt=None, workers=None, batch_size=32, deep=False, resume=True,
+        cache_dir=None, index_dir=None, dedup_dir=None, reuse=False, explain_k=0):
+    fmt = fmt or ('csv' if str(out).lower().endswith('.csv') else 'jsonl')
+    # the registry follows an artifact store's CURRENT version (model/store.py)
+    predictor = get_predictor(artifacts_dir)
+    if not predictor.ready:
+        print(f'warning: no artifacts loaded from {artifacts_dir}; writing extraction results only', file=sys.stderr)
+    elif explain_k and not predictor.can_explain:
+        print('warning: this model has no per-term explanation (hashed features or non-linear model)',
+              file=sys.stderr)
+
+    corpus = None
+    if index_dir and predictor.ready:
+        from model.corpus_index import CorpusIndex
+        corpus = CorpusIndex(index_dir, predictor.vectorizer)
+
+    detector = NearDupDetector.load(dedup_dir) if dedup_dir else None
+
+    ckpt_path = Path(str(out) + '.ckpt')
+    if not resume and ckpt_path.exists():
+        ckpt_path.unlink()
+    ckpt = Checkpoint(out)
+    writer = ResultWriter(out, fmt, offset=ckpt.offset)
+    if ckpt.done:
+        print(f'resuming: {len(ckpt.done)} files already scored', file=sys.stderr)
+
+    workers = workers or os.cpu_count() or 1
+    # keep a bounded number of files in flight so zip members are not all held in memory
+    window = workers * 4
+    processed = failed = 0
+    t0 = time.perf_counter()
+
+    def flush(batch):
+        nonlocal processed, failed
+        for item in batch:
+            t = item.pop('trace', None)
+            if t is not None:
+                metrics.REGISTRY.replay([(s['stage'], s['seconds'], s['ok']) for s in t['spans']], t['counters'])
+                metrics.write_trace(t)
+            if item['error'] is not None:
+                metrics.inc('failures', stage='extract')
+        if detector is not None:
+            records = _score_with_dedup(predictor, detector, batch, reuse, explain_k)
+        else:
+            records = _score_batch(predictor, batch, explain_k)
+        if corpus is not None:
+            # indexed before the checkpoint, so a crash can only repeat a resume, never
+            # lose one; search results collapse repeats by id
+            _index_batch(corpus, batch, records)
+        for rec in records:
+            ckpt.mark(rec['file'], writer.write(rec))
+            processed += 1
+            failed += rec['error'] is not None
+        writer.flush()
+        ckpt.flush()
+        metrics.flush_file()
+        rate = processed / max(time.perf_counter() - t0, 1e-9)
+        print(f'{processed} scored ({failed} failed, {rate:.1f} files/s)', file=sys.stderr)
+
+    inputs = ((k, p) for k, p in iter_inputs(source) if k not in ckpt.done)
+    pending, batch = set(), []
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            exhausted = False
+            while pending or not exhausted:
+                while not exhausted and len(pending) < window:
+                    nxt = next(inputs, None)
+                    if nxt is None:
+                        exhausted = True
+                        break
+                    pending.add(pool.submit(_extract_job, nxt[0], nxt[1], deep, cache_dir, dedup_dir, reuse))
+                if not pending:
+                    break
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    batch.append(fut.result())
+                if len(batch) >= batch_size or (exhausted and not pending and batch):
+                    flush(batch)
+                    batch = []
+            if batch:
+                flush(batch)
+    finally:
+        writer.close()
+        ckpt.close()
+        if detector is not None:
+            detector.save(dedup_dir)
+    print(f'done: {processed} files in {time.perf_counter() - t0:.1f}s -> {out}', file=sys.stderr)
+    return processed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Score a directory or zip of resumes without the Streamlit UI.')
+    parser.add_argument('input', help='directory or .zip containing pdf / png / jpg / heic resumes')
+    parser.add_argument('--out', required=True, help='output file (.jsonl or .csv)')
+    parser.add_argument('--format', choices=['jsonl', 'csv'], default=None, help='defaults to the --out extension')
+    parser.add_argument('--artifacts', default=str(Path(__file__).resolve().parent / 'model' / 'artifacts'))
+    parser.add_argument('--workers', type=int, default=None, help='extraction processes (default: CPU count)')
+    parser.add_argument('--batch-size', type=int, default=32, help='resumes per prediction batch / checkpoint')
+    parser.add_argument('--deep', action='store_true', help='emit long-form deep suggestions')
+    parser.add_argument('--cache-dir', default=None, help='on-disk extraction cache shared across runs')
+    parser.add_argument('--no-resume', action='store_true', help='ignore any checkpoint and start over')
+    parser.add_argument('--index', default=None, help='append scored resumes to this corpus index directory')
+    parser.add_argument('--dedup', default=None, help='near-duplicate index directory (MinHash/LSH), kept across runs')
+    parser.add_argument('--reuse', action='store_true', help='with --dedup: give near-duplicates the earlier result instead of scoring them')
+    parser.add_argument('--explain', type=int, nargs='?', const=10, default=0, metavar='K',
+                        help='add the K (default 10) terms pushing most toward / away from each prediction')
+    args = parser.parse_args()
+    run(args.input, args.out, args.artifacts, fmt=args.format, workers=args.workers,
+        batch_size=args.batch_size, deep=args.deep, resume=not args.no_resume, cache_dir=args.cache_dir,
+        index_dir=args.index, dedup_dir=args.dedup, reuse=args.reuse, explain_k=args.explain)
@@ -0,0 +1,262 @@
+"""Synthetic resume corpus for the benchmarks.
+
+Everything is generated offline from a seed, so two machines (or two commits) benchmark
+byte-identical inputs:
+
+- `text_pdf`  a PDF with a real text layer, written directly as PDF objects (Helvetica,
+  one text line per row), so no PDF library is needed to produce it
+- `scan_pdf`  the same pages rendered to images and saved as an image-only PDF, which
+  sends every page down the OCR path
+- `photo`     a phone-style JPEG of the first page: large, tinted, slightly rotated and
+  noisy
+
+and two lengths: `short` (a one-job resume of ~100 words) and `long` (25 jobs, ~2500
+words over about eight pages). Labels follow the resume's track ('tech' -> 1, anything
+else -> 0), so a model trained on the generated texts makes real predictions.
+
+    python -m bench.corpus ./fixtures -n 40
+"""
+import argparse
+import io
+import json
+import random
+from pathlib import Path
+from typing import NamedTuple
+
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+from utils.skill_taxonomy import SKILLS
+
+KINDS = ('text_pdf', 'scan_pdf', 'photo')
+LENGTHS = ('short', 'long')
+
+PAGE_W, PAGE_H = 612, 792          # US letter in PDF points
+MARGIN, FONT_SIZE, LEADING = 54, 10, 13
+CHARS_PER_LINE = 95
+SCAN_DPI = 150
+PHOTO_EDGE = 3024                  # long edge of a 12 MP phone photo
+
+_FIRST = ('Aarav', 'Maya', 'Jordan', 'Priya', 'Lucas', 'Sofia', 'Ethan', 'Aisha', 'Noah', 'Mei',
+          'Daniel', 'Fatima', 'Liam', 'Chloe', 'Omar', 'Elena', 'Ravi', 'Grace', 'Mateo', 'Hana')
+_LAST = ('Sharma', 'Johnson', 'Garcia', 'Chen', 'Okafor', 'Novak', 'Singh', 'Kim', 'Rossi',
+         'Patel', 'Dubois', 'Silva', 'Nakamura', 'Brown', 'Haddad', 'Larsen', 'Mensah', 'Ivanova')
+_CITIES = ('Pune', 'Austin', 'Toronto', 'Berlin', 'Dublin', 'Singapore', 'Leeds', 'Denver')
+
+TRACKS = {
+    'tech': {
+        'titles': ('Data Engineer', 'Backend Developer', 'Machine Learning Engineer', 'Data Analyst',
+                   'Cloud Engineer', 'Software Engineer'),
+        'verbs': ('Built', 'Designed', 'Migrated', 'Automated', 'Optimized', 'Deployed', 'Refactored'),
+        'objects': ('a streaming ingestion pipeline', 'the reporting warehouse', 'REST services',
+                    'model training jobs', 'CI/CD workflows', 'the feature store', 'batch ETL jobs',
+                    'monitoring dashboards', 'an internal search API'),
+        'outcomes': ('cutting latency by {n}%', 'saving ${n}k per year', 'reducing failures by {n}%',
+                     'serving {n}M requests per day', 'improving accuracy by {n} points'),
+    },
+    'retail': {
+        'titles': ('Store Associate', 'Shift Supervisor', 'Customer Service Representative',
+                   'Inventory Clerk', 'Cashier', 'Assistant Store Manager'),
+        'verbs': ('Managed', 'Handled', 'Trained', 'Organized', 'Supported', 'Resolved', 'Scheduled'),
+        'objects': ('the weekend shift', 'customer complaints', 'new team members', 'stock deliveries',
+                    'the checkout area', 'seasonal displays', 'returns and exchanges'),
+        'outcomes': ('raising satisfaction scores by {n}%', 'for {n} customers a day',
+                     'reducing shrinkage by {n}%', 'across {n} store locations'),
+    },
+}
+_RETAIL_SKILLS = ('Customer Service', 'Cash Handling', 'Inventory Management', 'Merchandising',
+                  'Point of Sale', 'Scheduling', 'Team Leadership', 'Conflict Resolution')
+
+
+class Document(NamedTuple):
+    name: str        # file name, e.g. 'long-text_pdf-0007.pdf'
+    kind: str        # one of KINDS
+    length: str      # one of LENGTHS
+    label: int       # 1 for the 'tech' track
+    text: str        # ground-truth resume text
+    data: bytes      # file contents
+
+
+def resume_text(rng, length='short', track=None):
+    """Return (text, track) for a synthetic resume."""
+    track = track or rng.choice(tuple(TRACKS))
+    t = TRACKS[track]
+    name = f'{rng.choice(_FIRST)} {rng.choice(_LAST)}'
+    handle = name.lower().replace(' ', '.')
+    lines = [name.upper(), f'{rng.choice(t["titles"])} | {rng.choice(_CITIES)}',
+             f'{handle}@example.com | +1 555-{rng.randint(100, 999)}-{rng.randint(1000, 9999)}'
+             f' | linkedin.com/in/{handle.replace(".", "")}', '']
+    years = rng.randint(2, 15)
+    lines += ['SUMMARY', f'{rng.choice(t["titles"])} with {years} years of experience. '
+              f'{rng.choice(t["verbs"])} {rng.choice(t["objects"])} and {rng.choice(t["objects"])}.', '']
+    if track == 'tech':
+        skills = rng.sample([name for _, name, _ in SKILLS], 8 if length == 'short' else 20)
+    else:
+        skills = rng.sample(_RETAIL_SKILLS, 5 if length == 'short' else 8)
+    lines += ['SKILLS', ', '.join(skills), '', 'EXPERIENCE']
+    jobs = 1 if length == 'short' else 25
+    bullets = 3 if length == 'short' else 10
+    for j in range(jobs):
+        start = 2024 - (j + 1) * 2
+        lines.append(f'{rng.choice(t["titles"])}, {rng.choice(_LAST)} {rng.choice(("Inc", "Ltd", "Group", "Labs"))} '
+                     f'({start}-{start + 2})')
+        for _ in range(bullets):
+            outcome = rng.choice(t['outcomes']).format(n=rng.randint(5, 60))
+            lines.append(f'- {rng.choice(t["verbs"])} {rng.choice(t["objects"])}, {outcome}.')
+        lines.append('')
+    lines += ['EDUCATION', f'B.Sc. {rng.choice(("Computer Science", "Business", "Statistics", "Economics"))}, '
+              f'{rng.choice(_CITIES)} University ({2024 - years - 4})']
+    return '\n'.join(lines), track
+
+
+def _wrap(text):
+    rows = []
+    for line in text.split('\n'):
+        while len(line) > CHARS_PER_LINE:
+            cut = line.rfind(' ', 0, CHARS_PER_LINE)
+            cut = cut if cut > 0 else CHARS_PER_LINE
+            rows.append(line[:cut])
+            line = line[cut:].lstrip()
+        rows.append(line)
+    return rows
+
+
+def _pages(text):
+    rows = _wrap(text)
+    per_page = (PAGE_H - 2 * MARGIN) // LEADING
+    return [rows[i:i + per_page] for i in range(0, len(rows), per_page)] or [[]]
+
+
+def _pdf_escape(s):
+    return s.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def text_pdf(text):
+    """A minimal multi-page PDF with `text` as a Helvetica text layer."""
+    pages = _pages(text)
+    n = len(pages)
+    # objects: 1 catalog, 2 pages, 3 font, then (page, contents) per page
+    objects = [b'<< /Type /Catalog /Pages 2 0 R >>',
+               ('<< /Type /Pages /Kids [%s] /Count %d >>'
+                % (' '.join(f'{4 + 2 * i} 0 R' for i in range(n)), n)).encode(),
+               b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>']
+    for i, rows in enumerate(pages):
+        ops = [f'BT /F1 {FONT_SIZE} Tf {LEADING} TL {MARGIN} {PAGE_H - MARGIN} Td']
+        ops += [f'({_pdf_escape(r)}) Tj T*' for r in rows]
+        ops.append('ET')
+        stream = '\n'.join(ops).encode('latin-1', 'replace')
+        objects.append(f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_W} {PAGE_H}] '
+                       f'/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>'.encode())
+        objects.append(b'<< /Length %d >>\nstream\n' % len(stream) + stream + b'\nendstream')
+    out = io.BytesIO()
+    out.write(b'%PDF-1.4\n')
+    offsets = []
+    for num, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(b'%d 0 obj\n' % num + body + b'\nendobj\n')
+    xref = out.tell()
+    out.write(b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1))
+    out.writelines(b'%010d 00000 n \n' % off for off in offsets)
+    out.write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def page_images(text, dpi=SCAN_DPI):
+    """Render `text` onto white grayscale page images at `dpi`."""
+    scale = dpi / 72
+    font = ImageFont.load_default(size=round(FONT_SIZE * scale))
+    images = []
+    for rows in _pages(text):
+        img = Image.new('L', (round(PAGE_W * scale), round(PAGE_H * scale)), 255)
+        draw = ImageDraw.Draw(img)
+        y = MARGIN * scale
+        for r in rows:
+            draw.text((MARGIN * scale, y), r, fill=0, font=font)
+            y += LEADING * scale
+        images.append(img)
+    return images
+
+
+def scan_pdf(text):
+    """An image-only PDF of the rendered pages (no text layer)."""
+    images = page_images(text)
+    out = io.BytesIO()
+    images[0].save(out, 'PDF', resolution=SCAN_DPI, save_all=True, append_images=images[1:])
+    return out.getvalue()
+
+
+def photo(text, rng, edge=PHOTO_EDGE):
+    """A phone-style JPEG of the first page: tinted paper, small rotation, sensor noise."""
+    page = page_images(text, dpi=SCAN_DPI)[0]
+    scale = edge / max(page.size)
+    page = page.resize((round(page.size[0] * scale), round(page.size[1] * scale)), Image.BILINEAR)
+    tint = (rng.randint(215, 240), rng.randint(205, 230), rng.randint(180, 210))
+    rgb = Image.merge('RGB', [p.point(lambda v, c=c: v * c // 255) for p, c in zip((page,) * 3, tint)])
+    rgb = rgb.rotate(rng.uniform(-3, 3), resample=Image.BICUBIC, expand=False, fillcolor=(90, 80, 70))
+    noise = Image.effect_noise(rgb.size, 12).convert('RGB')
+    rgb = Image.blend(rgb, noise, 0.08).filter(ImageFilter.GaussianBlur(0.6))
+    out = io.BytesIO()
+    rgb.save(out, 'JPEG', quality=85)
+    return out.getvalue()
+
+
+def make_document(rng, index, kind, length):
+    text, track = resume_text(rng, length)
+    if kind == 'text_pdf':
+        data, ext = text_pdf(text), 'pdf'
+    elif kind == 'scan_pdf':
+        data, ext = scan_pdf(text), 'pdf'
+    elif kind == 'photo':
+        data, ext = photo(text, rng), 'jpg'
+    else:
+        raise ValueError(f'unknown kind {kind!r}; expected one of {KINDS}')
+    return Document(f'{length}-{kind}-{index:04d}.{ext}', kind, length, int(track == 'tech'), text, data)
+
+
+def generate(n, kinds=KINDS, lengths=LENGTHS, seed=0):
+    """Yield `n` documents cycling through every (kind, length) combination."""
+    rng = random.Random(seed)
+    combos = [(k, l) for k in kinds for l in lengths]
+    for i in range(n):
+        kind, length = combos[i % len(combos)]
+        yield make_document(rng, i, kind, length)
+
+
+def write_corpus(out_dir, n, kinds=KINDS, lengths=LENGTHS, seed=0):
+    """Write `n` documents and a `manifest.json` to `out_dir`; returns the manifest.
+
+    An existing corpus generated with the same settings is reused as is.
+    """
+    out = Path(out_dir)
+    settings = {'n': n, 'kinds': list(kinds), 'lengths': list(lengths), 'seed': seed}
+    manifest_path = out / 'manifest.json'
+    if manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text(encoding='utf-8'))
+        if manifest.get('settings') == settings and all((out / d['file']).exists() for d in manifest['docs']):
+            return manifest
+    (out / 'docs').mkdir(parents=True, exist_ok=True)
+    docs = []
+    for doc in generate(n, kinds, lengths, seed):
+        (out / 'docs' / doc.name).write_bytes(doc.data)
+        (out / 'docs' / (doc.name + '.txt')).write_text(doc.text, encoding='utf-8')
+        docs.append({'file': f'docs/{doc.name}', 'kind': doc.kind, 'length': doc.length,
+                     'label': doc.label, 'bytes': len(doc.data), 'words': len(doc.text.split())})
+    manifest = {'settings': settings, 'docs': docs}
+    manifest_path.write_text(json.dumps(manifest, indent=1), encoding='utf-8')
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate a synthetic resume corpus.')
+    parser.add_argument('out', help='output directory')
+    parser.add_argument('-n', type=int, default=24, help='number of documents')
+    parser.add_argument('--kinds', default=','.join(KINDS), help='comma-separated subset of ' + ','.join(KINDS))
+    parser.add_argument('--lengths', default=','.join(LENGTHS), help='comma-separated subset of ' + ','.join(LENGTHS))
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    manifest = write_corpus(args.out, args.n, args.kinds.split(','), args.lengths.split(','), args.seed)
+    total = sum(d['bytes'] for d in manifest['docs'])
+    print(f"{len(manifest['docs'])} documents ({total / 1e6:.1f} MB) in {args.out}")
+
+
+if __name__ == '__main__':
+    main()
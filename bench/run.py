@@ -0,0 +1,313 @@
+"""Benchmark the resume pipeline stage by stage and end to end.
+
+    python -m bench.run --out bench_results.json
+    python -m bench.run --out new.json --compare baseline.json      # exit 1 on regressions
+    python -m bench.run --results new.json --compare baseline.json  # compare without running
+
+The corpus comes from `bench.corpus` (generated once per seed under `--corpus-dir`). With
+no `--artifacts`, a model is trained on the generated texts, so a run needs nothing but
+the repository.
+
+Stage timings run each stage in-process on a sample of every (kind, length) group,
+`--repeat` times per document, and keep the best of the repeats (the least disturbed by
+other work on the machine). Stages: sniff, pdf_text (text layer only), pdf_ocr,
+image_preprocess, image_ocr, clean, vectorize, predict, suggestions and
+suggestions_deep (with the feature memo cleared, i.e. the cold cost). OCR stages and
+scanned / photo documents end to end are skipped when tesseract is not installed.
+
+End to end, `batch_score.run` processes the first N documents of the corpus for every
+`--sizes` x `--concurrency` combination, which exercises the process pool, batching and
+checkpointing exactly as a production batch would.
+
+Results are JSON: run metadata, `stages[<stage>/<kind>-<length>]` with n / mean / p50 /
+p95 in milliseconds, and `end_to_end` rows with throughput and per-file latencies.
+`--compare` checks stage p50s and end-to-end throughput against a baseline and flags
+anything more than `--threshold` worse (ignoring differences under `--min-ms`).
+"""
+import sys
+from pathlib import Path
+
+# ensure repository root is on sys.path so local packages like `model` and `utils` can be imported
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import argparse
+import contextlib
+import csv
+import hashlib
+import io
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+
+from bench.corpus import KINDS, LENGTHS, write_corpus
+
+DEFAULT_CORPUS_DIR = './.cache/bench'
+
+
+def _ms_summary(samples):
+    samples = sorted(samples)
+    if not samples:
+        return {'n': 0}
+    p95 = samples[min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))]
+    return {'n': len(samples), 'mean_ms': round(statistics.fmean(samples), 4),
+            'p50_ms': round(statistics.median(samples), 4), 'p95_ms': round(p95, 4)}
+
+
+def _best_of(fn, repeat, setup=None):
+    """Best wall time of `repeat` calls, in milliseconds, and the last result."""
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, (time.perf_counter() - t0) * 1000)
+    return best, result
+
+
+def tesseract_available():
+    try:
+        import pytesseract
+        pytesseract.get_tesseract_version()
+        return True
+    except Exception:
+        return False
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=Path(__file__).resolve().parents[1], timeout=10).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def _train_model(corpus_dir, manifest):
+    """Train artifacts on the corpus texts (once per corpus) and return their directory."""
+    from model.train import train
+    digest = hashlib.sha1(json.dumps(manifest['settings'], sort_keys=True).encode()).hexdigest()[:10]
+    art = Path(corpus_dir) / f'artifacts-{digest}'
+    if (art / 'model.joblib').exists():
+        return art
+    csv_path = Path(corpus_dir) / 'train.csv'
+    with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+        w = csv.writer(f)
+        w.writerow(['resume_text', 'label'])
+        for d in manifest['docs']:
+            w.writerow([(Path(corpus_dir) / (d['file'] + '.txt')).read_text(encoding='utf-8'), d['label']])
+    with contextlib.redirect_stdout(io.StringIO()):
+        train(str(csv_path), 'resume_text', 'label', artifacts_dir=str(art))
+    return art
+
+
+def bench_stages(corpus_dir, manifest, predictor, repeat=3, per_group=8, ocr=True):
+    """Per-stage timings for up to `per_group` documents of every (kind, length) group."""
+    from extract.detect import sniff_kind
+    from extract.image_extract import ocr_image
+    from extract.pdf_extract import extract_pdf
+    from extract.preprocess import DEFAULT_OPTIONS, open_image, preprocess_image
+    from utils import features
+    from utils.clean import clean_text
+    from utils.suggestions import generate_deep_suggestions, generate_suggestions
+
+    samples = {}
+
+    def record(stage, group, ms):
+        samples.setdefault(f'{stage}/{group}', []).append(ms)
+
+    groups = {}
+    for d in manifest['docs']:
+        groups.setdefault(f"{d['kind']}-{d['length']}", []).append(d)
+    for group, docs in sorted(groups.items()):
+        for d in docs[:per_group]:
+            path = Path(corpus_dir) / d['file']
+            raw = path.read_bytes()
+            text = (Path(corpus_dir) / (d['file'] + '.txt')).read_text(encoding='utf-8')
+            record('sniff', group, _best_of(lambda: sniff_kind(raw, path.name), repeat)[0])
+            if d['kind'] in ('text_pdf', 'scan_pdf'):
+                record('pdf_text', group, _best_of(lambda: extract_pdf(raw, ocr=False), repeat)[0])
+                if d['kind'] == 'scan_pdf' and ocr:
+                    # one run: OCR is slow and its timing is stable
+                    record('pdf_ocr', group, _best_of(lambda: extract_pdf(raw, ocr=True, ocr_timeout=None), 1)[0])
+            if d['kind'] == 'photo':
+                record('image_preprocess', group, _best_of(
+                    lambda: preprocess_image(open_image(io.BytesIO(raw), DEFAULT_OPTIONS.max_edge)), repeat)[0])
+                if ocr:
+                    record('image_ocr', group, _best_of(lambda: ocr_image(io.BytesIO(raw)), 1)[0])
+            # text stages use the ground-truth text, so they do not depend on OCR quality
+            ms, cleaned = _best_of(lambda: clean_text(text), repeat)
+            record('clean', group, ms)
+            if predictor is not None:
+                ms, X = _best_of(lambda: predictor.vectorizer.transform([cleaned]), repeat)
+                record('vectorize', group, ms)
+                record('predict', group, _best_of(lambda: predictor._decide(X), repeat)[0])
+            record('suggestions', group, _best_of(lambda: generate_suggestions(text), repeat,
+                                                  setup=features._memo.clear)[0])
+            record('suggestions_deep', group, _best_of(lambda: generate_deep_suggestions(text), repeat,
+                                                       setup=features._memo.clear)[0])
+    return {key: _ms_summary(v) for key, v in sorted(samples.items())}
+
+
+def bench_end_to_end(corpus_dir, manifest, artifacts_dir, sizes, concurrency, kinds):
+    """Run `batch_score.run` over the first N matching documents for every size x workers."""
+    from batch_score import run
+
+    docs = [d for d in manifest['docs'] if d['kind'] in kinds]
+    rows = []
+    for size in sizes:
+        if size > len(docs):
+            print(f'skipping size {size}: only {len(docs)} documents of kinds {kinds}', file=sys.stderr)
+            continue
+        with tempfile.TemporaryDirectory(prefix='ats-bench-') as tmp:
+            src = Path(tmp) / 'input'
+            src.mkdir()
+            for d in docs[:size]:
+                os.symlink((Path(corpus_dir) / d['file']).resolve(), src / Path(d['file']).name)
+            for workers in concurrency:
+                out = Path(tmp) / f'out-{workers}.jsonl'
+                t0 = time.perf_counter()
+                with contextlib.redirect_stderr(io.StringIO()):
+                    run(str(src), str(out), str(artifacts_dir), workers=workers, resume=False)
+                seconds = time.perf_counter() - t0
+                records = [json.loads(line) for line in out.read_text(encoding='utf-8').splitlines()]
+                row = {'size': size, 'concurrency': workers, 'kinds': sorted(kinds),
+                       'seconds': round(seconds, 4), 'docs_per_s': round(size / seconds, 3),
+                       'failed': sum(r['error'] is not None for r in records)}
+                row.update({f'extract_{k}': v for k, v in
+                            _ms_summary([r['extract_s'] * 1000 for r in records]).items() if k != 'n'})
+                rows.append(row)
+                print(f"end to end: {size} docs x {workers} workers: {row['docs_per_s']} docs/s", file=sys.stderr)
+    return rows
+
+
+def run_benchmarks(corpus_dir=DEFAULT_CORPUS_DIR, artifacts_dir=None, sizes=(20, 60), concurrency=(1, 4),
+                   kinds=KINDS, lengths=LENGTHS, repeat=3, per_group=8, seed=0, ocr=None):
+    ocr = tesseract_available() if ocr is None else ocr
+    # without tesseract only text-layer PDFs can be scored end to end
+    e2e_kinds = [k for k in kinds if ocr or k == 'text_pdf']
+    # documents cycle evenly through the kinds, so make enough of the end-to-end kinds
+    n_docs = max(per_group * len(kinds) * len(lengths),
+                 math.ceil(max(sizes) * len(kinds) / max(len(e2e_kinds), 1)))
+    corpus_dir = Path(corpus_dir) / f'seed-{seed}'
+    t0 = time.perf_counter()
+    manifest = write_corpus(corpus_dir, n_docs, kinds, lengths, seed)
+    print(f"corpus: {len(manifest['docs'])} documents in {corpus_dir} ({time.perf_counter() - t0:.1f}s)",
+          file=sys.stderr)
+
+    from model.registry import get_predictor
+    artifacts_dir = Path(artifacts_dir) if artifacts_dir else _train_model(corpus_dir, manifest)
+    predictor = get_predictor(artifacts_dir)
+    if not predictor.ready:
+        raise SystemExit(f'could not load artifacts from {artifacts_dir}')
+
+    stages = bench_stages(corpus_dir, manifest, predictor, repeat=repeat, per_group=per_group, ocr=ocr)
+    end_to_end = bench_end_to_end(corpus_dir, manifest, artifacts_dir, sizes, concurrency, e2e_kinds)
+
+    import numpy, sklearn
+    return {
+        'meta': {'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'), 'commit': _git_commit(),
+                 'python': platform.python_version(), 'platform': platform.platform(),
+                 'cpu_count': os.cpu_count(), 'numpy': numpy.__version__, 'sklearn': sklearn.__version__,
+                 'seed': seed, 'repeat': repeat, 'per_group': per_group, 'ocr': ocr,
+                 'artifacts': str(artifacts_dir), 'corpus': manifest['settings']},
+        'stages': stages,
+        'end_to_end': end_to_end,
+    }
+
+
+def compare(baseline, current, threshold=0.2, min_ms=0.05):
+    """Rows of (metric, baseline, current, ratio, status) for everything in both results.
+
+    A stage regresses when its p50 grows by more than `threshold` and by at least
+    `min_ms`; an end-to-end row regresses when its throughput drops by more than
+    `threshold`. Status is 'regression', 'improvement' or 'ok'.
+    """
+    rows = []
+    for key, cur in current.get('stages', {}).items():
+        base = baseline.get('stages', {}).get(key)
+        if not base or 'p50_ms' not in base or 'p50_ms' not in cur:
+            continue
+        b, c = base['p50_ms'], cur['p50_ms']
+        ratio = c / b if b else float('inf')
+        status = 'ok'
+        if abs(c - b) >= min_ms:
+            status = 'regression' if ratio > 1 + threshold else 'improvement' if ratio < 1 / (1 + threshold) else 'ok'
+        rows.append((f'{key} p50_ms', b, c, ratio, status))
+    base_e2e = {(r['size'], r['concurrency'], tuple(r['kinds'])): r for r in baseline.get('end_to_end', [])}
+    for cur in current.get('end_to_end', []):
+        base = base_e2e.get((cur['size'], cur['concurrency'], tuple(cur['kinds'])))
+        if not base:
+            continue
+        b, c = base['docs_per_s'], cur['docs_per_s']
+        ratio = c / b if b else float('inf')
+        status = 'regression' if ratio < 1 / (1 + threshold) else 'improvement' if ratio > 1 + threshold else 'ok'
+        rows.append((f"end_to_end size={cur['size']} workers={cur['concurrency']} docs_per_s", b, c, ratio, status))
+    return rows
+
+
+def _print_compare(rows):
+    width = max((len(r[0]) for r in rows), default=10)
+    print(f"{'metric':<{width}}  {'baseline':>10}  {'current':>10}  {'ratio':>6}  status")
+    for metric, b, c, ratio, status in rows:
+        print(f'{metric:<{width}}  {b:>10.4g}  {c:>10.4g}  {ratio:>6.2f}  {status}')
+
+
+def _print_summary(results):
+    for key, s in results['stages'].items():
+        if s.get('n'):
+            print(f"{key:<40} n={s['n']:<3} p50={s['p50_ms']:>10.3f} ms  p95={s['p95_ms']:>10.3f} ms")
+    for r in results['end_to_end']:
+        print(f"end_to_end size={r['size']:<5} workers={r['concurrency']:<3} {r['docs_per_s']:>8.2f} docs/s  "
+              f"extract p50={r.get('extract_p50_ms', 0):.1f} ms  failed={r['failed']}")
+
+
+def _int_list(value):
+    return [int(v) for v in value.split(',') if v]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark extraction, cleaning, prediction and suggestions.')
+    parser.add_argument('--out', default='bench_results.json', help='where to write the JSON results')
+    parser.add_argument('--corpus-dir', default=DEFAULT_CORPUS_DIR, help='generated corpus (reused across runs)')
+    parser.add_argument('--artifacts', default=None, help='model artifacts (default: train one on the corpus)')
+    parser.add_argument('--sizes', type=_int_list, default=[20, 60], help='end-to-end corpus sizes')
+    parser.add_argument('--concurrency', type=_int_list, default=[1, 4], help='end-to-end worker counts')
+    parser.add_argument('--kinds', default=','.join(KINDS), help='document kinds to generate')
+    parser.add_argument('--lengths', default=','.join(LENGTHS), help='document lengths to generate')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per document and stage (best is kept)')
+    parser.add_argument('--per-group', type=int, default=8, help='documents per kind/length group for stage timings')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-ocr', action='store_true', help='skip OCR even when tesseract is installed')
+    parser.add_argument('--results', default=None, help='use this results file instead of running')
+    parser.add_argument('--compare', default=None, metavar='BASELINE', help='flag regressions against a baseline JSON')
+    parser.add_argument('--threshold', type=float, default=0.2, help='relative slowdown counted as a regression')
+    parser.add_argument('--min-ms', type=float, default=0.05, help='ignore stage differences smaller than this')
+    args = parser.parse_args(argv)
+
+    if args.results:
+        results = json.loads(Path(args.results).read_text(encoding='utf-8'))
+    else:
+        results = run_benchmarks(args.corpus_dir, args.artifacts, args.sizes, args.concurrency,
+                                 args.kinds.split(','), args.lengths.split(','), args.repeat, args.per_group,
+                                 args.seed, ocr=False if args.no_ocr else None)
+        Path(args.out).write_text(json.dumps(results, indent=1), encoding='utf-8')
+        _print_summary(results)
+        print(f'results written to {args.out}')
+    if args.compare:
+        rows = compare(json.loads(Path(args.compare).read_text(encoding='utf-8')), results,
+                       args.threshold, args.min_ms)
+        _print_compare(rows)
+        regressions = [r for r in rows if r[4] == 'regression']
+        if regressions:
+            print(f'{len(regressions)} regression(s) against {args.compare}')
+            sys.exit(1)
+        print(f'no regressions against {args.compare}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""Content-addressed cache for extracted resume text.
+
+Keys are the SHA-256 of the raw upload bytes, so re-uploading the same file (or the same
+member of another batch zip) costs a hash and a lookup instead of another pdfplumber /
+tesseract run. There is an in-memory LRU tier bounded by total size and an optional
+on-disk tier that survives restarts.
+"""
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from utils.metrics import inc
+
+# bump when extraction output changes so stale cached text is not served
+EXTRACT_VERSION = '3'
+
+
+def content_key(raw):
+    """SHA-256 of the raw bytes, salted with the extractor version."""
+    h = hashlib.sha256(raw)
+    h.update(b'extract-v' + EXTRACT_VERSION.encode())
+    return h.hexdigest()
+
+
+class ExtractionCache:
+    def __init__(self, max_bytes=64 * 1024 * 1024, disk_dir=None):
+        self.max_bytes = max_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self._mem = OrderedDict()  # key -> text, oldest first
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+    def _disk_path(self, key):
+        return self.disk_dir / key[:2] / (key + '.txt')
+
+    def _remember(self, key, text):
+        # caller holds the lock
+        size = sys.getsizeof(text)
+        if size > self.max_bytes:
+            return
+        old = self._mem.pop(key, None)
+        if old is not None:
+            self._size -= sys.getsizeof(old)
+        self._mem[key] = text
+        self._size += size
+        while self._size > self.max_bytes:
+            _, evicted = self._mem.popitem(last=False)
+            self._size -= sys.getsizeof(evicted)
+            self.evictions += 1
+
+    def get(self, key):
+        """Return cached text for `key`, or None on a miss."""
+        with self._lock:
+            text = self._mem.get(key)
+            if text is not None:
+                self._mem.move_to_end(key)
+                self.hits += 1
+        if text is not None:
+            inc('cache_hits', tier='memory')
+            return text
+        if self.disk_dir is not None:
+            try:
+                text = self._disk_path(key).read_text(encoding='utf-8')
+            except OSError:
+                text = None
+            if text is not None:
+                with self._lock:
+                    self._remember(key, text)
+                    self.hits += 1
+                    self.disk_hits += 1
+                inc('cache_hits', tier='disk')
+                return text
+        with self._lock:
+            self.misses += 1
+        inc('cache_misses')
+        return None
+
+    def put(self, key, text):
+        with self._lock:
+            self._remember(key, text)
+        if self.disk_dir is not None:
+            path = self._disk_path(key)
+            try:
+                path.parent.mkdir(exist_ok=True)
+                # write-then-rename so concurrent readers never see a partial file
+                fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    f.write(text)
+                os.replace(tmp, path)
+            except OSError:
+                pass
+
+    def get_or_extract(self, raw, extract):
+        """Return cached text for `raw`, calling `extract(raw)` and caching it on a miss."""
+        key = content_key(raw)
+        text = self.get(key)
+        if text is None:
+            text = extract(raw)
+            self.put(key, text)
+        return text
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'disk_hits': self.disk_hits, 'misses': self.misses,
+                    'evictions': self.evictions, 'entries': len(self._mem), 'bytes': self._size}
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def get_extraction_cache(disk_dir=None, max_bytes=64 * 1024 * 1024):
+    """Process-wide cache. The first call decides the configuration; the disk tier
+    defaults to the `ATS_EXTRACT_CACHE_DIR` environment variable when set."""
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = ExtractionCache(max_bytes=max_bytes,
+                                           disk_dir=disk_dir or os.environ.get('ATS_EXTRACT_CACHE_DIR'))
+    return _default
@@ -0,0 +1,44 @@
+import io
+
+from utils.metrics import inc, stage
+
+from .pdf_extract import extract_text_from_pdf
+from .image_extract import extract_text_from_image
+from .preprocess import is_heic_bytes
+
+IMAGE_SUFFIXES = ('.png', '.jpg', '.jpeg', '.heic', '.heif')
+RESUME_SUFFIXES = ('.pdf',) + IMAGE_SUFFIXES
+
+
+def is_pdf_bytes(raw, name=None, mime=None):
+    """Detect a PDF by magic bytes, filename extension or MIME type."""
+    if len(raw) >= 4 and raw[:4] == b'%PDF':
+        return True
+    if mime == 'application/pdf':
+        return True
+    return bool(name) and name.lower().endswith('.pdf')
+
+
+def sniff_kind(raw, name=None, mime=None):
+    """Return 'pdf', 'heic' or 'image' for the raw upload bytes."""
+    with stage('sniff'):
+        if is_pdf_bytes(raw, name, mime):
+            return 'pdf'
+        if is_heic_bytes(raw):
+            return 'heic'
+        return 'image'
+
+
+def extract_text_from_bytes(raw, name=None, mime=None, **pdf_options):
+    """Extract text from raw resume bytes, dispatching on the sniffed file kind.
+
+    This is the headless counterpart of the upload flow in `app.py`: PDFs go through
+    `extract_text_from_pdf`, everything else through image OCR (HEIC photos are decoded
+    through pillow_heif when it is installed; see `preprocess.open_image`).
+    `pdf_options` (e.g. `ocr_workers`) are passed through to `extract_text_from_pdf`.
+    """
+    inc('bytes_processed', len(raw))
+    kind = sniff_kind(raw, name, mime)
+    if kind == 'pdf':
+        return extract_text_from_pdf(io.BytesIO(raw), **pdf_options)
+    return extract_text_from_image(io.BytesIO(raw))
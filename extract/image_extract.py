@@ -2,8 +2,28 @@ from PIL import Image
 import pytesseract
 import io
 
-def extract_text_from_image(uploaded_file):
-    uploaded_file.seek(0)
-    image = Image.open(uploaded_file).convert('RGB')
-    text = pytesseract.image_to_string(image)
+from utils.metrics import stage
+
+from .preprocess import DEFAULT_OPTIONS, open_image, preprocess_image
+
+
+def ocr_image(uploaded_file, options=DEFAULT_OPTIONS, ocr_timeout=None):
+    """OCR an image file-like after the preprocessing pipeline; returns (text, report).
+
+    Pass `options=None` to OCR the full-resolution RGB frame as-is. With `ocr_timeout`
+    (seconds) pytesseract kills tesseract and raises RuntimeError once it is spent.
+    """
+    if options is None:
+        uploaded_file.seek(0)
+        image = Image.open(uploaded_file).convert('RGB')
+        with stage('ocr_image'):
+            return pytesseract.image_to_string(image, timeout=ocr_timeout or 0), []
+    image = open_image(uploaded_file, max_edge=options.max_edge)
+    image, report = preprocess_image(image, options)
+    with stage('ocr_image'):
+        return pytesseract.image_to_string(image, timeout=ocr_timeout or 0), report
+
+
+def extract_text_from_image(uploaded_file, options=DEFAULT_OPTIONS):
+    text, _ = ocr_image(uploaded_file, options)
     return text
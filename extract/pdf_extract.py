@@ -1,74 +1,240 @@
 import pdfplumber
+import contextvars
 import io
+import os
+import time
 import pytesseract
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import NamedTuple
 from PIL import Image
 
+from utils.metrics import inc, stage
 
-def extract_text_from_pdf(uploaded_file):
-    """Extract text from a PDF file-like. If selectable text is not found (image-only PDF),
-    fall back to rendering pages to images and running OCR (pytesseract).
+# resolution used to rasterize scanned pages before OCR
+OCR_DPI = 150
+# default number of pages OCR'd concurrently
+OCR_WORKERS = min(4, os.cpu_count() or 1)
+# overall OCR time budget per document, in seconds (None = unlimited)
+OCR_TIMEOUT = 120
+# a text layer with fewer visible characters than this is treated as a scanned page
+MIN_PAGE_CHARS = 20
+# share of visible characters that must be letters/digits for a text layer to be trusted
+MIN_ALNUM_RATIO = 0.5
 
-    `uploaded_file` can be a Streamlit `UploadedFile` or any file-like object.
+
+class PageResult(NamedTuple):
+    number: int       # 0-based page index
+    text: str
+    method: str       # 'text' (text layer kept), 'ocr', or 'none' (nothing usable)
+    reason: str       # why the page was routed the way it was
+    needs_ocr: bool   # the text layer was rejected by `text_layer_verdict`
+    seconds: float    # wall time spent on this page (text layer + render + OCR)
+    total: int        # number of pages in the document
+    complete: bool = True   # False when the OCR budget ran out before the page was OCR'd
+
+
+class PdfExtraction(NamedTuple):
+    pages: list
+
+    @property
+    def text(self):
+        return ''.join(p.text + '\n' for p in self.pages if p.text)
+
+    @property
+    def complete(self):
+        """True when every page of the document is here and none was cut short by the OCR
+        budget, i.e. the text is final and safe to cache."""
+        return all(p.complete for p in self.pages) and (not self.pages or len(self.pages) == self.pages[-1].total)
+
+    def report(self):
+        """Per-page decisions and timings, e.g. for logging or display."""
+        return [{'page': p.number + 1, 'method': p.method, 'reason': p.reason,
+                 'chars': len(p.text), 'seconds': round(p.seconds, 4)} for p in self.pages]
+
+
+def _read_bytes(uploaded_file):
+    if isinstance(uploaded_file, (bytes, bytearray)):
+        return bytes(uploaded_file)
+    try:
+        uploaded_file.seek(0)
+    except Exception:
+        pass
+    return uploaded_file.read()
+
+
+def text_layer_verdict(page_text):
+    """Return (ok, reason) for a page's text layer.
+
+    Pages with almost no text are scans; pages whose text is mostly `(cid:NN)` glyph
+    placeholders or symbols come from fonts without a usable mapping and OCR better.
     """
-    text = ''
-    # Try opening directly with pdfplumber
+    visible = ''.join(page_text.split())
+    if len(visible) < MIN_PAGE_CHARS:
+        return False, f'text layer has {len(visible)} visible chars'
+    cid_chars = page_text.count('(cid:') * 8
+    if cid_chars > len(visible) * 0.3:
+        return False, 'text layer is mostly unmapped (cid) glyphs'
+    alnum = sum(c.isalnum() for c in visible)
+    if alnum < len(visible) * MIN_ALNUM_RATIO:
+        return False, f'text layer is {alnum / len(visible):.0%} alphanumeric'
+    return True, 'text layer ok'
+
+
+def _render_page(page):
     try:
-        with pdfplumber.open(uploaded_file) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text() or ''
-                if page_text:
-                    text += page_text + '\n'
+        # pdfplumber's to_image requires pdfplumber v0.5+, and will produce a PIL image
+        return page.to_image(resolution=OCR_DPI).original
     except Exception:
-        # fallback: read bytes and reopen via BytesIO
-        try:
-            uploaded_file.seek(0)
-            bytes_data = uploaded_file.read()
-            with pdfplumber.open(io.BytesIO(bytes_data)) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text() or ''
-                    if page_text:
-                        text += page_text + '\n'
-        except Exception:
-            # if even reopening fails, re-raise to be handled by caller
-            raise
-
-    # If pdfplumber returned no or very little text, attempt OCR on each page
-    if not text.strip():
-        try:
-            # ensure we have a BytesIO to reopen
+        # fallback: render at pdfplumber's default resolution
+        return page.to_image().original
+
+
+def _ocr_page(data, number, deadline=None):
+    """Rasterize one page and OCR it; returns (text, seconds), with text None when the
+    deadline passed first. Runs on the OCR pool, so it opens its own document handle:
+    pdfplumber objects are not safe to share between threads."""
+    t0 = time.perf_counter()
+    if deadline is not None and time.monotonic() >= deadline:
+        return None, 0.0
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        with stage('pdf_render'):
+            pil_img = _render_page(pdf.pages[number])
+    if not isinstance(pil_img, Image.Image):
+        return '', time.perf_counter() - t0
+    if deadline is not None and time.monotonic() >= deadline:
+        return None, time.perf_counter() - t0
+    # pytesseract kills tesseract and raises RuntimeError once the budget is spent
+    timeout = 0 if deadline is None else max(deadline - time.monotonic(), 0.01)
+    with stage('ocr_page'):
+        text = pytesseract.image_to_string(pil_img, timeout=timeout) or ''
+    return text, time.perf_counter() - t0
+
+
+def iter_pdf_pages(uploaded_file, ocr=True, ocr_workers=None, ocr_timeout=OCR_TIMEOUT, text_pages=None):
+    """Yield a `PageResult` per page, in page order, as soon as each page is final.
+
+    The document is opened once and read in a single pass. Each page keeps its text
+    layer when `text_layer_verdict` accepts it; otherwise it is queued for rendering and
+    OCR on a bounded thread pool while the following pages are still being read, so only
+    the pages that need OCR pay for it and they are rasterized in parallel. `ocr_timeout`
+    is an overall budget: no page is queued once it has run out, and OCR still pending
+    then is cancelled, so those pages fall back to whatever their text layer had and are
+    marked `complete=False`.
+
+    `text_pages` are the `PageResult`s of an earlier `ocr=False` pass over the same
+    document; their text layers and verdicts are reused instead of being parsed again,
+    so only the pages that need OCR are touched.
+
+    Callers can stop early (e.g. once enough tokens have arrived) by breaking out of the
+    loop or calling `close()`; outstanding OCR is then cancelled.
+    """
+    data = _read_bytes(uploaded_file)
+    deadline = None if ocr_timeout is None else time.monotonic() + ocr_timeout
+    resolved = {}   # page number -> final PageResult
+    futures = {}    # OCR future -> provisional PageResult (text layer only)
+    next_page = 0
+    pool = None
+
+    def harvest(done):
+        for fut in done:
+            prev = futures.pop(fut)
             try:
-                uploaded_file.seek(0)
-                bytes_data = uploaded_file.read()
-                bio = io.BytesIO(bytes_data)
+                ocr_text, ocr_s = fut.result()
             except Exception:
-                # if uploaded_file is already a bytes-like object
-                bio = io.BytesIO(uploaded_file)
+                # a page that fails to OCR keeps whatever its text layer had; pytesseract
+                # also raises when it kills tesseract at the deadline
+                resolved[prev.number] = prev._replace(complete=deadline is None or time.monotonic() < deadline)
+                continue
+            if ocr_text is None:
+                resolved[prev.number] = prev._replace(seconds=prev.seconds + ocr_s, complete=False)
+            elif ocr_text.strip():
+                resolved[prev.number] = prev._replace(text=ocr_text, method='ocr', seconds=prev.seconds + ocr_s)
+            else:
+                resolved[prev.number] = prev._replace(seconds=prev.seconds + ocr_s)
 
-            with pdfplumber.open(bio) as pdf:
-                ocr_text = ''
-                for page in pdf.pages:
-                    # render page to an image (Pillow) and OCR it
+    try:
+        with pdfplumber.open(io.BytesIO(data)) as pdf:
+            total = len(pdf.pages)
+            for number, page in enumerate(pdf.pages):
+                if text_pages is not None and number < len(text_pages):
+                    result = text_pages[number]
+                else:
+                    t0 = time.perf_counter()
                     try:
-                        # pdfplumber's to_image requires pdfplumber v0.5+, and will produce a PIL image
-                        page_image = page.to_image(resolution=150)
-                        pil_img = page_image.original
-                        if isinstance(pil_img, Image.Image):
-                            page_ocr = pytesseract.image_to_string(pil_img)
-                            if page_ocr:
-                                ocr_text += page_ocr + '\n'
+                        with stage('pdf_text'):
+                            page_text = page.extract_text() or ''
                     except Exception:
-                        # fallback: try to get the raw image bytes via cropping the page bbox
-                        try:
-                            pil_img = page.to_image().original
-                            page_ocr = pytesseract.image_to_string(pil_img)
-                            if page_ocr:
-                                ocr_text += page_ocr + '\n'
-                        except Exception:
-                            continue
-                if ocr_text:
-                    text = ocr_text
-        except Exception:
-            # if OCR fails, return whatever text we have (likely empty)
-            pass
-
-    return text
\ No newline at end of file
+                        page_text = ''
+                    ok, reason = text_layer_verdict(page_text)
+                    result = PageResult(number, page_text, 'text' if page_text.strip() else 'none',
+                                        reason, not ok, time.perf_counter() - t0, total)
+                if result.needs_ocr and ocr:
+                    inc('ocr_fallbacks')
+                if result.needs_ocr and ocr and (deadline is None or time.monotonic() < deadline):
+                    if pool is None:
+                        pool = ThreadPoolExecutor(max_workers=max(1, ocr_workers or OCR_WORKERS))
+                    # run in a copy of this context so render/OCR timings land in the caller's trace
+                    futures[pool.submit(contextvars.copy_context().run, _ocr_page, data, number, deadline)] = result
+                elif result.needs_ocr and ocr:
+                    # budget already spent: the page keeps its text layer, unfinished
+                    resolved[number] = result._replace(complete=False)
+                else:
+                    resolved[number] = result
+                harvest([f for f in futures if f.done()])
+                while next_page in resolved:
+                    yield resolved.pop(next_page)
+                    next_page += 1
+
+        while futures:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                # budget spent: pending pages keep their text layer
+                for prev in futures.values():
+                    resolved[prev.number] = prev._replace(complete=False)
+                futures.clear()
+                break
+            done, _ = wait(list(futures), timeout=remaining, return_when=FIRST_COMPLETED)
+            harvest(done)
+            while next_page in resolved:
+                yield resolved.pop(next_page)
+                next_page += 1
+        while next_page in resolved:
+            yield resolved.pop(next_page)
+            next_page += 1
+    finally:
+        if pool is not None:
+            # don't block on pages that blew the budget or were abandoned by the caller;
+            # their tesseract runs are killed at the deadline
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+def collect_pdf_pages(uploaded_file, pages, stop=None, **options):
+    """Append each page from `iter_pdf_pages` to the `pages` list as it arrives.
+
+    Meant to run as a background job while another thread polls `pages` to show
+    progress. Setting the `stop` event ends extraction after the current page.
+    """
+    stream = iter_pdf_pages(uploaded_file, **options)
+    try:
+        for page in stream:
+            pages.append(page)
+            if stop is not None and stop.is_set():
+                break
+    finally:
+        stream.close()
+    return pages
+
+
+def extract_pdf(uploaded_file, ocr=True, ocr_workers=None, ocr_timeout=OCR_TIMEOUT):
+    """Extract every page of a PDF; see `iter_pdf_pages`. Returns a `PdfExtraction`."""
+    return PdfExtraction(list(iter_pdf_pages(uploaded_file, ocr=ocr, ocr_workers=ocr_workers,
+                                             ocr_timeout=ocr_timeout)))
+
+
+def extract_text_from_pdf(uploaded_file, ocr_workers=None, ocr_timeout=OCR_TIMEOUT):
+    """Extract text from a PDF file-like. Pages without a usable text layer (scanned
+    pages) are rendered to images and OCR'd with pytesseract; see `iter_pdf_pages`.
+
+    `uploaded_file` can be a Streamlit `UploadedFile`, any file-like object or raw bytes.
+    """
+    return extract_pdf(uploaded_file, ocr_workers=ocr_workers, ocr_timeout=ocr_timeout).text
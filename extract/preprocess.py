@@ -0,0 +1,173 @@
+"""Image preprocessing before tesseract.
+
+Tesseract time grows with pixel count, and phone photos of a resume are often 12+
+megapixels of mostly background. The pipeline here decodes at reduced size where the
+format allows it, caps the long edge (or normalizes to a target DPI), converts to
+grayscale, crops to the content bounding box and binarizes what is left. Every step can
+be switched off and reports how long it took and roughly how much OCR time it saved.
+"""
+import time
+from typing import NamedTuple, Optional
+
+from PIL import Image, ImageOps
+
+from utils.metrics import stage
+
+# rough tesseract cost per megapixel, used to estimate savings from fewer pixels
+OCR_SECONDS_PER_MPIX = 0.35
+
+
+class PreprocessOptions(NamedTuple):
+    max_edge: Optional[int] = 2500      # cap on the long edge in pixels (None = keep)
+    target_dpi: Optional[int] = None    # rescale to this DPI when the image carries DPI info
+    grayscale: bool = True
+    crop: bool = True                   # crop to the bounding box of dark (content) pixels
+    crop_margin: int = 16
+    binarize: bool = True               # Otsu threshold to pure black/white
+    measure_ocr: bool = False           # OCR before/after each step to measure real savings
+
+
+DEFAULT_OPTIONS = PreprocessOptions()
+
+
+# ftyp brands written by phones for HEIC/HEIF photos
+_HEIC_BRANDS = (b'ftypheic', b'ftypheix', b'ftyphevc', b'ftypmif1')
+
+
+def is_heic_bytes(raw):
+    head = raw[:64]
+    return any(brand in head for brand in _HEIC_BRANDS)
+
+
+def open_image(uploaded_file, max_edge=None):
+    """Open an upload as a PIL image, decoding at reduced size where the codec allows.
+
+    JPEG decoding uses `Image.draft`, which lets libjpeg scale by 1/2, 1/4 or 1/8 while
+    decoding. HEIC photos are opened through pillow_heif (when installed) and shrunk with
+    `Image.reduce` straight after decoding instead of being re-encoded as a full-size JPEG.
+    """
+    uploaded_file.seek(0)
+    head = uploaded_file.read(64)
+    uploaded_file.seek(0)
+    if is_heic_bytes(head):
+        with stage('heic'):
+            try:
+                import pillow_heif
+                pillow_heif.register_heif_opener()
+            except Exception:
+                # without pillow_heif PIL cannot open the photo; let Image.open raise
+                pass
+            img = Image.open(uploaded_file)
+            img.load()
+    else:
+        img = Image.open(uploaded_file)
+    if max_edge and img.format == 'JPEG':
+        # draft picks the smallest DCT scale that is still >= the requested size
+        scale = max_edge / max(img.size)
+        if scale < 1:
+            img.draft('RGB', (int(img.size[0] * scale), int(img.size[1] * scale)))
+    elif max_edge and max(img.size) > 2 * max_edge:
+        factor = max(img.size) // max_edge
+        img = img.reduce(factor)
+    return img
+
+
+def _otsu_threshold(gray):
+    hist = gray.histogram()[:256]
+    total = sum(hist)
+    sum_all = sum(i * h for i, h in enumerate(hist))
+    sum_bg = w_bg = 0
+    best, threshold = -1.0, 127
+    for t in range(256):
+        w_bg += hist[t]
+        if w_bg == 0:
+            continue
+        w_fg = total - w_bg
+        if w_fg == 0:
+            break
+        sum_bg += t * hist[t]
+        mean_bg = sum_bg / w_bg
+        mean_fg = (sum_all - sum_bg) / w_fg
+        between = w_bg * w_fg * (mean_bg - mean_fg) ** 2
+        if between > best:
+            best, threshold = between, t
+    return threshold
+
+
+def _resize(img, opts):
+    scale = 1.0
+    dpi = img.info.get('dpi')
+    if opts.target_dpi and dpi and dpi[0]:
+        scale = opts.target_dpi / float(dpi[0])
+    if opts.max_edge:
+        scale = min(scale, opts.max_edge / max(img.size))
+    if scale >= 1:
+        return img
+    size = (max(1, int(img.size[0] * scale)), max(1, int(img.size[1] * scale)))
+    return img.resize(size, Image.LANCZOS)
+
+
+def _grayscale(img, opts):
+    return img if img.mode in ('L', '1') else img.convert('L')
+
+
+def _binarize(img, opts):
+    gray = img if img.mode == 'L' else img.convert('L')
+    t = _otsu_threshold(gray)
+    return gray.point([255 if i > t else 0 for i in range(256)], '1')
+
+
+def _crop(img, opts):
+    gray = img.convert('L') if img.mode != 'L' else img
+    # content is dark on a light page: invert so ink becomes non-zero for getbbox
+    mask = ImageOps.invert(gray).point(lambda p: 255 if p > 96 else 0)
+    bbox = mask.getbbox()
+    if not bbox:
+        return img
+    m = opts.crop_margin
+    bbox = (max(0, bbox[0] - m), max(0, bbox[1] - m), min(img.size[0], bbox[2] + m), min(img.size[1], bbox[3] + m))
+    return img.crop(bbox)
+
+
+STEPS = (('resize', _resize, lambda o: bool(o.max_edge or o.target_dpi)),
+         ('grayscale', _grayscale, lambda o: o.grayscale),
+         ('crop', _crop, lambda o: o.crop),
+         ('binarize', _binarize, lambda o: o.binarize))
+
+
+def _ocr_seconds(img):
+    import pytesseract
+    t0 = time.perf_counter()
+    pytesseract.image_to_string(img)
+    return time.perf_counter() - t0
+
+
+def preprocess_image(img, options=DEFAULT_OPTIONS):
+    """Run the enabled preprocessing steps; returns (image, report).
+
+    `report` has one entry per step with its own cost and the OCR time it saved. The
+    saving is estimated from the pixel reduction (`OCR_SECONDS_PER_MPIX`) unless
+    `options.measure_ocr` is set, in which case the image is OCR'd before and after the
+    step - useful for tuning, far too slow for production.
+    """
+    report = []
+    if img.mode not in ('RGB', 'L', '1'):
+        img = img.convert('RGB')
+    for name, step, enabled in STEPS:
+        if not enabled(options):
+            continue
+        before_px = img.size[0] * img.size[1]
+        ocr_before = _ocr_seconds(img) if options.measure_ocr else None
+        t0 = time.perf_counter()
+        out = step(img, options)
+        step_s = time.perf_counter() - t0
+        after_px = out.size[0] * out.size[1]
+        if options.measure_ocr:
+            saved = ocr_before - _ocr_seconds(out) - step_s
+        else:
+            saved = (before_px - after_px) / 1e6 * OCR_SECONDS_PER_MPIX - step_s
+        report.append({'step': name, 'seconds': round(step_s, 4), 'pixels_before': before_px,
+                       'pixels_after': after_px, 'saved_s': round(saved, 4),
+                       'saved_measured': options.measure_ocr})
+        img = out
+    return img, report
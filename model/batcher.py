@@ -0,0 +1,156 @@
+"""Micro-batching in front of a Predictor.
+
+A single `predict_text` call spends most of its time in per-call overhead (building a
+one-row sparse matrix, validating input, dispatching into scikit-learn) rather than in
+the dot product. When several sessions or API callers predict at the same time, the
+`MicroBatcher` collects their texts for up to `max_wait_ms` after the first one arrives,
+or until `max_batch` are waiting, vectorizes them as one matrix and evaluates the model
+once. Each caller gets its own result through a future (or `await apredict(...)`).
+
+Batch sizes and queue waits go to `utils.metrics` as the `ats_batch_size` and
+`ats_batch_queue_wait_seconds` histograms (exported with the other metrics when they are
+on), so the window can be tuned.
+"""
+import asyncio
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from utils.metrics import exponential_buckets, observe, stage
+
+from .registry import on_retire
+
+_STOP = object()
+SIZE_BUCKETS = exponential_buckets(1, 2, 11)        # 1 .. 1024 texts
+WAIT_BUCKETS = exponential_buckets(0.0001, 2, 16)   # 0.1 ms .. ~3.3 s
+
+
+class MicroBatcher:
+    def __init__(self, predictor, max_batch=32, max_wait_ms=5.0):
+        if max_batch < 1:
+            raise ValueError('max_batch must be >= 1')
+        self.predictor = predictor
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, daemon=True, name='ats-batcher')
+        self._thread.start()
+
+    def submit(self, text, explain_k=0):
+        """Queue one cleaned text; the future resolves to `(label, score or None)` like
+        `Predictor.predict_text`. With `explain_k` > 0 it also carries the `Explanation`
+        (None when the model cannot be explained), built from the same feature row.
+        Raises RuntimeError once the batcher is closed."""
+        if not self.predictor.ready:
+            raise RuntimeError('Artifacts not loaded.')
+        fut = Future()
+        # under the lock so nothing can land behind the stop marker and never be answered
+        with self._close_lock:
+            if self._closed:
+                raise RuntimeError('batcher is closed')
+            self._queue.put((text, fut, time.perf_counter(), explain_k))
+        return fut
+
+    def predict(self, text, timeout=None, explain_k=0):
+        return self.submit(text, explain_k).result(timeout)
+
+    async def apredict(self, text, explain_k=0):
+        return await asyncio.wrap_future(self.submit(text, explain_k))
+
+    def close(self):
+        """Stop the worker after it has answered everything already queued; later
+        `submit` calls raise RuntimeError."""
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join()
+
+    def _collect(self):
+        """Block for the first request, then gather more until the window closes."""
+        first = self._queue.get()
+        if first is _STOP:
+            return None
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                self._queue.put(_STOP)   # finish this batch, stop on the next loop
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            start = time.perf_counter()
+            observe('batch_size', len(batch), SIZE_BUCKETS)
+            for _, _, queued_at, _ in batch:
+                observe('batch_queue_wait_seconds', start - queued_at, WAIT_BUCKETS)
+            try:
+                p = self.predictor
+                with stage('vectorize'):
+                    X = p.vectorizer.transform([t for t, _, _, _ in batch])
+                with stage('predict'):
+                    labels, scores = p._decide(X)
+            except BaseException as e:
+                for _, fut, _, _ in batch:
+                    fut.set_exception(e)
+                continue
+            for i, ((_, fut, _, explain_k), label, score) in enumerate(zip(batch, labels, scores)):
+                score = float(score)
+                result = (label, None if np.isnan(score) else score)
+                if explain_k > 0:
+                    try:
+                        result += (p._explain_rows(X[i], [label], explain_k)[0] if p.can_explain else None,)
+                    except BaseException as e:
+                        fut.set_exception(e)
+                        continue
+                fut.set_result(result)
+
+
+# predictor -> its MicroBatcher; an entry lives until the registry retires the predictor
+_batchers = {}
+_batchers_lock = threading.Lock()
+
+
+def get_batcher(predictor):
+    """Process-wide batcher for `predictor`, configured from ATS_BATCH_MAX and
+    ATS_BATCH_WAIT_MS. Each predictor keeps its own batcher, so requests still holding
+    the old model during a swap do not displace the new model's batcher; it is closed
+    (after draining what it holds) once model/registry.py retires its predictor."""
+    b = _batchers.get(predictor)
+    if b is not None:
+        return b
+    with _batchers_lock:
+        b = _batchers.get(predictor)
+        if b is None:
+            b = _batchers[predictor] = MicroBatcher(
+                predictor, max_batch=int(os.environ.get('ATS_BATCH_MAX', 32)),
+                max_wait_ms=float(os.environ.get('ATS_BATCH_WAIT_MS', 5)))
+        return b
+
+
+def _retire(predictor):
+    with _batchers_lock:
+        b = _batchers.pop(predictor, None)
+    if b is not None:
+        # close() waits for the worker to drain; keep that off the swapping thread
+        threading.Thread(target=b.close, daemon=True).start()
+
+
+on_retire(_retire)
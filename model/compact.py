@@ -0,0 +1,275 @@
+"""Compact, memory-mappable artifact format.
+
+A pickled `TfidfVectorizer` carries its vocabulary as a Python dict (plus the
+`stop_words_` set of every term pruned by `max_features`), so `joblib.load` rebuilds
+hundreds of thousands of Python objects before the first prediction. The compact format
+stores only what scoring needs, as plain `.npy` arrays next to the joblib files:
+
+- `compact_vocab.npy`   sorted UTF-8 terms as a fixed-width bytes array (binary search)
+- `compact_idf.npy`     the IDF weight of each term (absent when use_idf=False)
+- `compact_coef.npy`    float32 coefficients, one row per decision function
+- `compact_intercept.npy`, `compact_classes.npy`
+
+The arrays are opened with `mmap_mode='r'`, so loading is near-instant and every worker
+process maps the same pages from the OS cache instead of holding its own copy. The
+analyzer settings live under a `compact` header in `meta.json`.
+
+    python -m model.compact ./artifacts
+"""
+import argparse
+import json
+import re
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import scipy.sparse as sp
+
+from .registry import COMPACT_FILES
+
+FORMAT_VERSION = 1
+# maximum allowed |compact - joblib| score difference in the export self-check
+SCORE_TOLERANCE = 1e-5
+
+
+def _check_vectorizer(vectorizer):
+    """Raise ValueError unless `vectorizer` is a TfidfVectorizer we can reproduce."""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    if not isinstance(vectorizer, TfidfVectorizer):
+        raise ValueError(f'compact export supports TfidfVectorizer, not {type(vectorizer).__name__}')
+    unsupported = {'analyzer': 'word', 'preprocessor': None, 'tokenizer': None,
+                   'strip_accents': None, 'stop_words': None}
+    for name, expected in unsupported.items():
+        if getattr(vectorizer, name) != expected:
+            raise ValueError(f'compact export needs {name}={expected!r}, got {getattr(vectorizer, name)!r}')
+    if vectorizer.norm not in ('l2', 'l1', None):
+        raise ValueError(f'unsupported norm {vectorizer.norm!r}')
+
+
+def _model_kind(model):
+    """'logistic' when scores are probabilities, else 'linear' (decision function only)."""
+    from sklearn.linear_model import LogisticRegression, SGDClassifier
+    if isinstance(model, LogisticRegression):
+        multi = 'ovr' if model.solver == 'liblinear' or getattr(model, 'multi_class', None) == 'ovr' else 'multinomial'
+        return 'logistic', multi
+    if isinstance(model, SGDClassifier) and model.loss == 'log_loss':
+        return 'logistic', 'ovr'
+    if hasattr(model, 'coef_') and hasattr(model, 'intercept_'):
+        return 'linear', 'ovr'
+    raise ValueError(f'compact export supports linear models, not {type(model).__name__}')
+
+
+def export_compact(artifacts_dir, model=None, vectorizer=None, check=True):
+    """Write the compact arrays for the joblib artifacts in `artifacts_dir`.
+
+    Adds a `compact` header to `meta.json`; `Predictor` prefers the compact files from
+    then on. With `check=True` the exported model is scored against the joblib one on
+    synthetic documents built from the vocabulary, and ValueError is raised if any score
+    differs by more than `SCORE_TOLERANCE`.
+    """
+    import joblib
+    d = Path(artifacts_dir)
+    model = model if model is not None else joblib.load(d / 'model.joblib')
+    vectorizer = vectorizer if vectorizer is not None else joblib.load(d / 'vectorizer.joblib')
+    _check_vectorizer(vectorizer)
+    kind, multi = _model_kind(model)
+
+    terms = [t.encode('utf-8') for t in vectorizer.get_feature_names_out()]
+    columns = np.array([vectorizer.vocabulary_[t.decode('utf-8')] for t in terms], dtype=np.int64)
+    order = sorted(range(len(terms)), key=terms.__getitem__)
+    vocab = np.array([terms[i] for i in order], dtype=f'S{max(map(len, terms), default=1)}')
+    # column of each sorted term in the original matrix (sklearn already sorts, so this
+    # is normally the identity)
+    perm = columns[order]
+
+    arrays = {
+        'compact_vocab.npy': vocab,
+        'compact_coef.npy': np.ascontiguousarray(np.asarray(model.coef_)[:, perm], dtype=np.float32),
+        'compact_intercept.npy': np.asarray(model.intercept_, dtype=np.float64).ravel(),
+        'compact_classes.npy': np.asarray(model.classes_) if np.asarray(model.classes_).dtype != object
+        else np.asarray(model.classes_).astype(str),
+    }
+    if vectorizer.use_idf:
+        arrays['compact_idf.npy'] = np.asarray(vectorizer.idf_, dtype=np.float64)[perm]
+    for name, arr in arrays.items():
+        np.save(d / name, arr, allow_pickle=False)
+    for name in COMPACT_FILES:
+        if name not in arrays and (d / name).exists():
+            (d / name).unlink()
+
+    meta_path = d / 'meta.json'
+    meta = json.loads(meta_path.read_text()) if meta_path.exists() else {}
+    meta['compact'] = {
+        'version': FORMAT_VERSION, 'n_features': len(vocab),
+        'ngram_range': list(vectorizer.ngram_range), 'lowercase': vectorizer.lowercase,
+        'token_pattern': vectorizer.token_pattern, 'binary': vectorizer.binary,
+        'use_idf': vectorizer.use_idf, 'sublinear_tf': vectorizer.sublinear_tf,
+        'norm': vectorizer.norm, 'kind': kind, 'multi_class': multi,
+    }
+    if check:
+        diff = _max_score_diff(d, meta['compact'], model, vectorizer, terms)
+        meta['compact']['checked_max_diff'] = diff
+        if diff > SCORE_TOLERANCE:
+            raise ValueError(f'compact scores differ from joblib by {diff:g} (> {SCORE_TOLERANCE:g})')
+    meta_path.write_text(json.dumps(meta))
+    return meta['compact']
+
+
+def _max_score_diff(artifacts_dir, header, model, vectorizer, terms, n_docs=200):
+    rng = np.random.default_rng(0)
+    words = [t.decode('utf-8') for t in terms] or ['empty']
+    docs = [' '.join(rng.choice(words, size=rng.integers(1, 40))) for _ in range(n_docs)]
+    docs += ['', 'zzzz unseen tokens only']
+    cv, cm = load_compact(artifacts_dir, header)
+    X_ref = vectorizer.transform(docs)
+    X_new = cv.transform(docs)
+    if cm.kind == 'logistic' and hasattr(model, 'predict_proba'):
+        return float(np.abs(model.predict_proba(X_ref) - cm.predict_proba(X_new)).max())
+    return float(np.abs(model.decision_function(X_ref) - cm.decision_function(X_new)).max())
+
+
+class CompactVectorizer:
+    """Drop-in for the fitted TfidfVectorizer's `transform` over the compact arrays.
+
+    Reproduces scikit-learn's default word analyzer (lowercase, `token_pattern`, word
+    n-grams) and the TF-IDF weighting and normalization.
+    """
+
+    def __init__(self, vocab, idf, header):
+        self.vocab = vocab
+        self.idf = idf
+        self.header = header
+        self.ngram_range = tuple(header['ngram_range'])
+        self._token = re.compile(header['token_pattern'])
+        self._width = vocab.dtype.itemsize
+
+    def _analyze(self, doc):
+        if self.header['lowercase']:
+            doc = doc.lower()
+        tokens = self._token.findall(doc)
+        min_n, max_n = self.ngram_range
+        if max_n == 1:
+            return tokens
+        # same n-gram order as sklearn's _word_ngrams (only the counts matter here)
+        grams = list(tokens) if min_n == 1 else []
+        for n in range(max(min_n, 2), min(max_n, len(tokens)) + 1):
+            grams.extend(' '.join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        return grams
+
+    def transform(self, docs):
+        indptr, indices, data = [0], [], []
+        for doc in docs:
+            counts = Counter(self._analyze(doc))
+            keys = [t.encode('utf-8') for t in counts]
+            # longer terms cannot be in the vocabulary and would be truncated by the cast
+            keep = [i for i, k in enumerate(keys) if len(k) <= self._width]
+            if keep and len(self.vocab):
+                probe = np.array([keys[i] for i in keep], dtype=self.vocab.dtype)
+                pos = np.searchsorted(self.vocab, probe)
+                pos[pos == len(self.vocab)] = 0
+                hit = self.vocab[pos] == probe
+                values = list(counts.values())
+                indices.extend(pos[hit].tolist())
+                data.extend(values[keep[i]] for i in np.flatnonzero(hit))
+            indptr.append(len(indices))
+        X = sp.csr_matrix((np.asarray(data, dtype=np.float64), np.asarray(indices, dtype=np.int32),
+                           np.asarray(indptr, dtype=np.int64)), shape=(len(indptr) - 1, len(self.vocab)))
+        X.sort_indices()
+        if self.header['binary']:
+            X.data[:] = 1.0
+        if self.header['sublinear_tf']:
+            np.log(X.data, X.data)
+            X.data += 1.0
+        if self.idf is not None:
+            X = X @ sp.diags(np.asarray(self.idf))
+            X = X.tocsr()
+        norm = self.header['norm']
+        if norm:
+            if norm == 'l2':
+                lengths = np.sqrt(np.asarray(X.multiply(X).sum(axis=1)).ravel())
+            else:
+                lengths = np.asarray(abs(X).sum(axis=1)).ravel()
+            lengths[lengths == 0] = 1.0
+            X = sp.diags(1.0 / lengths) @ X
+            X = X.tocsr()
+        return X
+
+    def get_feature_names_out(self):
+        return np.array([t.decode('utf-8') for t in self.vocab], dtype=object)
+
+
+class CompactLinearModel:
+    """Linear classifier over memory-mapped float32 coefficients."""
+
+    def __init__(self, coef, intercept, classes, kind, multi_class):
+        self.coef_ = coef
+        self.intercept_ = intercept
+        self.classes_ = classes
+        self.kind = kind
+        self.multi_class = multi_class
+
+    def __getattr__(self, name):
+        # only logistic models have probabilities; hide predict_proba from hasattr() otherwise
+        if name == 'predict_proba' and self.kind == 'logistic':
+            return self._predict_proba
+        raise AttributeError(name)
+
+    def decision_function(self, X):
+        # gather just the coefficients of the columns present in X: converting the whole
+        # mmapped float32 matrix to float64 on every call cost more than the product itself
+        X = sp.csr_matrix(X)
+        rows = np.repeat(np.arange(X.shape[0]), np.diff(X.indptr))
+        w = np.asarray(self.coef_[:, X.indices], dtype=np.float64) * X.data
+        d = np.stack([np.bincount(rows, weights=wc, minlength=X.shape[0]) for wc in w], axis=1) + self.intercept_
+        return d.ravel() if d.shape[1] == 1 else d
+
+    def _predict_proba(self, X):
+        d = self.decision_function(X)
+        if d.ndim == 1:
+            p = 1.0 / (1.0 + np.exp(-d))
+            return np.column_stack([1.0 - p, p])
+        if self.multi_class == 'multinomial':
+            e = np.exp(d - d.max(axis=1, keepdims=True))
+            return e / e.sum(axis=1, keepdims=True)
+        p = 1.0 / (1.0 + np.exp(-d))
+        return p / p.sum(axis=1, keepdims=True)
+
+    def predict(self, X):
+        d = self.decision_function(X)
+        return self.classes_[(d > 0).astype(int)] if d.ndim == 1 else self.classes_[d.argmax(axis=1)]
+
+
+def has_compact(artifacts_dir):
+    """The `compact` header from meta.json when the compact files are present, else None."""
+    d = Path(artifacts_dir)
+    try:
+        header = json.loads((d / 'meta.json').read_text()).get('compact')
+    except (OSError, ValueError):
+        return None
+    if not header or header.get('version') != FORMAT_VERSION:
+        return None
+    required = [n for n in COMPACT_FILES if n != 'compact_idf.npy' or header.get('use_idf')]
+    return header if all((d / n).exists() for n in required) else None
+
+
+def load_compact(artifacts_dir, header=None):
+    """Memory-map the compact files; returns (CompactVectorizer, CompactLinearModel)."""
+    d = Path(artifacts_dir)
+    header = header or has_compact(d)
+    if header is None:
+        raise FileNotFoundError(f'no compact artifacts in {d}')
+    load = lambda name: np.load(d / name, mmap_mode='r', allow_pickle=False)
+    idf = load('compact_idf.npy') if header['use_idf'] else None
+    vectorizer = CompactVectorizer(load('compact_vocab.npy'), idf, header)
+    model = CompactLinearModel(load('compact_coef.npy'), np.load(d / 'compact_intercept.npy'),
+                               np.load(d / 'compact_classes.npy'), header['kind'], header['multi_class'])
+    return vectorizer, model
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Export joblib artifacts to the compact format.')
+    parser.add_argument('artifacts', nargs='?', default='./artifacts')
+    parser.add_argument('--no-check', action='store_true', help='skip the score comparison against joblib')
+    args = parser.parse_args()
+    header = export_compact(args.artifacts, check=not args.no_check)
+    print('Compact artifacts written to', args.artifacts, header)
@@ -0,0 +1,282 @@
+"""Persistent, sharded index of every processed resume, for recruiter search.
+
+Each resume is stored as its L2-normalized TF-IDF row (from the Predictor's vectorizer)
+plus a small metadata record, so a job description can be scored against millions of
+resumes with sparse dot products. The index is a directory of shards:
+
+    manifest.json            vectorizer fingerprint, shard size
+    shard-00000/data.f32     non-zero values of all rows, appended
+                indices.i32  their column numbers
+                offsets.i64  per row: end offset in data/indices, end offset in meta.jsonl
+                meta.jsonl   one JSON object per row (id, file, label, score, ...)
+
+Shards are append-only raw arrays opened with `np.memmap`, so a query maps only the
+pages it touches and several processes share them through the OS page cache. Appends go
+to the last shard until it holds `shard_rows` rows, then a new shard is started. A
+shard's row count is the length of `offsets.i64`, which is written last, so a crash
+mid-append leaves at most some unreferenced bytes behind (trimmed by the next append).
+Queries score every shard on a thread pool, merge the per-shard top k, and report
+latency and mapped memory per shard.
+
+    python -m model.corpus_index search job.txt --index ./corpus -k 20
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import scipy.sparse as sp
+
+from utils.clean import clean_text
+
+from .predict import vectorizer_fingerprint
+
+SHARD_ROWS = 250_000
+
+
+class _Shard:
+    def __init__(self, path, n_features):
+        self.path = Path(path)
+        self.n_features = n_features
+        self._mapped = None   # (rows, csr matrix) for the row count it was mapped at
+
+    @property
+    def rows(self):
+        try:
+            return (self.path / 'offsets.i64').stat().st_size // 16
+        except OSError:
+            return 0
+
+    def matrix(self):
+        rows = self.rows
+        if self._mapped is None or self._mapped[0] != rows:
+            if rows == 0:
+                return None
+            offsets = np.memmap(self.path / 'offsets.i64', dtype=np.int64, mode='r', shape=(rows, 2))[:, 0]
+            nnz = int(offsets[-1])
+            data = np.memmap(self.path / 'data.f32', dtype=np.float32, mode='r', shape=(nnz,)) if nnz else np.empty(0, np.float32)
+            indices = np.memmap(self.path / 'indices.i32', dtype=np.int32, mode='r', shape=(nnz,)) if nnz else np.empty(0, np.int32)
+            indptr = np.concatenate([[0], offsets])
+            self._mapped = (rows, sp.csr_matrix((data, indices, indptr), shape=(rows, self.n_features), copy=False))
+        return self._mapped[1]
+
+    def mapped_bytes(self):
+        return sum((self.path / n).stat().st_size for n in ('data.f32', 'indices.i32', 'offsets.i64')
+                   if (self.path / n).exists())
+
+    def _row_end(self, row):
+        """(data end, meta end) offsets of `row`; (0, 0) before the first row."""
+        if row < 0:
+            return 0, 0
+        with open(self.path / 'offsets.i64', 'rb') as f:
+            f.seek(row * 16)
+            data_end, meta_end = np.frombuffer(f.read(16), dtype=np.int64)
+        return int(data_end), int(meta_end)
+
+    def meta(self, rows):
+        """Metadata records for the given row numbers, read by seeking to each line."""
+        offsets = np.memmap(self.path / 'offsets.i64', dtype=np.int64, mode='r', shape=(self.rows, 2))[:, 1]
+        out = {}
+        with open(self.path / 'meta.jsonl', 'rb') as f:
+            for r in sorted(int(r) for r in rows):
+                f.seek(int(offsets[r - 1]) if r else 0)
+                out[r] = json.loads(f.read(int(offsets[r]) - f.tell()))
+        return out
+
+    def append(self, X, records):
+        """Append CSR rows and their metadata; offsets are written last.
+
+        Only whole 16-byte offset entries count as committed rows. Anything past them in
+        any of the files was left by an interrupted append and is cut off first.
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        rows = self.rows
+        base, meta_base = self._row_end(rows - 1)
+        # drop bytes left behind by an interrupted append before writing new rows
+        for name, itemsize in (('data.f32', 4), ('indices.i32', 4)):
+            with open(self.path / name, 'ab') as f:
+                f.truncate(base * itemsize)
+                f.write(X.data.astype(np.float32).tobytes() if name == 'data.f32'
+                        else X.indices.astype(np.int32).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+        lines = [(json.dumps(rec, ensure_ascii=False) + '\n').encode('utf-8') for rec in records]
+        with open(self.path / 'meta.jsonl', 'ab') as f:
+            f.truncate(meta_base)
+            f.write(b''.join(lines))
+            f.flush()
+            os.fsync(f.fileno())
+        ends = np.empty((len(lines), 2), dtype=np.int64)
+        ends[:, 0] = base + X.indptr[1:]
+        ends[:, 1] = meta_base + np.cumsum([len(line) for line in lines])
+        with open(self.path / 'offsets.i64', 'ab') as f:
+            f.truncate(rows * 16)
+            f.write(ends.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class CorpusIndex:
+    def __init__(self, directory, vectorizer, shard_rows=SHARD_ROWS, query_workers=None):
+        self.dir = Path(directory)
+        self.vectorizer = vectorizer
+        self.n_features, self.fingerprint = vectorizer_fingerprint(vectorizer)
+        self.query_workers = query_workers or min(8, os.cpu_count() or 1)
+        self._lock = threading.Lock()
+        manifest = self.dir / 'manifest.json'
+        if manifest.exists():
+            info = json.loads(manifest.read_text())
+            if info['fingerprint'] != self.fingerprint:
+                raise ValueError(f'{self.dir} was built with a different vectorizer; rebuild the index '
+                                 'or point to the artifacts it was built with')
+            self.shard_rows = info['shard_rows']
+        else:
+            self.shard_rows = shard_rows
+            self.dir.mkdir(parents=True, exist_ok=True)
+            manifest.write_text(json.dumps({'fingerprint': self.fingerprint, 'n_features': self.n_features,
+                                            'shard_rows': shard_rows}))
+        self.shards = [_Shard(p, self.n_features) for p in sorted(self.dir.glob('shard-*'))]
+
+    def __len__(self):
+        return sum(s.rows for s in self.shards)
+
+    def _vectorize(self, cleaned_texts):
+        X = self.vectorizer.transform(list(cleaned_texts)).astype(np.float32).tocsr()
+        norms = np.sqrt(np.asarray(X.multiply(X).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        X = (sp.diags(1.0 / norms) @ X).tocsr()
+        X.sort_indices()
+        return X
+
+    def _file_lock(self):
+        # one writer at a time, also across processes (app + batch_score)
+        f = open(self.dir / '.lock', 'a')
+        try:
+            import fcntl
+            fcntl.flock(f, fcntl.LOCK_EX)
+        except ImportError:
+            pass
+        return f
+
+    def append(self, cleaned_texts, records):
+        """Add resumes: cleaned texts plus one metadata dict each (should include an 'id')."""
+        records = list(records)
+        if not records:
+            return 0
+        X = self._vectorize(cleaned_texts)
+        with self._lock:
+            lock = self._file_lock()
+            try:
+                # another process may have started shards since we looked
+                self.shards = [_Shard(p, self.n_features) for p in sorted(self.dir.glob('shard-*'))]
+                done = 0
+                while done < len(records):
+                    if not self.shards or self.shards[-1].rows >= self.shard_rows:
+                        self.shards.append(_Shard(self.dir / f'shard-{len(self.shards):05d}', self.n_features))
+                    shard = self.shards[-1]
+                    take = min(self.shard_rows - shard.rows, len(records) - done)
+                    shard.append(X[done:done + take], records[done:done + take])
+                    done += take
+            finally:
+                lock.close()
+        return len(records)
+
+    def _search_shard(self, shard, q, k):
+        t0 = time.perf_counter()
+        X = shard.matrix()
+        if X is None:
+            return shard, np.empty(0, np.int64), np.empty(0, np.float32), 0.0
+        scores = np.asarray(X @ q).ravel()
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        return shard, top, scores[top], time.perf_counter() - t0
+
+    def search(self, text, k=20):
+        """Best `k` resumes for a job description.
+
+        Returns (results, shard_stats): results are dicts of the stored metadata plus
+        'similarity' (cosine), best first, one per resume id; shard_stats has rows,
+        latency_ms and mapped_mb for every shard.
+        """
+        q = self._vectorize([clean_text(text)]).T.toarray().ravel()
+        if not q.any():
+            return [], []
+        # new shards written by other processes since the index was opened
+        self.shards = [_Shard(p, self.n_features) if i >= len(self.shards) else self.shards[i]
+                       for i, p in enumerate(sorted(self.dir.glob('shard-*')))]
+        # ask each shard for extra hits so duplicates of one resume cannot crowd out others
+        per_shard = k * 2
+        with ThreadPoolExecutor(max_workers=self.query_workers) as pool:
+            parts = list(pool.map(lambda s: self._search_shard(s, q, per_shard), self.shards))
+        candidates = sorted(((float(sc), shard, int(row)) for shard, rows, scores, _ in parts
+                             for row, sc in zip(rows, scores)), key=lambda c: -c[0])
+        by_shard = {}
+        for _, shard, row in candidates[:per_shard]:
+            by_shard.setdefault(shard, []).append(row)
+        metas = {shard: shard.meta(rows) for shard, rows in by_shard.items()}
+        results, seen = [], set()
+        for sc, shard, row in candidates[:per_shard]:
+            rec = metas[shard].get(row, {})
+            rid = rec.get('id', f'{shard.path.name}:{row}')
+            if rid in seen:
+                continue
+            seen.add(rid)
+            results.append(dict(rec, similarity=round(sc, 6)))
+            if len(results) == k:
+                break
+        stats = [{'shard': shard.path.name, 'rows': shard.rows, 'latency_ms': round(sec * 1000, 3),
+                  'mapped_mb': round(shard.mapped_bytes() / 2 ** 20, 3)} for shard, _, _, sec in parts]
+        return results, stats
+
+
+_open = {}
+_open_lock = threading.Lock()
+
+
+def get_corpus_index(directory, predictor):
+    """Process-wide CorpusIndex for `directory` and the predictor's vectorizer."""
+    key = str(Path(directory).resolve())
+    with _open_lock:
+        entry = _open.get(key)
+        if entry is None or entry[0] is not predictor:
+            entry = (predictor, CorpusIndex(directory, predictor.vectorizer))
+            _open[key] = entry
+        return entry[1]
+
+
+if __name__ == '__main__':
+    import sys
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+    from model.registry import find_artifacts_dir, get_predictor
+
+    parser = argparse.ArgumentParser(description='Search the resume corpus index with a job description.')
+    sub = parser.add_subparsers(dest='cmd', required=True)
+    s = sub.add_parser('search')
+    s.add_argument('job', help='text file with the job description')
+    s.add_argument('--index', required=True)
+    s.add_argument('--artifacts', default=None)
+    s.add_argument('-k', type=int, default=20)
+    st = sub.add_parser('stats')
+    st.add_argument('--index', required=True)
+    st.add_argument('--artifacts', default=None)
+    args = parser.parse_args()
+
+    artifacts_dir = args.artifacts or find_artifacts_dir(str(Path(__file__).resolve().parents[1]))
+    predictor = get_predictor(artifacts_dir)
+    if not predictor.ready:
+        raise SystemExit(f'no model artifacts in {artifacts_dir}')
+    index = CorpusIndex(args.index, predictor.vectorizer)
+    if args.cmd == 'stats':
+        print(json.dumps({'rows': len(index), 'shards': [{'shard': sh.path.name, 'rows': sh.rows,
+                          'mapped_mb': round(sh.mapped_bytes() / 2 ** 20, 3)} for sh in index.shards]}, indent=2))
+    else:
+        results, stats = index.search(Path(args.job).read_text(encoding='utf-8', errors='replace'), args.k)
+        for r in results:
+            print(f"{r['similarity']:.4f}\t{r.get('id', '')}\t{r.get('file', '')}\t{r.get('label', '')}")
+        for s_ in stats:
+            print(f"# {s_['shard']}: {s_['rows']} rows, {s_['latency_ms']} ms, {s_['mapped_mb']} MB mapped",
+                  file=sys.stderr)
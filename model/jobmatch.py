@@ -0,0 +1,269 @@
+"""Rank a resume against many job postings.
+
+`JobIndex` keeps every posting as one row of a sparse matrix, vectorized with the same
+vectorizer the Predictor uses, plus each row's norm. Scoring a resume is then a single
+sparse matrix-vector product (cosine similarity) followed by `np.argpartition` for the
+top k, so 20k postings take a few milliseconds.
+
+Postings can be added and removed without re-vectorizing the rest: new rows go to a
+small delta matrix that is merged into the main one once it grows past a fraction of
+it, and removed rows are masked out (tombstoned) until the next compaction.
+
+Rows are only comparable with resumes vectorized the same way, so the index records a
+fingerprint of its vectorizer. A saved index does not load against a different one; it
+has to be rebuilt with `--rebuild` after the model changes.
+
+    python -m model.jobmatch build postings.csv --out ./artifacts/jobs
+    python -m model.jobmatch query resume.pdf --index ./artifacts/jobs -k 10
+"""
+import argparse
+import json
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+import scipy.sparse as sp
+
+from utils.clean import clean_text
+
+from .predict import vectorizer_fingerprint
+
+# merge the delta into the main matrix once it has this share of the main matrix's rows
+DELTA_MERGE_RATIO = 0.1
+# rewrite the matrix without removed rows once they are this share of all rows
+COMPACT_RATIO = 0.25
+
+
+class JobIndex:
+    def __init__(self, vectorizer):
+        self.vectorizer = vectorizer
+        self.features = vectorizer_fingerprint(vectorizer)
+        self.ids = []          # row -> posting id (None once removed)
+        self.meta = {}         # posting id -> small dict, e.g. {'title': ...}
+        self._rows = {}        # posting id -> row
+        self._matrix = None    # merged rows, CSR float32
+        self._norms = np.empty(0, dtype=np.float32)
+        self._delta = []       # (rows CSR, norms) appended since the last merge
+        self._alive = np.empty(0, dtype=bool)
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _vectorize(self, texts):
+        X = self.vectorizer.transform([clean_text(t) for t in texts]).astype(np.float32).tocsr()
+        norms = np.sqrt(np.asarray(X.multiply(X).sum(axis=1), dtype=np.float32).ravel())
+        return X, norms
+
+    def add(self, postings):
+        """Add or replace postings given as (id, text) or (id, text, meta) tuples."""
+        postings = [p if len(p) == 3 else (p[0], p[1], {}) for p in postings]
+        # an id given twice in one batch: the last occurrence wins, as across batches
+        last = {p[0]: i for i, p in enumerate(postings)}
+        postings = [p for i, p in enumerate(postings) if last[p[0]] == i]
+        if not postings:
+            return
+        X, norms = self._vectorize([p[1] for p in postings])
+        with self._lock:
+            for pid, _, meta in postings:
+                if pid in self._rows:
+                    self._remove_locked(pid)
+            start = len(self.ids)
+            for i, (pid, _, meta) in enumerate(postings):
+                self.ids.append(pid)
+                self._rows[pid] = start + i
+                self.meta[pid] = meta
+            self._alive = np.concatenate([self._alive, np.ones(len(postings), dtype=bool)])
+            self._delta.append((X, norms))
+            main_rows = 0 if self._matrix is None else self._matrix.shape[0]
+            if sum(d[0].shape[0] for d in self._delta) > DELTA_MERGE_RATIO * main_rows:
+                self._merge()
+
+    def remove(self, posting_id):
+        """Remove a posting; returns False when it is not in the index."""
+        with self._lock:
+            if posting_id not in self._rows:
+                return False
+            self._remove_locked(posting_id)
+            if (~self._alive).sum() > COMPACT_RATIO * len(self._alive):
+                self.compact()
+            return True
+
+    def _remove_locked(self, posting_id):
+        row = self._rows.pop(posting_id)
+        self.meta.pop(posting_id, None)
+        self.ids[row] = None
+        self._alive[row] = False
+
+    def _merge(self):
+        parts = ([self._matrix] if self._matrix is not None else []) + [d[0] for d in self._delta]
+        if not parts:
+            return
+        self._matrix = sp.vstack(parts, format='csr', dtype=np.float32)
+        self._norms = np.concatenate([self._norms] + [d[1] for d in self._delta])
+        self._delta = []
+
+    def compact(self):
+        """Merge the delta and drop removed rows (row numbers change)."""
+        with self._lock:
+            self._merge()
+            if self._matrix is None or self._alive.all():
+                return
+            keep = np.flatnonzero(self._alive)
+            self._matrix = self._matrix[keep]
+            self._norms = self._norms[keep]
+            self.ids = [self.ids[i] for i in keep]
+            self._rows = {pid: i for i, pid in enumerate(self.ids)}
+            self._alive = np.ones(len(keep), dtype=bool)
+
+    def top_k(self, resume_text, k=10):
+        """Best `k` postings for a resume as [(posting id, cosine similarity, meta), ...]."""
+        if k <= 0:
+            return []
+        q = self.vectorizer.transform([clean_text(resume_text)]).astype(np.float32).tocsr()
+        q_norm = float(np.sqrt(q.multiply(q).sum()))
+        with self._lock:
+            self._merge()
+            if self._matrix is None or not len(self._rows) or q_norm == 0:
+                return []
+            scores = np.asarray(self._matrix @ q.T.toarray()).ravel()
+            norms = self._norms * q_norm
+            scores = np.divide(scores, norms, out=np.zeros_like(scores), where=norms > 0)
+            scores[~self._alive] = -np.inf
+            k = min(k, len(self._rows))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind='stable')]
+            return [(self.ids[i], float(scores[i]), self.meta.get(self.ids[i], {})) for i in top]
+
+    def save(self, directory):
+        """Write `jobs.npz`, `jobs_norms.npy` and `jobs.json` to `directory` (atomically per file)."""
+        d = Path(directory)
+        d.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self.compact()
+            matrix = self._matrix if self._matrix is not None else sp.csr_matrix((0, 0), dtype=np.float32)
+            for name, write in (('jobs.npz', lambda f: sp.save_npz(f, matrix)),
+                                ('jobs_norms.npy', lambda f: np.save(f, self._norms)),
+                                ('jobs.json', lambda f: f.write(json.dumps(
+                                    {'ids': self.ids, 'meta': self.meta,
+                                     'features': list(self.features)}).encode()))):
+                tmp = d / (name + '.tmp')
+                with open(tmp, 'wb') as f:
+                    write(f)
+                os.replace(tmp, d / name)
+
+    @classmethod
+    def load(cls, directory, vectorizer):
+        """Load a saved index. Raises ValueError when it was built with another vectorizer."""
+        d = Path(directory)
+        index = cls(vectorizer)
+        info = json.loads((d / 'jobs.json').read_text())
+        matrix = sp.load_npz(d / 'jobs.npz').tocsr().astype(np.float32)
+        # indexes saved before fingerprints were recorded can still be checked by width
+        stored = info.get('features')
+        if (stored is not None and tuple(stored) != index.features) or \
+                (matrix.shape[0] and matrix.shape[1] != index.features[0]):
+            raise ValueError(f'job index in {d} was built with a different vectorizer; rebuild it '
+                             'with `python -m model.jobmatch build --rebuild`')
+        if matrix.shape[0]:
+            index._matrix = matrix
+        index._norms = np.load(d / 'jobs_norms.npy')
+        index.ids = info['ids']
+        index.meta = info['meta']
+        index._rows = {pid: i for i, pid in enumerate(index.ids)}
+        index._alive = np.ones(len(index.ids), dtype=bool)
+        return index
+
+
+_loaded = {}
+_loaded_lock = threading.Lock()
+
+
+def get_job_index(directory, predictor):
+    """Process-wide JobIndex for `directory`, reloaded when its files or the predictor change.
+    Returns None when no index has been built there, or when it was built with a different
+    vectorizer than the predictor's (e.g. after a model swap) and needs rebuilding."""
+    d = Path(directory)
+    try:
+        stamp = (d / 'jobs.json').stat().st_mtime_ns
+    except OSError:
+        return None
+    key = str(d.resolve())
+    with _loaded_lock:
+        entry = _loaded.get(key)
+        if entry is None or entry[0] != stamp or entry[1] is not predictor:
+            try:
+                index = JobIndex.load(d, predictor.vectorizer)
+            except ValueError:
+                index = None
+            entry = (stamp, predictor, index)
+            _loaded[key] = entry
+        return entry[2]
+
+
+def _read_postings(csv_path, id_col, text_col, title_col):
+    import pandas as pd
+    for chunk in pd.read_csv(csv_path, chunksize=5000):
+        chunk = chunk.dropna(subset=[id_col, text_col])
+        for row in chunk.itertuples(index=False):
+            row = row._asdict()
+            meta = {'title': str(row[title_col])} if title_col and title_col in row else {}
+            yield str(row[id_col]), str(row[text_col]), meta
+
+
+if __name__ == '__main__':
+    import sys
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+    from model.registry import find_artifacts_dir, get_predictor
+
+    parser = argparse.ArgumentParser(description='Build or query the job posting index.')
+    sub = parser.add_subparsers(dest='cmd', required=True)
+    b = sub.add_parser('build', help='add postings from a CSV (existing ids are replaced)')
+    b.add_argument('csv')
+    b.add_argument('--id-col', default='id')
+    b.add_argument('--text-col', default='description')
+    b.add_argument('--title-col', default='title')
+    b.add_argument('--out', default=None, help='index directory (default: <artifacts>/jobs)')
+    b.add_argument('--artifacts', default=None)
+    b.add_argument('--rebuild', action='store_true', help='start from an empty index')
+    q = sub.add_parser('query', help='rank postings for a resume file (pdf / image / txt)')
+    q.add_argument('resume')
+    q.add_argument('--index', default=None)
+    q.add_argument('--artifacts', default=None)
+    q.add_argument('-k', type=int, default=10)
+    args = parser.parse_args()
+
+    artifacts_dir = args.artifacts or find_artifacts_dir(str(Path(__file__).resolve().parents[1]))
+    predictor = get_predictor(artifacts_dir)
+    if not predictor.ready:
+        raise SystemExit(f'no model artifacts in {artifacts_dir}')
+    if args.cmd == 'build':
+        out = args.out or str(Path(artifacts_dir) / 'jobs')
+        exists = (Path(out) / 'jobs.json').exists()
+        try:
+            index = JobIndex.load(out, predictor.vectorizer) if exists and not args.rebuild else JobIndex(predictor.vectorizer)
+        except ValueError as e:
+            raise SystemExit(str(e))
+        batch = []
+        for posting in _read_postings(args.csv, args.id_col, args.text_col, args.title_col):
+            batch.append(posting)
+            if len(batch) >= 2000:
+                index.add(batch)
+                batch = []
+        index.add(batch)
+        index.save(out)
+        print(f'{len(index)} postings indexed in {out}')
+    else:
+        try:
+            index = JobIndex.load(args.index or str(Path(artifacts_dir) / 'jobs'), predictor.vectorizer)
+        except ValueError as e:
+            raise SystemExit(str(e))
+        raw = Path(args.resume).read_bytes()
+        if args.resume.lower().endswith('.txt'):
+            text = raw.decode('utf-8', 'replace')
+        else:
+            from extract.detect import extract_text_from_bytes
+            text = extract_text_from_bytes(raw, name=args.resume)
+        for pid, score, meta in index.top_k(text, args.k):
+            print(f'{score:.4f}\t{pid}\t{meta.get("title", "")}')
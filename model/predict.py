@@ -1,17 +1,79 @@
+import hashlib
 import joblib
 from pathlib import Path
+from itertools import islice
 import os
+from typing import NamedTuple
 import numpy as np
 
+from utils.metrics import stage
+
+
+class Explanation(NamedTuple):
+    label: object
+    bias: float       # intercept toward `label`
+    positive: list    # [(term, contribution), ...] pushing toward `label`, largest first
+    negative: list    # [(term, contribution), ...] pushing away from it, most negative first
+
+
+def _inverse_vocab(vectorizer):
+    """Feature index -> term array, or None when the features have no names (hashing)."""
+    vocab = getattr(vectorizer, 'vocab', None)
+    if vocab is not None:
+        # CompactVectorizer: the sorted byte-string vocabulary already is index -> term
+        return vocab
+    mapping = getattr(vectorizer, 'vocabulary_', None)
+    if not mapping:
+        return None
+    terms = np.empty(len(mapping), dtype=object)
+    terms[np.fromiter(mapping.values(), dtype=np.int64, count=len(mapping))] = list(mapping.keys())
+    return terms
+
+
+def vectorizer_fingerprint(vectorizer):
+    """(n_features, digest) of a fitted vectorizer: the digest covers the term in each
+    column and the IDF weights, so a retrained or re-exported vectorizer differs."""
+    terms = _inverse_vocab(vectorizer)
+    h = hashlib.sha256()
+    if terms is None:
+        n_features = int(getattr(vectorizer, 'n_features', 0))
+        h.update(repr(sorted(vectorizer.get_params().items())).encode())
+    else:
+        n_features = len(terms)
+        # the compact export keeps terms as bytes; hash both forms alike
+        h.update(b'\0'.join(t if isinstance(t, bytes) else t.encode() for t in terms))
+    try:
+        idf = getattr(vectorizer, 'idf', None)
+        idf = vectorizer.idf_ if idf is None else idf
+    except AttributeError:
+        idf = None
+    if idf is not None:
+        h.update(np.ascontiguousarray(idf, dtype=np.float64).tobytes())
+    return n_features, h.hexdigest()
+
+
 class Predictor:
     def __init__(self, artifacts_dir='./artifacts'):
         self.artifacts_dir = Path(artifacts_dir)
         self.model = None
         self.vectorizer = None
         self.ready = False
+        self.terms = None
         self._load()
+        if self.ready:
+            self.terms = _inverse_vocab(self.vectorizer)
 
     def _load(self):
+        # prefer the memory-mapped compact export when meta.json announces one
+        try:
+            from .compact import has_compact, load_compact
+            header = has_compact(self.artifacts_dir)
+            if header is not None:
+                self.vectorizer, self.model = load_compact(self.artifacts_dir, header)
+                self.ready = True
+                return
+        except Exception:
+            pass
         try:
             self.model = joblib.load(self.artifacts_dir / 'model.joblib')
             self.vectorizer = joblib.load(self.artifacts_dir / 'vectorizer.joblib')
@@ -19,17 +81,125 @@ class Predictor:
         except Exception:
             self.ready = False
 
+    def _decide(self, X):
+        """Return (labels, scores) for a feature matrix from a single model evaluation.
+
+        Labels are taken from the same `predict_proba` / `decision_function` output as
+        the scores instead of calling `model.predict` separately. Scores are NaN when the
+        model exposes neither.
+        """
+        classes = self.model.classes_
+        if hasattr(self.model, 'predict_proba'):
+            proba = self.model.predict_proba(X)
+            idx = proba.argmax(axis=1)
+            return classes[idx], proba[np.arange(len(idx)), idx]
+        if hasattr(self.model, 'decision_function'):
+            try:
+                d = self.model.decision_function(X)
+                if d.ndim == 1:
+                    # binary: positive margin means classes_[1], score is the raw margin
+                    return classes[(d > 0).astype(int)], d
+                return classes[d.argmax(axis=1)], d.max(axis=1)
+            except Exception:
+                pass
+        labels = self.model.predict(X)
+        return labels, np.full(len(labels), np.nan)
+
     def predict_text(self, text):
         if not self.ready:
             raise RuntimeError('Artifacts not loaded.')
+        with stage('vectorize'):
+            X = self.vectorizer.transform([text])
+        with stage('predict'):
+            labels, scores = self._decide(X)
+        score = float(scores[0])
+        return labels[0], None if np.isnan(score) else score
+
+    @property
+    def can_explain(self):
+        """True for linear models over named features (TF-IDF, compact export)."""
+        return self.ready and self.terms is not None and hasattr(self.model, 'coef_')
+
+    def _explain_rows(self, X, labels, k):
+        """Top-k term contributions (tf-idf weight x coefficient) for each row of `X`.
+
+        Only the row's nonzeros are touched, so the cost is O(nnz) per resume.
+        """
+        coef = self.model.coef_
+        intercept = np.ravel(self.model.intercept_)
+        classes = list(self.model.classes_)
+        out = []
+        for r, label in enumerate(labels):
+            lo, hi = X.indptr[r], X.indptr[r + 1]
+            idx, vals = X.indices[lo:hi], X.data[lo:hi]
+            c = classes.index(label)
+            if coef.shape[0] == 1:
+                # binary: the single row points toward classes_[1]
+                sign = 1.0 if c == 1 else -1.0
+                w = sign * np.asarray(coef[0, idx], dtype=np.float64) * vals
+                bias = sign * float(intercept[0])
+            else:
+                w = np.asarray(coef[c, idx], dtype=np.float64) * vals
+                bias = float(intercept[c])
+            out.append(Explanation(label, bias, self._top_terms(idx, w, k), self._top_terms(idx, -w, k, -1.0)))
+        return out
+
+    def _top_terms(self, idx, w, k, sign=1.0):
+        pos = np.flatnonzero(w > 0)
+        if len(pos) > k:
+            pos = pos[np.argpartition(-w[pos], k - 1)[:k]]
+        pos = pos[np.argsort(-w[pos], kind='stable')]
+        terms = []
+        for i in pos:
+            term = self.terms[idx[i]]
+            terms.append((term.decode('utf-8') if isinstance(term, bytes) else str(term), sign * float(w[i])))
+        return terms
+
+    def explain(self, text, k=10, label=None):
+        """Explain the prediction for `text`, or None when the model cannot be explained.
+
+        `label` defaults to the predicted one; pass it when the prediction is already known
+        to skip the model evaluation.
+        """
+        if not self.can_explain:
+            return None
         X = self.vectorizer.transform([text])
-        pred = self.model.predict(X)[0]
-        score = None
-        if hasattr(self.model, 'predict_proba'):
-            score = float(self.model.predict_proba(X)[0].max())
-        elif hasattr(self.model, 'decision_function'):
-            try:
-                score = float(self.model.decision_function(X)[0])
-            except Exception:
-                score = None
-        return pred, score
\ No newline at end of file
+        if label is None:
+            label = self._decide(X)[0][0]
+        return self._explain_rows(X, [label], k)[0]
+
+    def predict_batch(self, texts, chunk_size=1024, explain_k=0):
+        """Predict an iterable of cleaned texts.
+
+        Texts are vectorized `chunk_size` rows at a time into one sparse matrix per chunk,
+        so memory stays bounded on very large inputs. Returns `(labels, scores)` NumPy
+        arrays aligned with the input order; scores are float32 and NaN when the model
+        cannot produce one.
+
+        With `explain_k` > 0 a third element is returned: an `Explanation` per text (None
+        when the model cannot be explained), computed from the same chunk matrices.
+        """
+        if not self.ready:
+            raise RuntimeError('Artifacts not loaded.')
+        if chunk_size < 1:
+            raise ValueError('chunk_size must be >= 1')
+        it = iter(texts)
+        all_labels, all_scores, explanations = [], [], []
+        while True:
+            chunk = list(islice(it, chunk_size))
+            if not chunk:
+                break
+            with stage('vectorize'):
+                X = self.vectorizer.transform(chunk)
+            with stage('predict'):
+                labels, scores = self._decide(X)
+            all_labels.append(labels)
+            all_scores.append(scores.astype(np.float32))
+            if explain_k > 0:
+                explanations.extend(self._explain_rows(X, labels, explain_k) if self.can_explain
+                                    else [None] * len(chunk))
+        if not all_labels:
+            result = np.empty(0, dtype=self.model.classes_.dtype), np.empty(0, dtype=np.float32)
+        else:
+            result = np.concatenate(all_labels), np.concatenate(all_scores)
+        return result + (explanations,) if explain_k > 0 else result
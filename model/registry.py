@@ -0,0 +1,174 @@
+"""Process-wide Predictor registry.
+
+Streamlit reruns `app.py` from the top on every widget interaction, and every session
+runs in the same process. Loading the artifacts once here and handing the same
+Predictor to every rerun avoids repeating the artifact-directory search and the
+`joblib.load` of the model and vectorizer. The shared instance is replaced only when
+the artifact files actually change on disk, or when model/store.py swaps in a new
+version (then the files come from `versions/<CURRENT>` instead of the directory itself).
+"""
+import hashlib
+import threading
+from functools import lru_cache
+from pathlib import Path
+
+ARTIFACT_FILES = ('model.joblib', 'vectorizer.joblib', 'meta.json')
+# written by `python -m model.compact`; see model/compact.py
+COMPACT_FILES = ('compact_vocab.npy', 'compact_idf.npy', 'compact_coef.npy',
+                 'compact_intercept.npy', 'compact_classes.npy')
+
+_lock = threading.Lock()
+# resolved artifacts dir -> {'stat': ..., 'digest': ..., 'predictor': Predictor,
+#                            'standby': the Predictor it replaced, or None}
+# entries are replaced whole, never mutated in place, so readers need no lock
+_shared = {}
+# called with each Predictor that drops out of the registry; see `on_retire`
+_retire_hooks = []
+
+
+@lru_cache(maxsize=None)
+def find_artifacts_dir(base):
+    """Locate the artifacts directory under `base` (searched once per process)."""
+    base = Path(base)
+    for d in (base / 'artifacts', base / 'model' / 'artifacts', base / 'models' / 'artifacts'):
+        if d.exists():
+            return str(d)
+    # also check for artifacts inside a nested package (common when running from different cwd)
+    for d in base.rglob('artifacts'):
+        return str(d)
+    return str(base / 'artifacts')
+
+
+def _current_version(artifacts_dir):
+    try:
+        return (Path(artifacts_dir) / 'CURRENT').read_text(encoding='utf-8').strip() or None
+    except OSError:
+        return None
+
+
+def active_artifacts_dir(artifacts_dir):
+    """Where the active files live: the version named by CURRENT, else the dir itself.
+    Anything that loads a Predictor without `get_predictor` should resolve it here."""
+    version = _current_version(artifacts_dir)
+    return Path(artifacts_dir) if version is None else Path(artifacts_dir) / 'versions' / version
+
+
+def _stat_fingerprint(artifacts_dir):
+    version = _current_version(artifacts_dir)
+    if version is not None:
+        # versions are immutable once staged, so the id is fingerprint enough
+        return ('version', version)
+    out = []
+    for name in ARTIFACT_FILES + COMPACT_FILES:
+        try:
+            st = (Path(artifacts_dir) / name).stat()
+            out.append((name, st.st_mtime_ns, st.st_size))
+        except OSError:
+            out.append((name, None, None))
+    return tuple(out)
+
+
+def _content_digest(artifacts_dir):
+    h = hashlib.sha256()
+    for name in ARTIFACT_FILES + COMPACT_FILES:
+        p = Path(artifacts_dir) / name
+        h.update(name.encode())
+        if p.exists():
+            with open(p, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    h.update(block)
+    return h.hexdigest()
+
+
+def artifacts_present(artifacts_dir, active=True):
+    """True when the model and vectorizer files, or their compact export, exist (no
+    loading involved). `active=False` looks at the directory itself, not CURRENT."""
+    d = active_artifacts_dir(artifacts_dir) if active else Path(artifacts_dir)
+    if (d / 'model.joblib').exists() and (d / 'vectorizer.joblib').exists():
+        return True
+    return (d / 'compact_vocab.npy').exists() and (d / 'compact_coef.npy').exists()
+
+
+def on_retire(hook):
+    """Call `hook(predictor)` whenever a Predictor is retired, i.e. is neither the shared
+    one nor the standby any more, so resources tied to it (e.g. its micro-batcher) can be
+    released. Callers still holding it may keep using it."""
+    _retire_hooks.append(hook)
+
+
+def _retired(old, new):
+    if old is None:
+        return []
+    keep = (new['predictor'], new['standby'])
+    return [p for p in (old['predictor'], old['standby'])
+            if p is not None and not any(p is k for k in keep)]
+
+
+def _retire(predictors):
+    for predictor in predictors:
+        for hook in _retire_hooks:
+            hook(predictor)
+
+
+def peek_predictor(artifacts_dir, standby=False):
+    """Return the shared Predictor if one has been loaded already, else None.
+
+    Unlike `get_predictor` this never loads anything, so callers can show model status
+    without paying for the scikit-learn import and `joblib.load` on a cold start.
+    `standby=True` returns the Predictor the current one replaced, kept for rollback.
+    """
+    entry = _shared.get(str(Path(artifacts_dir).resolve()))
+    return None if entry is None else entry['standby' if standby else 'predictor']
+
+
+def install_predictor(artifacts_dir, predictor, commit=None):
+    """Atomically make `predictor` the shared one for `artifacts_dir`.
+
+    `commit()` (e.g. rewriting CURRENT) runs under the registry lock just before the
+    swap, so no `get_predictor` call can observe the new files with the old Predictor
+    and reload them itself. Readers holding the previous Predictor finish with it; it
+    stays reachable as the standby for an instant rollback.
+    """
+    key = str(Path(artifacts_dir).resolve())
+    # hashed before taking the lock; the swap itself is a single dict assignment
+    digest = _content_digest(predictor.artifacts_dir)
+    with _lock:
+        if commit is not None:
+            commit()
+        old = _shared.get(key)
+        new = {'stat': _stat_fingerprint(key), 'digest': digest, 'predictor': predictor,
+               'standby': None if old is None else old['predictor']}
+        _shared[key] = new
+    _retire(_retired(old, new))
+
+
+def get_predictor(artifacts_dir, force=False):
+    """Return the shared Predictor for `artifacts_dir`, loading or reloading it if needed.
+
+    The files' mtime and size are checked on every call; only when they change is the
+    content hashed, and the Predictor is rebuilt only when the hash differs too (so
+    re-extracting identical files does not trigger a reload). `force=True` always
+    rebuilds, e.g. for an explicit "Reload model" action.
+    """
+    key = str(Path(artifacts_dir).resolve())
+    stat = _stat_fingerprint(key)
+    entry = _shared.get(key)
+    if not force and entry is not None and entry['stat'] == stat:
+        return entry['predictor']
+    with _lock:
+        entry = _shared.get(key)
+        if not force and entry is not None and entry['stat'] == stat:
+            return entry['predictor']
+        source = active_artifacts_dir(key)
+        digest = _content_digest(source)
+        if not force and entry is not None and entry['digest'] == digest:
+            _shared[key] = dict(entry, stat=stat)
+            return entry['predictor']
+        # imported here so importing the registry does not pull in joblib / scikit-learn
+        from .predict import Predictor
+        predictor = Predictor(artifacts_dir=source)
+        new = {'stat': stat, 'digest': digest, 'predictor': predictor,
+               'standby': None if entry is None else entry['predictor']}
+        _shared[key] = new
+    _retire(_retired(entry, new))
+    return predictor
@@ -0,0 +1,301 @@
+"""Versioned artifact store with validated uploads and atomic hot-swap.
+
+Uploaded artifact zips never touch the files a live Predictor reads. Each upload is
+streamed member by member into a private staging directory, with limits on member count,
+member size and total size, and with every member name checked against the known
+artifact files. The staged files then become an immutable version:
+
+    <artifacts_dir>/versions/<version>/   model.joblib, vectorizer.joblib, meta.json, ...
+    <artifacts_dir>/CURRENT               id of the active version
+    <artifacts_dir>/history.json          activations, newest last
+
+Activating a version loads it and smoke-scores a few texts on a background thread while
+every reader keeps using the current model. Only a model that passes is swapped in: the
+registry writes CURRENT and replaces its shared Predictor reference in one step, keeping
+the previous Predictor next to it so `rollback()` is just another swap. Loose files
+directly in `<artifacts_dir>` (the pre-store layout) act as the base version.
+
+    python -m model.store ./artifacts list
+    python -m model.store ./artifacts upload artifacts.zip
+    python -m model.store ./artifacts rollback
+"""
+import argparse
+import json
+import os
+import shutil
+import stat
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path, PurePosixPath
+
+from .registry import (ARTIFACT_FILES, COMPACT_FILES, _content_digest, artifacts_present, install_predictor,
+                       peek_predictor)
+
+MAX_TOTAL_BYTES = int(os.environ.get('ATS_ARTIFACT_MAX_BYTES', 1 << 30))
+MAX_MEMBERS = 32
+CHUNK = 1 << 20
+KEEP_VERSIONS = 5
+# cleaned texts scored before a version may go live
+SMOKE_TEXTS = ('python developer sql aws data pipelines machine learning',
+               'retail store associate customer service cash handling inventory', '')
+BASE = None   # version id of the loose files in the artifacts dir
+
+
+class ArtifactError(ValueError):
+    """Raised for an upload that is rejected or a version that fails to load."""
+
+
+def _member_name(info):
+    """The artifact file name for a zip member, None for members to skip, or raise."""
+    path = PurePosixPath(info.filename.replace('\\', '/'))
+    if path.is_absolute() or '..' in path.parts or (path.parts and ':' in path.parts[0]):
+        raise ArtifactError(f'unsafe path in zip: {info.filename!r}')
+    if info.is_dir() or not path.parts:
+        return None
+    # macOS resource forks and dotfiles come along when a folder is zipped in Finder
+    if path.parts[0] == '__MACOSX' or path.name.startswith('.'):
+        return None
+    if stat.S_ISLNK(info.external_attr >> 16):
+        raise ArtifactError(f'symlinks are not allowed: {info.filename!r}')
+    if len(path.parts) > 2:
+        raise ArtifactError(f'unexpected nesting: {info.filename!r}')
+    if path.name not in ARTIFACT_FILES + COMPACT_FILES:
+        raise ArtifactError(f'unexpected file in zip: {info.filename!r}')
+    return path.name
+
+
+class ArtifactStore:
+    def __init__(self, artifacts_dir, max_total_bytes=MAX_TOTAL_BYTES, keep=KEEP_VERSIONS):
+        self.root = Path(artifacts_dir)
+        self.max_total_bytes = max_total_bytes
+        self.keep = keep
+        self._history_lock = threading.Lock()
+        # one activation at a time, off the caller's thread
+        self._loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ats-artifacts')
+
+    # -- layout ---------------------------------------------------------------------
+
+    def version_dir(self, version):
+        return self.root if version is BASE else self.root / 'versions' / version
+
+    def current(self):
+        """Id of the active version, or None when the loose files are active."""
+        try:
+            return (self.root / 'CURRENT').read_text(encoding='utf-8').strip() or BASE
+        except OSError:
+            return BASE
+
+    def versions(self):
+        d = self.root / 'versions'
+        return sorted(p.name for p in d.iterdir() if p.is_dir()) if d.exists() else []
+
+    def history(self):
+        try:
+            return json.loads((self.root / 'history.json').read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return []
+
+    def _record(self, version, action):
+        with self._history_lock:
+            hist = self.history()
+            hist.append({'version': version, 'action': action, 'at': int(time.time())})
+            tmp = self.root / f'history.json.{os.getpid()}.tmp'
+            tmp.write_text(json.dumps(hist[-100:], indent=1), encoding='utf-8')
+            os.replace(tmp, self.root / 'history.json')
+
+    def previous(self):
+        """The version that was active before the current one (None = loose files)."""
+        current = self.current()
+        for entry in reversed(self.history()):
+            if entry['version'] != current:
+                return entry['version']
+        return BASE
+
+    # -- staging --------------------------------------------------------------------
+
+    def stage(self, fileobj):
+        """Validate and stream-extract an artifacts zip into a new version; returns its id.
+
+        `fileobj` is any seekable binary file (a Streamlit upload, an open file) or a path.
+        Nothing is loaded yet; see `activate`.
+        """
+        try:
+            zf = zipfile.ZipFile(fileobj)
+        except (zipfile.BadZipFile, OSError) as e:
+            raise ArtifactError(f'not a zip archive: {e}')
+        staging_root = self.root / '.staging'
+        staging_root.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(dir=staging_root))
+        try:
+            with zf:
+                self._extract(zf, staging)
+            names = {p.name for p in staging.iterdir()}
+            complete = {'model.joblib', 'vectorizer.joblib'} <= names or set(COMPACT_FILES) <= names
+            if not complete:
+                raise ArtifactError('zip needs model.joblib and vectorizer.joblib (or a full compact export)')
+            digest = _content_digest(staging)[:12]
+            version = f"{time.strftime('%Y%m%d-%H%M%S')}-{digest}"
+            for existing in self.versions():
+                if existing.endswith(digest):
+                    return existing
+            (self.root / 'versions').mkdir(exist_ok=True)
+            os.replace(staging, self.version_dir(version))
+            return version
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def _extract(self, zf, staging):
+        infos = zf.infolist()
+        if len(infos) > MAX_MEMBERS:
+            raise ArtifactError(f'zip has {len(infos)} members; at most {MAX_MEMBERS} allowed')
+        total = 0
+        seen = set()
+        for info in infos:
+            name = _member_name(info)
+            if name is None:
+                continue
+            if name in seen:
+                raise ArtifactError(f'{name} appears more than once')
+            seen.add(name)
+            if total + info.file_size > self.max_total_bytes:
+                raise ArtifactError(f'artifacts exceed {self.max_total_bytes} bytes uncompressed')
+            # declared sizes can lie: count what actually comes out of the decompressor
+            with zf.open(info) as src, open(staging / name, 'wb') as dst:
+                while True:
+                    block = src.read(CHUNK)
+                    if not block:
+                        break
+                    total += len(block)
+                    if total > self.max_total_bytes:
+                        raise ArtifactError(f'artifacts exceed {self.max_total_bytes} bytes uncompressed')
+                    dst.write(block)
+
+    # -- activation -----------------------------------------------------------------
+
+    def _load(self, version):
+        # imported here so the app can import the store without numpy / scikit-learn
+        import numpy as np
+        from .predict import Predictor
+        d = self.version_dir(version)
+        if version is not BASE and not d.is_dir():
+            raise ArtifactError(f'unknown version {version!r}')
+        predictor = Predictor(artifacts_dir=d)
+        if not predictor.ready:
+            raise ArtifactError(f'version {version!r} does not load')
+        try:
+            labels, scores = predictor.predict_batch(SMOKE_TEXTS)
+        except Exception as e:
+            raise ArtifactError(f'version {version!r} failed the smoke test: {type(e).__name__}: {e}')
+        if len(labels) != len(SMOKE_TEXTS) or not np.all(np.isin(labels, predictor.model.classes_)) \
+                or np.any(np.isinf(scores)):
+            raise ArtifactError(f'version {version!r} failed the smoke test: unexpected output')
+        return predictor
+
+    def _swap(self, version, predictor, action):
+        def commit():
+            if version is BASE:
+                try:
+                    os.remove(self.root / 'CURRENT')
+                except FileNotFoundError:
+                    pass
+            else:
+                tmp = self.root / f'CURRENT.{os.getpid()}.tmp'
+                tmp.write_text(version, encoding='utf-8')
+                os.replace(tmp, self.root / 'CURRENT')
+        install_predictor(self.root, predictor, commit)
+        self._record(version, action)
+
+    def activate(self, version):
+        """Load and smoke-test `version`, then swap it in. Blocks the caller; readers are
+        never blocked. Returns the new Predictor; raises ArtifactError if it fails."""
+        if not self.history():
+            # remember what was live before the first swap so it can be rolled back to
+            self._record(self.current(), 'initial')
+        try:
+            predictor = self._load(version)
+        except ArtifactError:
+            if version not in (self.current(), self.previous()):
+                shutil.rmtree(self.version_dir(version), ignore_errors=True)
+            raise
+        self._swap(version, predictor, 'activate')
+        self._prune()
+        return predictor
+
+    def activate_async(self, version):
+        """`activate` on the store's background thread; returns a Future."""
+        return self._loader.submit(self.activate, version)
+
+    def rollback(self):
+        """Swap back to the previously active version; returns the version now active.
+
+        Instant when the previous Predictor is still in memory, otherwise it is loaded
+        (and smoke-tested) first.
+        """
+        target = self.previous()
+        if target == self.current() or (target is BASE and not artifacts_present(self.root, active=False)):
+            raise ArtifactError('no earlier version to roll back to')
+        standby = peek_predictor(self.root, standby=True)
+        if standby is None or Path(standby.artifacts_dir).resolve() != self.version_dir(target).resolve():
+            standby = self._load(target)
+        self._swap(target, standby, 'rollback')
+        return target
+
+    def _prune(self):
+        keep = {self.current(), self.previous()}
+        old = [v for v in self.versions() if v not in keep]
+        for version in old[:max(0, len(old) - self.keep)]:
+            shutil.rmtree(self.version_dir(version), ignore_errors=True)
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(artifacts_dir):
+    """Process-wide ArtifactStore for `artifacts_dir`."""
+    key = str(Path(artifacts_dir).resolve())
+    store = _stores.get(key)
+    if store is None:
+        with _stores_lock:
+            store = _stores.setdefault(key, ArtifactStore(key))
+    return store
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Manage versioned model artifacts.')
+    parser.add_argument('artifacts', help='artifacts directory')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('list', help='show versions and which one is active')
+    up = sub.add_parser('upload', help='validate, stage and activate an artifacts zip')
+    up.add_argument('zip')
+    act = sub.add_parser('activate', help='activate a staged version')
+    act.add_argument('version')
+    sub.add_parser('rollback', help='go back to the previously active version')
+    args = parser.parse_args(argv)
+
+    store = ArtifactStore(args.artifacts)
+    try:
+        if args.command == 'list':
+            current = store.current()
+            print(('* ' if current is BASE else '  ') + '(loose files)')
+            for v in store.versions():
+                print(('* ' if v == current else '  ') + v)
+        elif args.command == 'upload':
+            with open(args.zip, 'rb') as f:
+                version = store.stage(f)
+            store.activate(version)
+            print(f'activated {version}')
+        elif args.command == 'activate':
+            store.activate(args.version)
+            print(f'activated {args.version}')
+        else:
+            print(f'rolled back to {store.rollback() or "(loose files)"}')
+    except ArtifactError as e:
+        raise SystemExit(f'error: {e}')
+
+
+if __name__ == '__main__':
+    main()
@@ -2,19 +2,26 @@
 import pandas as pd
 import joblib
 import argparse
-from sklearn.model_selection import train_test_split
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import KFold, StratifiedKFold, train_test_split
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from sklearn.linear_model import LogisticRegression, SGDClassifier
 from sklearn.metrics import accuracy_score, classification_report
-from utils.clean import clean_text
+from sklearn.pipeline import Pipeline
+from utils.clean import CLEANER_VERSION, clean_texts
 from pathlib import Path
+import hashlib
 import os
 import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import scipy.sparse as sp
 
-def train(csv_path, text_column, label_column, artifacts_dir='./artifacts'):
+def _load_corpus(csv_path, text_column, label_column, clean_jobs=1):
+    """Read the CSV and return (cleaned text Series, label Series)."""
     df = pd.read_csv(csv_path)
     df = df[[text_column, label_column]].dropna()
-    X = df[text_column].astype(str).apply(clean_text)
+    X = pd.Series(clean_texts(df[text_column].astype(str), n_jobs=clean_jobs), index=df.index)
     y = df[label_column]
     # If the label is continuous (e.g., a score), convert to binary classes (threshold 0.5)
     try:
@@ -25,6 +32,10 @@ def train(csv_path, text_column, label_column, artifacts_dir='./artifacts'):
                 y = (y.astype(float) > 0.5).astype(int)
     except Exception:
         pass
+    return X, y
+
+def train(csv_path, text_column, label_column, artifacts_dir='./artifacts', clean_jobs=1):
+    X, y = _load_corpus(csv_path, text_column, label_column, clean_jobs=clean_jobs)
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
     vectorizer = TfidfVectorizer(max_features=20000, ngram_range=(1,2))
     X_train_tfidf = vectorizer.fit_transform(X_train)
@@ -44,6 +55,259 @@ def train(csv_path, text_column, label_column, artifacts_dir='./artifacts'):
         json.dump(meta, f)
     print('Artifacts saved to', str(p))
 
+def _scan_labels(csv_path, label_column, chunksize, max_classes=1000):
+    """First pass over the label column only: return (classes, binarize).
+
+    Mirrors `train`: a numeric label with more than two distinct values is a score and is
+    binarized at 0.5. Only the set of distinct labels is kept, so memory does not grow
+    with the number of rows.
+    """
+    from pandas.api.types import is_numeric_dtype
+    values, numeric = set(), True
+    for chunk in pd.read_csv(csv_path, usecols=[label_column], chunksize=chunksize):
+        y = chunk[label_column].dropna()
+        numeric = numeric and is_numeric_dtype(y.dtype)
+        values.update(y.unique().tolist())
+        if numeric and len(values) > 2:
+            # a continuous score: the classes are known, skip the rest of the column
+            return np.array([0, 1]), True
+        if len(values) > max_classes:
+            raise ValueError(f'label column {label_column!r} has more than {max_classes} distinct values')
+    if not values:
+        raise ValueError(f'label column {label_column!r} has no values')
+    return np.array(sorted(values)), False
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return float('nan')
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def train_streaming(csv_path, text_column, label_column, artifacts_dir='./artifacts',
+                    chunksize=10000, n_features=2 ** 20, epochs=1, holdout_every=10,
+                    max_holdout=20000, clean_jobs=1):
+    """Out-of-core variant of `train` for CSVs that do not fit in memory.
+
+    The CSV is read `chunksize` rows at a time. Text is featurized with a stateless
+    `HashingVectorizer` (no vocabulary to fit, so nothing grows with the corpus) and a
+    logistic-loss `SGDClassifier` is updated with `partial_fit` on each chunk. Every
+    `holdout_every`-th row is held out for validation instead of being trained on; at
+    most `max_holdout` of those rows are kept for scoring at the end. Peak memory is set
+    by `chunksize`, `n_features` and `max_holdout`, not by the size of the CSV.
+
+    The artifacts have the same layout as `train`'s, so `Predictor` loads them as-is.
+    """
+    classes, binarize = _scan_labels(csv_path, label_column, chunksize)
+    vectorizer = HashingVectorizer(n_features=n_features, ngram_range=(1, 2), alternate_sign=False)
+    model = SGDClassifier(loss='log_loss', random_state=42)
+    held_X, held_y = [], []
+    held = trained = 0
+    # one cleaning pool for the whole run; starting processes per chunk would dominate
+    pool = ProcessPoolExecutor(max_workers=clean_jobs) if clean_jobs and clean_jobs > 1 else None
+    try:
+        for epoch in range(epochs):
+            offset = 0
+            for chunk in pd.read_csv(csv_path, usecols=[text_column, label_column], chunksize=chunksize):
+                rows = np.arange(offset, offset + len(chunk))
+                offset += len(chunk)
+                keep = chunk[[text_column, label_column]].notna().all(axis=1).to_numpy()
+                chunk, rows = chunk[keep], rows[keep]
+                if chunk.empty:
+                    continue
+                y = chunk[label_column].to_numpy()
+                if binarize:
+                    y = (y.astype(float) > 0.5).astype(int)
+                texts = chunk[text_column].astype(str)
+                X = vectorizer.transform(clean_texts(texts, executor=pool,
+                                                     chunksize=max(1, len(texts) // (4 * (clean_jobs or 1)))))
+                # the split is by row number, so it is the same on every epoch and every run
+                is_held = rows % holdout_every == 0 if holdout_every else np.zeros(len(rows), dtype=bool)
+                if epoch == 0 and is_held.any() and held < max_holdout:
+                    take = np.flatnonzero(is_held)[:max_holdout - held]
+                    held_X.append(X[take])
+                    held_y.append(y[take])
+                    held += len(take)
+                train_idx = np.flatnonzero(~is_held)
+                if len(train_idx):
+                    model.partial_fit(X[train_idx], y[train_idx], classes=classes)
+                    trained += len(train_idx)
+            print(f'Epoch {epoch + 1}/{epochs}: {offset} rows read, peak RSS {_peak_rss_mb():.0f} MB')
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    if not trained:
+        raise ValueError('no training rows left after the holdout split')
+    meta = {'text_column': text_column, 'label_column': label_column,
+            'streaming': {'n_features': n_features, 'chunksize': chunksize, 'epochs': epochs,
+                          'train_rows': trained // epochs, 'holdout_rows': held}}
+    if held:
+        X_test, y_test = sp.vstack(held_X).tocsr(), np.concatenate(held_y)
+        preds = model.predict(X_test)
+        acc = accuracy_score(y_test, preds)
+        meta['streaming']['holdout_accuracy'] = acc
+        print('Holdout accuracy:', acc)
+        print('Classification report:\n', classification_report(y_test, preds))
+    p = Path(artifacts_dir); p.mkdir(parents=True, exist_ok=True)
+    joblib.dump(model, p / 'model.joblib')
+    joblib.dump(vectorizer, p / 'vectorizer.joblib')
+    with open(p / 'meta.json', 'w') as f:
+        json.dump(meta, f)
+    print('Artifacts saved to', str(p))
+
+def _file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def cached_corpus(csv_path, text_column, label_column, cache_dir='./.cache/cleaned', clean_jobs=1):
+    """`_load_corpus`, cached on disk.
+
+    The cache file is keyed by the CSV's content hash, the two column names and
+    `CLEANER_VERSION`, so editing the CSV or changing the cleaner invalidates it.
+    """
+    key = hashlib.sha256('|'.join([_file_sha256(csv_path), text_column, label_column,
+                                   CLEANER_VERSION]).encode()).hexdigest()[:24]
+    path = Path(cache_dir) / f'corpus-{key}.joblib'
+    if path.exists():
+        try:
+            return joblib.load(path)
+        except Exception:
+            pass
+    X, y = _load_corpus(csv_path, text_column, label_column, clean_jobs=clean_jobs)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp')
+    joblib.dump((X, y), tmp)
+    os.replace(tmp, path)
+    return X, y
+
+
+# set in each search worker by _init_search_worker so the corpus is sent once per process
+_search_data = {}
+
+
+def _init_search_worker(texts, y, splits):
+    _search_data.update(texts=texts, y=y, splits=splits)
+
+
+def _search_pipeline(max_features, ngram_range, C=1.0):
+    return Pipeline([('tfidf', TfidfVectorizer(max_features=max_features, ngram_range=tuple(ngram_range))),
+                     ('clf', LogisticRegression(C=C, max_iter=1000))])
+
+
+def _fit_fold(max_features, ngram_range, fold, C_grid):
+    """Fit and score one fold of one vectorizer setting for every C, in a worker process.
+
+    The vectorizer is the pipeline's first step and is fitted on the fold's training rows
+    only, so the held-out rows never shape the vocabulary or the IDF weights. It is fitted
+    once per fold and shared by the Cs; predict timings include vectorizing the held-out
+    texts, as at serving time.
+    """
+    texts, y = _search_data['texts'], _search_data['y']
+    train_idx, test_idx = _search_data['splits'][fold]
+    pipe = _search_pipeline(max_features, ngram_range)
+    t0 = time.perf_counter()
+    X_train = pipe['tfidf'].fit_transform(texts[train_idx])
+    vectorize_s = time.perf_counter() - t0
+    out = []
+    for C in C_grid:
+        pipe.set_params(clf__C=C)
+        t0 = time.perf_counter()
+        pipe['clf'].fit(X_train, y[train_idx])
+        fit_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        preds = pipe.predict(texts[test_idx])
+        predict_s = time.perf_counter() - t0
+        out.append((C, accuracy_score(y[test_idx], preds), vectorize_s, fit_s, predict_s, len(test_idx)))
+    return max_features, tuple(ngram_range), out
+
+
+def _cv_splits(y, folds):
+    counts = pd.Series(y).value_counts()
+    if counts.min() >= folds:
+        splitter = StratifiedKFold(n_splits=folds, shuffle=True, random_state=42)
+    else:
+        splitter = KFold(n_splits=folds, shuffle=True, random_state=42)
+    return list(splitter.split(np.zeros(len(y)), y))
+
+
+def search(csv_path, text_column, label_column, artifacts_dir='./artifacts',
+           max_features_grid=(5000, 20000), ngram_grid=((1, 1), (1, 2)), C_grid=(0.1, 1.0, 10.0),
+           folds=5, jobs=None, cache_dir='./.cache/cleaned', clean_jobs=1):
+    """Grid-search the vectorizer and classifier settings with k-fold cross-validation.
+
+    The corpus is cleaned once (and cached, see `cached_corpus`). Each candidate is a
+    TF-IDF + logistic regression `Pipeline`, refitted from the text on every fold so the
+    held-out rows do not leak into the vocabulary or IDF. The (setting, fold) cells run
+    in one process pool; within a cell the fitted vectorizer is shared by every C. The
+    best candidate is refitted on all rows and saved like `train` does; the full
+    leaderboard with per-candidate timings goes into `meta.json`.
+    """
+    X_text, y = cached_corpus(csv_path, text_column, label_column, cache_dir=cache_dir,
+                              clean_jobs=clean_jobs)
+    texts, y = X_text.to_numpy(dtype=object), y.to_numpy()
+    splits = _cv_splits(y, folds)
+    cells = {}   # (max_features, ngram_range, C) -> [(acc, vectorize_s, fit_s, predict_s, n), ...]
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_search_worker,
+                             initargs=(texts, y, splits)) as pool:
+        futures = [pool.submit(_fit_fold, max_features, tuple(ngram_range), fold, list(C_grid))
+                   for max_features in max_features_grid for ngram_range in ngram_grid
+                   for fold in range(len(splits))]
+        for fut in futures:
+            max_features, ngram_range, rows = fut.result()
+            for C, *row in rows:
+                cells.setdefault((max_features, ngram_range, C), []).append(row)
+    leaderboard = []
+    for (max_features, ngram_range, C), rows in cells.items():
+        accs = np.array([r[0] for r in rows])
+        candidate = {
+            'max_features': max_features, 'ngram_range': list(ngram_range), 'C': C,
+            'cv_accuracy': float(accs.mean()), 'cv_std': float(accs.std()),
+            'vectorize_s': round(float(np.mean([r[1] for r in rows])), 4),
+            'fit_s': round(float(np.mean([r[2] for r in rows])), 4),
+            'predict_s': round(float(np.mean([r[3] for r in rows])), 4),
+            'predict_ms_per_doc': round(1000 * sum(r[3] for r in rows) / sum(r[4] for r in rows), 4),
+        }
+        leaderboard.append(candidate)
+        print(f"max_features={max_features} ngram={ngram_range} C={C}: "
+              f"cv accuracy {candidate['cv_accuracy']:.4f} +/- {candidate['cv_std']:.4f}, "
+              f"fit {candidate['fit_s']}s")
+    # best first; ties go to the cheaper fit
+    leaderboard.sort(key=lambda c: (-c['cv_accuracy'], c['fit_s']))
+    candidate = leaderboard[0]
+    pipe = _search_pipeline(candidate['max_features'], candidate['ngram_range'], candidate['C'])
+    pipe.fit(texts, y)
+    print('Best:', candidate)
+    p = Path(artifacts_dir); p.mkdir(parents=True, exist_ok=True)
+    # saved as separate steps, the same layout `train` writes and `Predictor` loads
+    joblib.dump(pipe['clf'], p / 'model.joblib')
+    joblib.dump(pipe['tfidf'], p / 'vectorizer.joblib')
+    meta = {'text_column': text_column, 'label_column': label_column,
+            'search': {'folds': len(splits), 'rows': int(len(y)), 'best': candidate,
+                       'leaderboard': leaderboard}}
+    with open(p / 'meta.json', 'w') as f:
+        json.dump(meta, f)
+    print('Artifacts saved to', str(p))
+
+
+def _int_list(value):
+    return [int(v) for v in value.split(',')]
+
+
+def _float_list(value):
+    return [float(v) for v in value.split(',')]
+
+
+def _ngram_list(value):
+    # "1-1,1-2" -> [(1, 1), (1, 2)]
+    return [tuple(int(n) for n in v.split('-')) for v in value.split(',')]
+
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
     # default to the repo-level `resume_data.csv` so script can be run from IDE/terminal easily
@@ -51,5 +315,28 @@ if __name__ == '__main__':
     parser.add_argument('--text-col', default='resume_text')
     parser.add_argument('--label-col', default='label')
     parser.add_argument('--out', default='./artifacts')
+    parser.add_argument('--clean-jobs', type=int, default=1,
+                        help='processes used to clean the text column (1 = in this process)')
+    parser.add_argument('--streaming', action='store_true', help='train out-of-core in chunks (hashing features + SGD)')
+    parser.add_argument('--chunksize', type=int, default=10000, help='rows per chunk in --streaming mode')
+    parser.add_argument('--n-features', type=int, default=2 ** 20, help='hashing dimensions in --streaming mode')
+    parser.add_argument('--epochs', type=int, default=1, help='passes over the CSV in --streaming mode')
+    parser.add_argument('--holdout-every', type=int, default=10, help='hold out every Nth row for validation in --streaming mode (0 = none)')
+    parser.add_argument('--search', action='store_true', help='cross-validated grid search over the settings below')
+    parser.add_argument('--max-features', type=_int_list, default=[5000, 20000], help='--search: comma-separated vocabulary sizes')
+    parser.add_argument('--ngrams', type=_ngram_list, default=[(1, 1), (1, 2)], help='--search: comma-separated n-gram ranges, e.g. 1-1,1-2')
+    parser.add_argument('--C', type=_float_list, default=[0.1, 1.0, 10.0], help='--search: comma-separated regularization strengths')
+    parser.add_argument('--folds', type=int, default=5, help='--search: cross-validation folds')
+    parser.add_argument('--search-jobs', type=int, default=None, help='--search: worker processes for the folds')
+    parser.add_argument('--cache-dir', default='./.cache/cleaned', help='--search: where the cleaned corpus is cached')
     args = parser.parse_args()
-    train(args.csv, args.text_col, args.label_col, args.out)
\ No newline at end of file
+    if args.search:
+        search(args.csv, args.text_col, args.label_col, args.out, max_features_grid=args.max_features,
+               ngram_grid=args.ngrams, C_grid=args.C, folds=args.folds, jobs=args.search_jobs,
+               cache_dir=args.cache_dir, clean_jobs=args.clean_jobs)
+    elif args.streaming:
+        train_streaming(args.csv, args.text_col, args.label_col, args.out, chunksize=args.chunksize,
+                        n_features=args.n_features, epochs=args.epochs,
+                        holdout_every=args.holdout_every, clean_jobs=args.clean_jobs)
+    else:
+        train(args.csv, args.text_col, args.label_col, args.out, clean_jobs=args.clean_jobs)
\ No newline at end of file
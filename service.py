@@ -0,0 +1,349 @@
+"""Local HTTP scoring service for ATS Resume Analyzer.
+
+Exposes the same pipeline as the Streamlit page (extract -> clean_text -> Predictor ->
+suggestions) over plain HTTP, using only the standard library's asyncio:
+
+    python service.py --port 8080 --artifacts ./artifacts
+
+Endpoints:
+
+- `POST /score`  a resume as multipart/form-data (`file` field, optional `text` field),
+  a raw PDF/image body (`Content-Type: application/pdf`, `image/...`), JSON
+  `{"text": "..."}` or `text/plain`. Add `?deep=1` for long-form suggestions.
+- `GET /healthz` the process is up
+- `GET /readyz`  200 once the Predictor has loaded its artifacts, 503 before
+- `GET /metrics` stage latencies and counters in the Prometheus text format (with
+  `--metrics` or ATS_METRICS=1). `?trace=1` on /score adds the request's stage trace.
+
+Extraction (pdfplumber / tesseract) runs in a process pool, cleaning and suggestions in
+a thread pool, and prediction goes through the shared micro-batcher. At most
+`--max-inflight` requests are processed at once; beyond that the service answers 503
+straight away so a load test measures the real capacity instead of an ever-growing queue.
+
+`--extract-timeout` bounds how long a request waits for its extraction. A job still
+queued in the pool is cancelled, but one already running cannot be interrupted and
+finishes in the background. It keeps its place among the `--max-extract-jobs` pool jobs
+allowed at once, so timed-out work cannot pile up behind new requests.
+"""
+import sys
+from pathlib import Path
+
+# ensure repository root is on sys.path so local packages like `model` and `utils` can be imported
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import argparse
+import asyncio
+import contextvars
+import email.parser
+import email.policy
+import functools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from extract.cache import content_key, get_extraction_cache
+from model.registry import find_artifacts_dir, get_predictor, peek_predictor
+from utils import metrics
+from utils.clean import clean_text
+
+MAX_BODY = 20 * 1024 * 1024
+MAX_HEADER_LINES = 100
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           411: 'Length Required', 413: 'Payload Too Large', 415: 'Unsupported Media Type',
+           500: 'Internal Server Error', 503: 'Service Unavailable', 504: 'Gateway Timeout'}
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _extract(raw, name, mime):
+    """Process-pool worker: bytes -> (text, spans, counters). Imported lazily so the pool
+    starts quickly; the stage timings recorded here are replayed into the parent's metrics."""
+    from extract.detect import extract_text_from_bytes
+    with metrics.trace(write=False) as t:
+        # requests are already spread over processes, so OCR pages one at a time per worker
+        text = extract_text_from_bytes(raw, name=name, mime=mime, ocr_workers=1)
+    return text, (t.spans if t else []), (t.counters if t else {})
+
+
+def _in_context(fn, *args):
+    # run_in_executor does not carry contextvars over; this keeps the request's trace
+    return functools.partial(contextvars.copy_context().run, fn, *args)
+
+
+def _suggest(text, deep):
+    from utils.suggestions import generate_deep_suggestions, generate_suggestions
+    return generate_deep_suggestions(text) if deep else generate_suggestions(text)
+
+
+def parse_upload(content_type, body):
+    """Return (text, raw, name, mime) from a request body; exactly one of text/raw is set."""
+    mime = (content_type or '').split(';')[0].strip().lower()
+    if mime == 'multipart/form-data':
+        msg = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+            b'Content-Type: ' + content_type.encode('latin-1') + b'\r\n\r\n' + body)
+        if not msg.is_multipart():
+            raise HttpError(400, 'malformed multipart body')
+        text = None
+        for part in msg.iter_parts():
+            field = part.get_param('name', header='content-disposition')
+            payload = part.get_payload(decode=True) or b''
+            if part.get_filename() or field == 'file':
+                return None, payload, part.get_filename(), part.get_content_type()
+            if field == 'text':
+                text = payload.decode(part.get_content_charset() or 'utf-8', 'replace')
+        if text is None:
+            raise HttpError(400, "multipart body needs a 'file' or 'text' field")
+        return text, None, None, None
+    if mime == 'application/json':
+        try:
+            data = json.loads(body)
+        except ValueError:
+            raise HttpError(400, 'invalid JSON body')
+        if not isinstance(data, dict) or not isinstance(data.get('text'), str):
+            raise HttpError(400, 'JSON body needs a "text" string')
+        return data['text'], None, None, None
+    if mime in ('', 'text/plain'):
+        return body.decode('utf-8', 'replace'), None, None, None
+    if mime in ('application/pdf', 'application/octet-stream') or mime.startswith('image/'):
+        return None, body, None, mime
+    raise HttpError(415, f'unsupported content type {mime!r}')
+
+
+class ScoringService:
+    def __init__(self, artifacts_dir, extract_workers=None, max_inflight=16, extract_timeout=180,
+                 max_extract_jobs=None):
+        self.artifacts_dir = artifacts_dir
+        self.max_inflight = max_inflight
+        self.extract_timeout = extract_timeout
+        self.max_extract_jobs = max_extract_jobs or max_inflight
+        # pool jobs submitted and not finished yet, including ones whose request timed out
+        self.extract_jobs = set()
+        self.inflight = 0
+        self.served = 0
+        self.rejected = 0
+        self.processes = ProcessPoolExecutor(max_workers=extract_workers or os.cpu_count() or 1)
+        self.threads = ThreadPoolExecutor(max_workers=max(4, max_inflight), thread_name_prefix='ats-svc')
+        self.cache = get_extraction_cache()
+
+    async def predictor(self):
+        """The registry's current Predictor, or None until the startup load has finished.
+
+        Goes through `get_predictor` on every call, so new files on disk or a version
+        activated or rolled back by another process (model/store.py writes CURRENT) are
+        picked up by the next request. Its unchanged-files fast path takes no lock; it
+        runs on the thread pool so that a reload does not stall the event loop.
+        """
+        if peek_predictor(self.artifacts_dir) is None:
+            return None
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.threads, get_predictor, self.artifacts_dir)
+
+    async def ready(self):
+        predictor = await self.predictor()
+        return predictor is not None and predictor.ready
+
+    async def load(self):
+        """Load the Predictor off the event loop; /readyz turns green when it is done."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.threads, get_predictor, self.artifacts_dir)
+
+    async def score(self, content_type, body, query):
+        with metrics.trace(source='service', bytes=len(body)) as trace:
+            result = await self._score(content_type, body, query)
+            if trace is not None and query.get('trace', ['0'])[0] not in ('0', 'false', ''):
+                result['trace'] = trace.to_dict()
+            return result
+
+    async def _score(self, content_type, body, query):
+        loop = asyncio.get_running_loop()
+        t0 = time.perf_counter()
+        text, raw, name, mime = parse_upload(content_type, body)
+        timings = {}
+        if raw is not None:
+            if not raw:
+                raise HttpError(400, 'empty upload')
+            key = await loop.run_in_executor(self.threads, content_key, raw)
+            text = self.cache.get(key)
+            if text is None:
+                self.extract_jobs = {job for job in self.extract_jobs if not job.done()}
+                if len(self.extract_jobs) >= self.max_extract_jobs:
+                    self.rejected += 1
+                    metrics.inc('rejected')
+                    raise HttpError(503, 'extraction backlog is full, retry later')
+                job = self.processes.submit(_extract, raw, name, mime)
+                self.extract_jobs.add(job)
+                try:
+                    text, spans, counters = await asyncio.wait_for(asyncio.wrap_future(job), self.extract_timeout)
+                except asyncio.TimeoutError:
+                    # drops the job if it is still queued; a running one finishes on its own
+                    job.cancel()
+                    metrics.inc('failures', stage='extract_timeout')
+                    raise HttpError(504, f'extraction took longer than {self.extract_timeout}s')
+                except Exception as e:
+                    metrics.inc('failures', stage='extract')
+                    raise HttpError(400, f'could not extract text: {e}')
+                metrics.REGISTRY.replay(spans, counters)
+                self.cache.put(key, text)
+            timings['extract_s'] = round(time.perf_counter() - t0, 4)
+        t1 = time.perf_counter()
+        cleaned = await loop.run_in_executor(self.threads, _in_context(clean_text, text))
+        timings['clean_s'] = round(time.perf_counter() - t1, 4)
+
+        predictor = await self.predictor()
+        if predictor is None or not predictor.ready:
+            raise HttpError(503, 'model not loaded')
+        from model.batcher import get_batcher
+        t1 = time.perf_counter()
+        try:
+            label, score = await get_batcher(predictor).apredict(cleaned)
+        except RuntimeError:
+            # the batcher was closed under us (e.g. mid model swap): score directly
+            metrics.inc('failures', stage='batcher')
+            label, score = await loop.run_in_executor(self.threads, predictor.predict_text, cleaned)
+        timings['predict_s'] = round(time.perf_counter() - t1, 4)
+
+        deep = query.get('deep', ['0'])[0] not in ('0', 'false', '')
+        t1 = time.perf_counter()
+        suggestions = await loop.run_in_executor(self.threads, _in_context(_suggest, text, deep))
+        timings['suggest_s'] = round(time.perf_counter() - t1, 4)
+        timings['total_s'] = round(time.perf_counter() - t0, 4)
+        label = label.item() if hasattr(label, 'item') else label
+        return {'label': label, 'score': score, 'chars': len(text),
+                'suggestions': suggestions, 'timings': timings}
+
+    async def dispatch(self, method, target, headers, body):
+        url = urlsplit(target)
+        if url.path == '/healthz':
+            return 200, {'status': 'ok', 'inflight': self.inflight, 'served': self.served,
+                         'rejected': self.rejected}
+        if url.path == '/readyz':
+            ready = await self.ready()
+            return (200 if ready else 503), {'ready': ready}
+        if url.path == '/metrics':
+            if not metrics.REGISTRY.enabled:
+                raise HttpError(404, 'metrics are off; start with --metrics or ATS_METRICS=1')
+            return 200, metrics.REGISTRY.render_prometheus()
+        if url.path != '/score':
+            raise HttpError(404, f'no route for {url.path}')
+        if method != 'POST':
+            raise HttpError(405, 'use POST')
+        if self.inflight >= self.max_inflight:
+            self.rejected += 1
+            metrics.inc('rejected')
+            raise HttpError(503, 'too many requests in flight, retry later')
+        self.inflight += 1
+        try:
+            result = await self.score(headers.get('content-type'), body, parse_qs(url.query))
+            self.served += 1
+            return 200, result
+        finally:
+            self.inflight -= 1
+
+    async def handle(self, reader, writer):
+        """One connection; HTTP/1.1 keep-alive requests are served in order."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._respond(writer, 400, {'error': 'malformed request line'}, close=True)
+                    break
+                headers = {}
+                for _ in range(MAX_HEADER_LINES):
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    key, _, value = line.decode('latin-1').partition(':')
+                    headers[key.strip().lower()] = value.strip()
+                close = (headers.get('connection', '').lower() == 'close'
+                         or (version == 'HTTP/1.0' and headers.get('connection', '').lower() != 'keep-alive'))
+                try:
+                    if 'transfer-encoding' in headers:
+                        raise HttpError(411, 'chunked bodies are not supported; send Content-Length')
+                    length = int(headers.get('content-length') or 0)
+                    if length > MAX_BODY:
+                        raise HttpError(413, f'body larger than {MAX_BODY} bytes')
+                    body = await reader.readexactly(length) if length else b''
+                    status, payload = await self.dispatch(method.upper(), target, headers, body)
+                except HttpError as e:
+                    status, payload = e.status, {'error': str(e)}
+                    close = close or e.status in (411, 413)
+                except asyncio.IncompleteReadError:
+                    break
+                except Exception as e:
+                    status, payload = 500, {'error': f'{type(e).__name__}: {e}'}
+                metrics.inc('http_responses', status=status)
+                await self._respond(writer, status, payload, close=close)
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status, payload, close=False):
+        if isinstance(payload, str):
+            body, content_type = payload.encode(), 'text/plain; version=0.0.4; charset=utf-8'
+        else:
+            body, content_type = json.dumps(payload).encode(), 'application/json'
+        head = (f'HTTP/1.1 {status} {REASONS.get(status, "")}\r\n'
+                f'Content-Type: {content_type}\r\nContent-Length: {len(body)}\r\n'
+                f'Connection: {"close" if close else "keep-alive"}\r\n')
+        if status == 503:
+            head += 'Retry-After: 1\r\n'
+        writer.write(head.encode('latin-1') + b'\r\n' + body)
+        await writer.drain()
+
+
+async def serve(host='127.0.0.1', port=8080, artifacts_dir=None, **options):
+    artifacts_dir = artifacts_dir or find_artifacts_dir(str(Path(__file__).resolve().parent))
+    service = ScoringService(artifacts_dir, **options)
+    server = await asyncio.start_server(service.handle, host, port)
+    print(f'Serving on http://{host}:{port} (artifacts: {artifacts_dir})')
+    loader = asyncio.create_task(service.load())
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        loader.cancel()
+        service.processes.shutdown(cancel_futures=True)
+        service.threads.shutdown(wait=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--artifacts', default=None, help='artifacts directory (default: searched like the app)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='extraction processes')
+    parser.add_argument('--max-inflight', type=int, default=16, help='requests processed at once before answering 503')
+    parser.add_argument('--extract-timeout', type=float, default=180,
+                        help='seconds a request waits for its extraction (a running job is not killed)')
+    parser.add_argument('--max-extract-jobs', type=int, default=None,
+                        help='extraction jobs queued or running at once, timed-out ones included '
+                             '(default: --max-inflight)')
+    parser.add_argument('--metrics', action='store_true', help='collect stage timings / counters and serve GET /metrics')
+    args = parser.parse_args(argv)
+    if args.metrics:
+        # via the environment too, so extraction worker processes record their stages
+        os.environ['ATS_METRICS'] = '1'
+        metrics.enable()
+    try:
+        asyncio.run(serve(args.host, args.port, args.artifacts, extract_workers=args.workers,
+                          max_inflight=args.max_inflight, extract_timeout=args.extract_timeout,
+                          max_extract_jobs=args.max_extract_jobs))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
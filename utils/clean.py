@@ -1,20 +1,58 @@
 import re
-import nltk
-from nltk.corpus import stopwords
+from concurrent.futures import ProcessPoolExecutor
+from .metrics import timed
+from .stopwords import ENGLISH_STOPWORDS
 
-try:
-    stopwords.words('english')
-except Exception:
-    nltk.download('stopwords')
-STOPWORDS = set(stopwords.words('english'))
+STOPWORDS = ENGLISH_STOPWORDS
 
+# Bump whenever clean_text's output changes; caches of cleaned text are keyed on it.
+CLEANER_VERSION = '2'
+
+# Fused normalizer. URL and email removal only ever affect the whitespace-delimited run
+# they occur in, so they are applied per run, and only to runs that can contain one.
+# Everything else is a translation table: after lowercasing, any character other than
+# a-z becomes a space (non-ASCII characters are first encoded as '?'), so one split
+# yields exactly the letter runs the old chain of re.sub passes produced.
+_URL_RE = re.compile(r'https?://\S+|www\.\S+')
+_EMAIL_RE = re.compile(r'\S+@\S+')
+_LETTERS_ONLY = bytes(c if 97 <= c <= 122 else 32 for c in range(256))
+
+
+def _strip_special_run(run):
+    # Same result as running the URL pass and then the email pass over the whole text:
+    # a URL eats the rest of its run, and an email match eats the whole run that is left.
+    url = _URL_RE.search(run)
+    if url is not None:
+        run = run[:url.start()]
+    if _EMAIL_RE.search(run):
+        return ''
+    return run
+
+
+@timed('clean')
 def clean_text(text: str) -> str:
+    """Lowercase, drop URLs and emails, keep letter-only tokens of 2+ chars that are not
+    stopwords, and join them with single spaces."""
     if not isinstance(text, str):
         return ''
     text = text.lower()
-    text = re.sub(r'https?://\S+|www\.\S+', ' ', text)
-    text = re.sub(r'\S+@\S+', ' ', text)
-    text = re.sub(r'[^a-z\s]', ' ', text)
-    text = re.sub(r'\s+', ' ', text).strip()
-    tokens = [t for t in text.split() if t not in STOPWORDS and len(t) > 1]
-    return ' '.join(tokens)
+    if '@' in text or '://' in text or 'www.' in text:
+        text = ' '.join([_strip_special_run(r) if ('@' in r or '://' in r or 'www.' in r) else r
+                         for r in text.split()])
+    tokens = text.encode('ascii', 'replace').translate(_LETTERS_ONLY).decode('ascii').split()
+    return ' '.join([t for t in tokens if len(t) > 1 and t not in STOPWORDS])
+
+
+def clean_texts(texts, n_jobs=1, chunksize=2000, executor=None):
+    """Clean a list / pandas Series / any iterable of texts; returns a list.
+
+    With `n_jobs > 1` the work is spread over a process pool in chunks of `chunksize`
+    texts, which is what makes cleaning a large training corpus fast. Callers that clean
+    many batches pass their own `executor` so the pool is started once, not per call.
+    """
+    if executor is not None:
+        return list(executor.map(clean_text, texts, chunksize=chunksize))
+    if n_jobs is None or n_jobs <= 1:
+        return [clean_text(t) for t in texts]
+    with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+        return list(pool.map(clean_text, texts, chunksize=chunksize))
@@ -0,0 +1,162 @@
+"""Near-duplicate resume detection with MinHash signatures and an LSH band index.
+
+Bulk intake sees the same candidate many times: re-exported PDFs, a photo of the same
+CV, a copy with one line changed. Their cleaned text shares most of its word shingles,
+so the Jaccard similarity of the shingle sets is high even when the bytes differ.
+
+- `MinHasher` turns cleaned text into a fixed-size signature whose per-slot agreement
+  rate estimates the Jaccard similarity of two documents' 3-word shingles.
+- `LSHIndex` splits signatures into bands and buckets each band, so a lookup only
+  compares against documents that share at least one band: the cost depends on the
+  number of near matches, not on the size of the corpus.
+- `NearDupDetector` ties the two together with a similarity threshold, keeps a stored
+  result per document for reuse, and persists to a directory.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+_MERSENNE = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+
+
+def shingles(cleaned, k=3):
+    """Hashed word k-shingles of cleaned text as a uint64 array of 32-bit values."""
+    tokens = cleaned.split()
+    if len(tokens) < k:
+        grams = [' '.join(tokens)] if tokens else []
+    else:
+        grams = {' '.join(tokens[i:i + k]) for i in range(len(tokens) - k + 1)}
+    return np.fromiter((int.from_bytes(hashlib.blake2b(g.encode('utf-8'), digest_size=4).digest(), 'little')
+                        for g in grams), dtype=np.uint64)
+
+
+class MinHasher:
+    def __init__(self, num_perm=128, seed=1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        # a * h stays below 2**64 because both are < 2**32
+        self._a = rng.integers(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    def signature(self, cleaned):
+        """uint32 signature of `cleaned`; all-max for empty text (matches nothing real)."""
+        h = shingles(cleaned)
+        if not len(h):
+            return np.full(self.num_perm, 0xFFFFFFFF, dtype=np.uint32)
+        perm = ((h[:, None] * self._a + self._b) % _MERSENNE) & _MAX_HASH
+        return perm.min(axis=0).astype(np.uint32)
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.mean(sig_a == sig_b))
+
+
+class LSHIndex:
+    def __init__(self, num_perm=128, bands=32):
+        if num_perm % bands:
+            raise ValueError('num_perm must be a multiple of bands')
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._buckets = [dict() for _ in range(bands)]
+
+    def _keys(self, sig):
+        return [sig[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def add(self, doc_id, sig):
+        for bucket, key in zip(self._buckets, self._keys(sig)):
+            bucket.setdefault(key, []).append(doc_id)
+
+    def candidates(self, sig):
+        out = set()
+        for bucket, key in zip(self._buckets, self._keys(sig)):
+            out.update(bucket.get(key, ()))
+        return out
+
+
+class Match(NamedTuple):
+    id: str
+    similarity: float
+    record: dict      # result stored for the earlier document (may be empty)
+
+
+class NearDupDetector:
+    """MinHash + LSH near-duplicate index with optional stored results per document.
+
+    With the defaults (128 permutations in 32 bands of 4) two documents with Jaccard
+    similarity 0.8 share a band with probability ~1.0 and documents at 0.3 with ~0.23;
+    every candidate is then checked against `threshold` on the full signature.
+    """
+
+    def __init__(self, threshold=0.8, num_perm=128, bands=32, min_tokens=20):
+        self.threshold = threshold
+        self.min_tokens = min_tokens
+        self.hasher = MinHasher(num_perm)
+        self.lsh = LSHIndex(num_perm, bands)
+        self.ids = []
+        self.records = {}
+        self._sigs = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def signature(self, cleaned):
+        """Signature for cleaned text, or None when it is too short to compare reliably."""
+        if len(cleaned.split()) < self.min_tokens:
+            return None
+        return self.hasher.signature(cleaned)
+
+    def query(self, sig):
+        """Best earlier document at or above the threshold, as a `Match`, else None."""
+        if sig is None:
+            return None
+        best = None
+        for doc_id in self.lsh.candidates(sig):
+            sim = similarity(sig, self._sigs[doc_id])
+            if sim >= self.threshold and (best is None or sim > best[1]):
+                best = (doc_id, sim)
+        if best is None:
+            return None
+        return Match(best[0], best[1], self.records.get(best[0], {}))
+
+    def add(self, doc_id, sig, record=None):
+        if sig is None or doc_id in self._sigs:
+            return
+        self.ids.append(doc_id)
+        self._sigs[doc_id] = sig
+        self.lsh.add(doc_id, sig)
+        if record is not None:
+            self.records[doc_id] = record
+
+    def save(self, directory):
+        """Write `signatures.npy` and `docs.json`; the band index is rebuilt on load."""
+        d = Path(directory)
+        d.mkdir(parents=True, exist_ok=True)
+        sigs = np.stack([self._sigs[i] for i in self.ids]) if self.ids else \
+            np.empty((0, self.hasher.num_perm), dtype=np.uint32)
+        with open(d / 'signatures.npy.tmp', 'wb') as f:
+            np.save(f, sigs)
+        os.replace(d / 'signatures.npy.tmp', d / 'signatures.npy')
+        info = {'threshold': self.threshold, 'num_perm': self.hasher.num_perm, 'bands': self.lsh.bands,
+                'min_tokens': self.min_tokens, 'ids': self.ids, 'records': self.records}
+        (d / 'docs.json.tmp').write_text(json.dumps(info, ensure_ascii=False), encoding='utf-8')
+        os.replace(d / 'docs.json.tmp', d / 'docs.json')
+
+    @classmethod
+    def load(cls, directory, threshold=None):
+        """Load a saved detector, or return an empty one when `directory` has none."""
+        d = Path(directory)
+        if not (d / 'docs.json').exists():
+            return cls() if threshold is None else cls(threshold=threshold)
+        info = json.loads((d / 'docs.json').read_text(encoding='utf-8'))
+        det = cls(threshold=info['threshold'] if threshold is None else threshold,
+                  num_perm=info['num_perm'], bands=info['bands'], min_tokens=info['min_tokens'])
+        sigs = np.load(d / 'signatures.npy')
+        for doc_id, sig in zip(info['ids'], sigs):
+            det.add(doc_id, sig, info['records'].get(doc_id))
+        return det
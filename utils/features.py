@@ -0,0 +1,105 @@
+"""Resume features shared by both suggestion generators.
+
+`analyze(text)` computes everything the suggestion rules look at in one go, with
+precompiled patterns: contact details, word / line / sentence counts, digits, ALL-CAPS
+words, skills, the header lines and candidate sentences for a rewrite example. The
+counters come from a single `finditer` over one alternation pattern instead of a regex
+pass per rule. Records are memoized by a hash of the text, so a Streamlit rerun (e.g.
+toggling "Deep suggestions") or a bulk run that asks for both suggestion styles
+analyzes each resume only once.
+"""
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+from .skills import get_matcher
+
+_EMAIL_RE = re.compile(r"\b[\w.%+-]+@[\w.-]+\.[A-Za-z]{2,}\b")
+_PHONE_RE = re.compile(r"\b(\+?\d[\d\s\-()]{6,}\d)\b")
+# one scan for every counter: ALL-CAPS words, digit runs, newlines and periods
+_COUNTERS_RE = re.compile(r"(?P<caps>\b[A-Z]{2,}\b)|(?P<digits>\d+)|(?P<nl>\n)|(?P<dot>\.)")
+_SENTENCE_SPLIT_RE = re.compile(r'[\n\.]\s*')
+
+MEMO_SIZE = 4096
+
+
+class ResumeFeatures(NamedTuple):
+    empty: bool
+    has_email: bool
+    has_phone: bool
+    words: int
+    lines: int                # newline count
+    sentences: int            # period count (rough sentence count)
+    digits: int               # number of digit characters
+    numeric_density: float    # digits per word
+    caps_words: int           # ALL-CAPS words of 2+ letters
+    caps_ratio: float         # caps_words per word
+    skills: tuple             # display names of detected skills, in order of first mention
+    head: str                 # first three non-empty lines (max 600 chars)
+    rewrite_candidates: tuple  # sentences of 9-24 words, good material for a rewrite example
+
+
+def _head(text):
+    head_lines = [ln.strip() for ln in text.strip().splitlines() if ln.strip()]
+    if head_lines:
+        return ' '.join(head_lines[:3])[:600]
+    return text[:600]
+
+
+def _compute(text):
+    if not isinstance(text, str) or not text.strip():
+        return ResumeFeatures(True, False, False, 0, 0, 0, 0, 0.0, 0, 0.0, (), '', ())
+    caps = digits = nl = dot = 0
+    for m in _COUNTERS_RE.finditer(text):
+        kind = m.lastgroup
+        if kind == 'caps':
+            caps += 1
+        elif kind == 'digits':
+            digits += m.end() - m.start()
+        elif kind == 'nl':
+            nl += 1
+        else:
+            dot += 1
+    words = len(text.split())
+    candidates = []
+    for s in _SENTENCE_SPLIT_RE.split(text):
+        s = s.strip()
+        if 8 < len(s.split()) < 25:
+            candidates.append(s)
+            if len(candidates) == 3:
+                break
+    return ResumeFeatures(
+        empty=False,
+        has_email=_EMAIL_RE.search(text) is not None,
+        has_phone=_PHONE_RE.search(text) is not None,
+        words=words, lines=nl, sentences=dot, digits=digits,
+        numeric_density=digits / words if words else 0.0,
+        caps_words=caps, caps_ratio=caps / words if words else 0.0,
+        skills=tuple(get_matcher().skill_names(text)),
+        head=_head(text),
+        rewrite_candidates=tuple(candidates),
+    )
+
+
+_memo = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+def analyze(text):
+    """Return the (memoized) `ResumeFeatures` for `text`."""
+    if not isinstance(text, str):
+        return _compute(text)
+    key = hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+    with _memo_lock:
+        feats = _memo.get(key)
+        if feats is not None:
+            _memo.move_to_end(key)
+            return feats
+    feats = _compute(text)
+    with _memo_lock:
+        _memo[key] = feats
+        if len(_memo) > MEMO_SIZE:
+            _memo.popitem(last=False)
+    return feats
@@ -1,4 +1,14 @@
 import re
-def extract_skills_from_text(text, delimiter_regex=r'[;,\n]'):
-    parts = [p.strip() for p in re.split(delimiter_regex, text.lower()) if p.strip()]
-    return parts
+from .skills import get_matcher
+
+
+def extract_skills_from_text(text, delimiter_regex=None):
+    """Return the display names of the taxonomy skills mentioned in `text`, in order of
+    first mention (see utils/skills.py).
+
+    Passing `delimiter_regex` keeps the old behaviour of splitting the lowercased text on
+    it and returning every non-empty part.
+    """
+    if delimiter_regex is not None:
+        return [p.strip() for p in re.split(delimiter_regex, text.lower()) if p.strip()]
+    return get_matcher().skill_names(text)
@@ -0,0 +1,168 @@
+"""Process-wide job scheduler for extraction and prediction.
+
+All Streamlit sessions share one process. Running OCR inline in each session's script
+thread lets a few large scans saturate the box and stall everyone else, so expensive
+work is submitted here instead. Jobs go into one of two lanes, each with its own bounded
+queue and worker threads:
+
+- 'light': text-layer PDF extraction and prediction; cheap, many workers
+- 'ocr': anything that runs tesseract; few workers, so OCR is capped process-wide
+
+Light jobs never wait behind OCR jobs because the lanes do not share workers.
+"""
+import contextvars
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+LANES = ('light', 'ocr')
+
+
+class QueueFull(RuntimeError):
+    """Raised by `JobScheduler.submit` when the lane's queue is at capacity."""
+
+
+class Job:
+    def __init__(self, scheduler, lane, fn, args, kwargs, timeout):
+        self.id = next(scheduler._ids)
+        self.lane = lane
+        self.timeout = timeout
+        self.status = 'queued'   # queued -> running -> done | failed
+        self.submitted_at = time.monotonic()
+        self.started_at = None
+        self.finished_at = None
+        self.future = Future()
+        self._scheduler = scheduler
+        self._call = (fn, args, kwargs)
+        # the submitter's context, so e.g. a metrics trace follows the job onto its worker
+        self._context = contextvars.copy_context()
+
+    def position(self):
+        """1-based position in the lane queue, or 0 once the job has started."""
+        return self._scheduler._position(self)
+
+    def done(self):
+        return self.future.done()
+
+    def timed_out(self):
+        """True once a running job has exceeded its timeout."""
+        if self.timeout is None or self.started_at is None or self.done():
+            return False
+        return time.monotonic() - self.started_at > self.timeout
+
+    def result(self, timeout=None):
+        """Wait for the job. Raises TimeoutError if the job's own run time limit expires
+        first (the worker keeps its slot until the function returns, so long-running work
+        should also be given a budget of its own, e.g. `ocr_timeout`)."""
+        end = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if end is None else end - time.monotonic()
+            try:
+                return self.future.result(timeout=0.1 if remaining is None else min(0.1, max(remaining, 0)))
+            except FutureTimeout:
+                if self.timed_out():
+                    raise TimeoutError(f'job {self.id} exceeded {self.timeout}s')
+                if remaining is not None and remaining <= 0:
+                    raise
+
+
+class _Lane:
+    def __init__(self, name, workers, max_queue):
+        self.name = name
+        self.workers = workers
+        self.max_queue = max_queue
+        self.queue = deque()
+        self.running = 0
+        self.cond = threading.Condition()
+
+
+class JobScheduler:
+    def __init__(self, max_ocr_jobs=2, max_light_jobs=4, max_queue=32, default_timeout=180):
+        self.default_timeout = default_timeout
+        self._ids = itertools.count(1)
+        self._lanes = {'light': _Lane('light', max_light_jobs, max_queue),
+                       'ocr': _Lane('ocr', max_ocr_jobs, max_queue)}
+        for lane in self._lanes.values():
+            for i in range(lane.workers):
+                t = threading.Thread(target=self._worker, args=(lane,), daemon=True,
+                                     name=f'ats-{lane.name}-{i}')
+                t.start()
+
+    def submit(self, fn, *args, lane='light', timeout=None, **kwargs):
+        """Queue `fn(*args, **kwargs)` on `lane` and return a `Job` handle."""
+        if lane not in self._lanes:
+            raise ValueError(f'unknown lane {lane!r}; expected one of {LANES}')
+        q = self._lanes[lane]
+        job = Job(self, lane, fn, args, kwargs, self.default_timeout if timeout is None else timeout)
+        with q.cond:
+            if len(q.queue) >= q.max_queue:
+                raise QueueFull(f'{lane} queue is full ({q.max_queue} jobs waiting)')
+            q.queue.append(job)
+            q.cond.notify()
+        return job
+
+    def run(self, fn, *args, lane='light', timeout=None, **kwargs):
+        """Submit and wait; convenience for short jobs such as prediction."""
+        return self.submit(fn, *args, lane=lane, timeout=timeout, **kwargs).result()
+
+    def _position(self, job):
+        q = self._lanes[job.lane]
+        with q.cond:
+            try:
+                return q.queue.index(job) + 1
+            except ValueError:
+                return 0
+
+    def _worker(self, q):
+        while True:
+            with q.cond:
+                while not q.queue:
+                    q.cond.wait()
+                job = q.queue.popleft()
+                q.running += 1
+            job.status = 'running'
+            job.started_at = time.monotonic()
+            fn, args, kwargs = job._call
+            try:
+                result = job._context.run(fn, *args, **kwargs)
+                job.status = 'done'
+                job.future.set_result(result)
+            except BaseException as e:
+                job.status = 'failed'
+                job.future.set_exception(e)
+            finally:
+                job.finished_at = time.monotonic()
+                job._call = None
+                with q.cond:
+                    q.running -= 1
+
+    def stats(self):
+        out = {}
+        for name, q in self._lanes.items():
+            with q.cond:
+                out[name] = {'queued': len(q.queue), 'running': q.running, 'workers': q.workers,
+                             'max_queue': q.max_queue}
+        return out
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Process-wide scheduler, configured from the environment on first use:
+    ATS_MAX_OCR_JOBS, ATS_MAX_LIGHT_JOBS, ATS_JOB_QUEUE and ATS_JOB_TIMEOUT."""
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = JobScheduler(
+                    max_ocr_jobs=int(os.environ.get('ATS_MAX_OCR_JOBS', 2)),
+                    max_light_jobs=int(os.environ.get('ATS_MAX_LIGHT_JOBS', 4)),
+                    max_queue=int(os.environ.get('ATS_JOB_QUEUE', 32)),
+                    default_timeout=float(os.environ.get('ATS_JOB_TIMEOUT', 180)),
+                )
+    return _default
@@ -0,0 +1,332 @@
+"""Lightweight in-process metrics.
+
+`Histogram` counts observations into fixed cumulative-style buckets (Prometheus `le`
+semantics) so latency and size distributions can be inspected without keeping every
+sample. `REGISTRY` collects per-stage latencies, counters and other histograms for the
+resume pipeline and renders them in the Prometheus text format; see `stage`, `inc`,
+`observe` and `trace` below.
+"""
+import bisect
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+
+def exponential_buckets(start, factor, count):
+    """`count` bucket upper bounds: start, start*factor, start*factor**2, ..."""
+    return tuple(start * factor ** i for i in range(count))
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)   # last slot is +Inf
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[i] += 1
+            self._sum += value
+
+    @property
+    def count(self):
+        return sum(self._counts)
+
+    def snapshot(self):
+        """{'buckets': [(upper bound, cumulative count), ...], 'count', 'sum', 'mean'}."""
+        with self._lock:
+            counts, total = list(self._counts), self._sum
+        cumulative, running = [], 0
+        for bound, c in zip(self.buckets + (float('inf'),), counts):
+            running += c
+            cumulative.append((bound, running))
+        return {'buckets': cumulative, 'count': running, 'sum': total,
+                'mean': total / running if running else 0.0}
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th quantile (0 <= q <= 1)."""
+        snap = self.snapshot()
+        if not snap['count']:
+            return 0.0
+        target = q * snap['count']
+        for bound, running in snap['buckets']:
+            if running >= target:
+                return bound
+        return float('inf')
+
+
+# -- process-wide pipeline metrics ---------------------------------------------------
+#
+# Stage latencies (`ats_stage_seconds{stage=...}`) and counters (`ats_<name>_total`) for
+# the extraction / scoring pipeline. Off unless ATS_METRICS=1 (or ATS_METRICS_FILE /
+# ATS_METRICS_TRACE is set); while off, `stage()` hands back a shared no-op context
+# manager and `inc()` returns straight away, so instrumented code pays one attribute
+# check per call.
+#
+# - ATS_METRICS_FILE   write the Prometheus text exposition here on `flush_file()`
+# - ATS_METRICS_TRACE  append one JSON line per finished `trace()` (per request/upload)
+
+STAGE_BUCKETS = exponential_buckets(0.0005, 2, 19)   # 0.5 ms .. ~131 s
+
+
+class Counter:
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, value=1):
+        with self._lock:
+            self._value += value
+
+    @property
+    def value(self):
+        return self._value
+
+
+class _NoopStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopStage()
+_current_trace = contextvars.ContextVar('ats_metrics_trace', default=None)
+
+
+class _StageTimer:
+    def __init__(self, registry, name):
+        self.registry = registry
+        self.name = name
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.observe_stage(self.name, time.perf_counter() - self._t0, ok=exc_type is None)
+        return False
+
+
+class Trace:
+    """Stages and counters recorded while a `trace()` block is active."""
+
+    def __init__(self, fields):
+        self.fields = fields
+        self.spans = []       # [(stage, seconds, ok), ...] in completion order
+        self.counters = {}
+        self.started = time.time()
+        self._t0 = time.perf_counter()
+
+    def to_dict(self):
+        return dict(self.fields, started=round(self.started, 3),
+                    total_s=round(time.perf_counter() - self._t0, 6),
+                    spans=[{'stage': s, 'seconds': round(sec, 6), 'ok': ok} for s, sec, ok in self.spans],
+                    counters=self.counters)
+
+
+class Registry:
+    def __init__(self, enabled=False, stage_buckets=STAGE_BUCKETS):
+        self.enabled = enabled
+        self.stage_buckets = stage_buckets
+        self._stages = {}     # stage -> Histogram
+        self._counters = {}   # (name, sorted label items) -> Counter
+        self._histograms = {}  # name -> Histogram, for values other than stage latencies
+        self._lock = threading.Lock()
+
+    def stage(self, name):
+        """Context manager timing one run of pipeline stage `name`; a failure (exception)
+        also counts in `ats_failures_total{stage=name}`."""
+        if not self.enabled:
+            return _NOOP
+        return _StageTimer(self, name)
+
+    def observe_stage(self, name, seconds, ok=True):
+        hist = self._stages.get(name)
+        if hist is None:
+            with self._lock:
+                hist = self._stages.setdefault(name, Histogram(self.stage_buckets))
+        hist.observe(seconds)
+        if not ok:
+            # not via inc(): the span below already carries the failure into the trace
+            self.counter('failures', stage=name).inc()
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.spans.append((name, seconds, ok))
+
+    def counter(self, name, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        c = self._counters.get(key)
+        if c is None:
+            with self._lock:
+                c = self._counters.setdefault(key, Counter())
+        return c
+
+    def inc(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+        self.counter(name, **labels).inc(value)
+        trace = _current_trace.get()
+        if trace is not None:
+            key = name if not labels else name + '{' + ','.join(f'{k}={v}' for k, v in sorted(labels.items())) + '}'
+            trace.counters[key] = trace.counters.get(key, 0) + value
+
+    def observe(self, name, value, buckets=STAGE_BUCKETS):
+        """Record `value` in histogram `ats_<name>`; `buckets` apply when it is created."""
+        if not self.enabled:
+            return
+        hist = self._histograms.get(name)
+        if hist is None:
+            with self._lock:
+                hist = self._histograms.setdefault(name, Histogram(buckets))
+        hist.observe(value)
+
+    def replay(self, spans, counters=None):
+        """Record stages / counters collected elsewhere (e.g. a worker process's trace)."""
+        if not self.enabled:
+            return
+        for name, seconds, ok in spans:
+            self.observe_stage(name, seconds, ok)
+        for key, value in (counters or {}).items():
+            name, _, labels = key.partition('{')
+            self.inc(name, value, **dict(kv.split('=', 1) for kv in labels.rstrip('}').split(',') if kv))
+
+    def render_prometheus(self):
+        """The Prometheus text exposition format of every stage, histogram and counter."""
+        lines = ['# HELP ats_stage_seconds Time spent per pipeline stage.',
+                 '# TYPE ats_stage_seconds histogram']
+        for name in sorted(self._stages):
+            _render_histogram(lines, 'ats_stage_seconds', f'stage="{name}"', self._stages[name])
+        for name in sorted(self._histograms):
+            lines.append(f'# TYPE ats_{name} histogram')
+            _render_histogram(lines, f'ats_{name}', '', self._histograms[name])
+        by_name = {}
+        for (name, labels), c in sorted(self._counters.items()):
+            by_name.setdefault(name, []).append((labels, c.value))
+        for name, series in by_name.items():
+            lines.append(f'# TYPE ats_{name}_total counter')
+            for labels, value in series:
+                label_text = ','.join(f'{k}="{v}"' for k, v in labels)
+                lines.append(f'ats_{name}_total{{{label_text}}} {value}' if label_text
+                             else f'ats_{name}_total {value}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        """Atomically replace `path` with the current exposition (for node_exporter's
+        textfile collector or any scraper that reads files)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + f'.{os.getpid()}.tmp')
+        tmp.write_text(self.render_prometheus(), encoding='utf-8')
+        os.replace(tmp, path)
+
+
+def _render_histogram(lines, metric, labels, hist):
+    snap = hist.snapshot()
+    sep = ',' if labels else ''
+    for bound, running in snap['buckets']:
+        le = '+Inf' if bound == float('inf') else repr(float(bound))
+        lines.append(f'{metric}_bucket{{{labels}{sep}le="{le}"}} {running}')
+    suffix = f'{{{labels}}}' if labels else ''
+    lines.append(f'{metric}_sum{suffix} {snap["sum"]!r}')
+    lines.append(f'{metric}_count{suffix} {snap["count"]}')
+
+
+REGISTRY = Registry(enabled=os.environ.get('ATS_METRICS', '') not in ('', '0', 'false')
+                    or bool(os.environ.get('ATS_METRICS_FILE') or os.environ.get('ATS_METRICS_TRACE')))
+_trace_lock = threading.Lock()
+
+
+def enable(on=True):
+    REGISTRY.enabled = on
+
+
+def stage(name):
+    return REGISTRY.stage(name)
+
+
+def inc(name, value=1, **labels):
+    REGISTRY.inc(name, value, **labels)
+
+
+def observe(name, value, buckets=STAGE_BUCKETS):
+    REGISTRY.observe(name, value, buckets)
+
+
+def timed(name):
+    """Decorator form of `stage(name)`."""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            if not REGISTRY.enabled:
+                return fn(*args, **kwargs)
+            with _StageTimer(REGISTRY, name):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+def begin_trace(**fields):
+    """Start recording a trace in the current context; returns a token for `end_trace`.
+
+    For code that cannot wrap the request in a `with trace(...)` block. Returns None
+    when metrics are off.
+    """
+    if not REGISTRY.enabled:
+        return None
+    t = Trace(fields)
+    return t, _current_trace.set(t)
+
+
+def end_trace(token, write=True):
+    """Finish a trace started by `begin_trace` and return it (None when metrics are off)."""
+    if token is None:
+        return None
+    t, ctx_token = token
+    try:
+        _current_trace.reset(ctx_token)
+    except ValueError:
+        # ended from a different context (e.g. a later Streamlit rerun); just detach
+        _current_trace.set(None)
+    if write:
+        write_trace(t.to_dict())
+    return t
+
+
+def write_trace(record):
+    """Append one trace dict as a JSON line to ATS_METRICS_TRACE, when set."""
+    path = os.environ.get('ATS_METRICS_TRACE')
+    if not path:
+        return
+    line = json.dumps(record, default=str) + '\n'
+    with _trace_lock, open(path, 'a', encoding='utf-8') as f:
+        f.write(line)
+
+
+@contextlib.contextmanager
+def trace(write=True, **fields):
+    """Record the stages and counters of one request; appended as a JSON line to
+    ATS_METRICS_TRACE when `write`. Yields the `Trace` (None when metrics are off)."""
+    token = begin_trace(**fields)
+    try:
+        yield None if token is None else token[0]
+    finally:
+        end_trace(token, write=write)
+
+
+def flush_file(path=None):
+    """Write the Prometheus exposition to `path` or ATS_METRICS_FILE, when metrics are on."""
+    path = path or os.environ.get('ATS_METRICS_FILE')
+    if REGISTRY.enabled and path:
+        try:
+            REGISTRY.write_prometheus(path)
+        except OSError:
+            pass
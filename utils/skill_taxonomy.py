@@ -0,0 +1,295 @@
+# Bundled skill taxonomy: (canonical id, display name, synonyms).
+# Matching is case-insensitive and on word boundaries, so synonyms only need to cover
+# spelling variants, abbreviations and common alternative names. A larger taxonomy can
+# be supplied at runtime through ATS_SKILLS_TAXONOMY (see utils/skills.py).
+# Display names shorter than three characters are not matched on their own, so ambiguous
+# words ("go", "r", "c") are only found through their unambiguous synonyms.
+
+SKILLS = (
+    # programming languages
+    ('python', 'Python', ('python3', 'python 3', 'python 2', 'cpython')),
+    ('java', 'Java', ('java se', 'java ee', 'j2ee', 'jakarta ee', 'core java')),
+    ('javascript', 'JavaScript', ('js', 'ecmascript', 'es6', 'es2015', 'vanilla js')),
+    ('typescript', 'TypeScript', ()),
+    ('c', 'C', ('c language', 'c programming', 'ansi c', 'embedded c')),
+    ('cpp', 'C++', ('c++', 'cpp', 'c++11', 'c++14', 'c++17', 'c++20', 'modern c++')),
+    ('csharp', 'C#', ('c#', 'c sharp', 'csharp')),
+    ('golang', 'Go', ('golang', 'go language', 'go programming')),
+    ('rust', 'Rust', ('rust lang', 'rustlang')),
+    ('ruby', 'Ruby', ()),
+    ('php', 'PHP', ('php7', 'php 8')),
+    ('kotlin', 'Kotlin', ()),
+    ('swift', 'Swift', ('swiftui',)),
+    ('objective_c', 'Objective-C', ('objective-c', 'objective c', 'objc')),
+    ('scala', 'Scala', ()),
+    ('r_lang', 'R', ('r programming', 'r language', 'rstudio', 'tidyverse', 'ggplot2', 'dplyr')),
+    ('matlab', 'MATLAB', ('simulink',)),
+    ('julia', 'Julia', ('julia lang',)),
+    ('perl', 'Perl', ()),
+    ('bash', 'Bash', ('shell scripting', 'shell script', 'bash scripting', 'zsh', 'unix shell')),
+    ('powershell', 'PowerShell', ('power shell',)),
+    ('sql', 'SQL', ('structured query language', 'ansi sql', 't-sql', 'tsql', 'pl/sql', 'plsql')),
+    ('haskell', 'Haskell', ()),
+    ('elixir', 'Elixir', ()),
+    ('erlang', 'Erlang', ()),
+    ('clojure', 'Clojure', ()),
+    ('dart', 'Dart', ()),
+    ('lua', 'Lua', ()),
+    ('fortran', 'Fortran', ()),
+    ('cobol', 'COBOL', ()),
+    ('assembly', 'Assembly', ('assembly language', 'x86 assembly', 'arm assembly')),
+    ('vba', 'VBA', ('visual basic for applications', 'excel vba')),
+    ('solidity', 'Solidity', ()),
+    ('html', 'HTML', ('html5', 'hypertext markup language')),
+    ('css', 'CSS', ('css3', 'cascading style sheets')),
+    ('sass', 'Sass', ('scss',)),
+    ('graphql', 'GraphQL', ('graph ql',)),
+    # web frameworks and libraries
+    ('react', 'React', ('react.js', 'reactjs', 'react js', 'react hooks')),
+    ('react_native', 'React Native', ('react-native',)),
+    ('angular', 'Angular', ('angularjs', 'angular.js', 'angular 2+')),
+    ('vue', 'Vue.js', ('vue', 'vuejs', 'vue.js', 'vue 3')),
+    ('svelte', 'Svelte', ('sveltekit',)),
+    ('nextjs', 'Next.js', ('next.js', 'nextjs')),
+    ('nodejs', 'Node.js', ('node.js', 'nodejs', 'node js')),
+    ('express', 'Express.js', ('express.js', 'expressjs')),
+    ('django', 'Django', ('django rest framework', 'drf')),
+    ('flask', 'Flask', ()),
+    ('fastapi', 'FastAPI', ('fast api',)),
+    ('spring', 'Spring', ('spring boot', 'spring framework', 'springboot', 'spring mvc')),
+    ('rails', 'Ruby on Rails', ('ruby on rails', 'rails', 'ror')),
+    ('laravel', 'Laravel', ()),
+    ('dotnet', '.NET', ('.net', '.net core', 'dotnet', 'asp.net', 'asp.net core')),
+    ('jquery', 'jQuery', ()),
+    ('redux', 'Redux', ()),
+    ('tailwind', 'Tailwind CSS', ('tailwind', 'tailwindcss')),
+    ('bootstrap', 'Bootstrap', ()),
+    ('webpack', 'Webpack', ()),
+    ('rest_api', 'REST APIs', ('restful', 'rest api', 'rest apis', 'restful api', 'restful services')),
+    ('grpc', 'gRPC', ()),
+    ('microservices', 'Microservices', ('microservice', 'micro services', 'microservice architecture')),
+    ('flutter', 'Flutter', ()),
+    ('android', 'Android', ('android sdk', 'android development')),
+    ('ios', 'iOS', ('ios development',)),
+    # data and machine learning
+    ('machine_learning', 'Machine Learning', ('machine learning', 'ml', 'statistical learning')),
+    ('deep_learning', 'Deep Learning', ('deep learning', 'neural networks', 'neural network')),
+    ('nlp', 'Natural Language Processing', ('nlp', 'natural language processing', 'text mining')),
+    ('computer_vision', 'Computer Vision', ('computer vision', 'image processing', 'opencv')),
+    ('data_analysis', 'Data Analysis', ('data analysis', 'data analytics', 'analytics')),
+    ('data_science', 'Data Science', ('data science',)),
+    ('data_engineering', 'Data Engineering', ('data engineering', 'data pipelines', 'data pipeline')),
+    ('data_visualization', 'Data Visualization', ('data visualization', 'data visualisation', 'dashboards', 'dashboarding')),
+    ('statistics', 'Statistics', ('statistical analysis', 'statistical modeling', 'statistical modelling', 'biostatistics')),
+    ('ab_testing', 'A/B Testing', ('a/b testing', 'ab testing', 'split testing', 'experimentation')),
+    ('etl', 'ETL', ('extract transform load', 'elt', 'etl pipelines')),
+    ('pandas', 'pandas', ()),
+    ('numpy', 'NumPy', ()),
+    ('scipy', 'SciPy', ()),
+    ('scikit_learn', 'scikit-learn', ('scikit-learn', 'scikit learn', 'sklearn')),
+    ('tensorflow', 'TensorFlow', ('tensor flow', 'tf2', 'keras')),
+    ('pytorch', 'PyTorch', ('pytorch lightning',)),
+    ('xgboost', 'XGBoost', ('lightgbm', 'catboost', 'gradient boosting')),
+    ('huggingface', 'Hugging Face', ('hugging face', 'huggingface', 'transformers library')),
+    ('llm', 'Large Language Models', ('llm', 'llms', 'large language models', 'generative ai', 'genai', 'prompt engineering')),
+    ('mlops', 'MLOps', ('ml ops', 'mlflow', 'kubeflow', 'model deployment')),
+    ('matplotlib', 'Matplotlib', ('seaborn', 'plotly')),
+    ('jupyter', 'Jupyter', ('jupyter notebook', 'jupyterlab', 'ipython')),
+    ('spark', 'Apache Spark', ('spark', 'apache spark', 'pyspark', 'spark sql', 'spark streaming')),
+    ('hadoop', 'Hadoop', ('hdfs', 'mapreduce', 'apache hadoop', 'hive', 'apache hive')),
+    ('kafka', 'Kafka', ('apache kafka', 'kafka streams')),
+    ('airflow', 'Airflow', ('apache airflow',)),
+    ('dbt', 'dbt', ('data build tool',)),
+    ('flink', 'Flink', ('apache flink',)),
+    ('beam', 'Apache Beam', ('apache beam', 'dataflow')),
+    ('snowflake', 'Snowflake', ()),
+    ('databricks', 'Databricks', ('delta lake',)),
+    ('bigquery', 'BigQuery', ('big query', 'google bigquery')),
+    ('redshift', 'Redshift', ('amazon redshift', 'aws redshift')),
+    ('tableau', 'Tableau', ()),
+    ('power_bi', 'Power BI', ('power bi', 'powerbi', 'dax')),
+    ('looker', 'Looker', ('looker studio', 'data studio')),
+    ('excel', 'Excel', ('microsoft excel', 'ms excel', 'advanced excel', 'pivot tables', 'vlookup', 'spreadsheets')),
+    ('sas', 'SAS', ('sas enterprise guide',)),
+    ('spss', 'SPSS', ('ibm spss',)),
+    ('stata', 'Stata', ()),
+    # databases
+    ('postgresql', 'PostgreSQL', ('postgres', 'postgresql', 'psql')),
+    ('mysql', 'MySQL', ('mariadb',)),
+    ('sql_server', 'SQL Server', ('sql server', 'mssql', 'ms sql', 'microsoft sql server')),
+    ('oracle_db', 'Oracle Database', ('oracle database', 'oracle db', 'oracle 19c')),
+    ('sqlite', 'SQLite', ()),
+    ('mongodb', 'MongoDB', ('mongo', 'mongo db')),
+    ('redis', 'Redis', ()),
+    ('cassandra', 'Cassandra', ('apache cassandra', 'scylladb')),
+    ('elasticsearch', 'Elasticsearch', ('elastic search', 'opensearch', 'elk stack', 'elk')),
+    ('dynamodb', 'DynamoDB', ('dynamo db', 'amazon dynamodb')),
+    ('neo4j', 'Neo4j', ('graph database', 'cypher')),
+    ('nosql', 'NoSQL', ('no sql', 'nosql databases')),
+    ('database_design', 'Database Design', ('database design', 'data modeling', 'data modelling', 'schema design')),
+    # cloud and devops
+    ('aws', 'AWS', ('amazon web services', 'aws cloud', 'ec2', 's3', 'aws lambda', 'cloudformation')),
+    ('azure', 'Azure', ('microsoft azure', 'azure devops', 'azure functions')),
+    ('gcp', 'Google Cloud', ('gcp', 'google cloud', 'google cloud platform')),
+    ('docker', 'Docker', ('containers', 'containerization', 'docker compose', 'docker-compose')),
+    ('kubernetes', 'Kubernetes', ('k8s', 'helm', 'openshift', 'eks', 'aks', 'gke')),
+    ('terraform', 'Terraform', ('infrastructure as code', 'iac')),
+    ('ansible', 'Ansible', ()),
+    ('puppet', 'Puppet', ()),
+    ('chef', 'Chef', ('chef infra',)),
+    ('jenkins', 'Jenkins', ()),
+    ('ci_cd', 'CI/CD', ('ci/cd', 'ci cd', 'continuous integration', 'continuous delivery', 'continuous deployment')),
+    ('github_actions', 'GitHub Actions', ('github actions',)),
+    ('gitlab_ci', 'GitLab CI', ('gitlab ci', 'gitlab ci/cd')),
+    ('git', 'Git', ('github', 'gitlab', 'bitbucket', 'version control')),
+    ('linux', 'Linux', ('ubuntu', 'centos', 'red hat', 'rhel', 'debian', 'unix')),
+    ('devops', 'DevOps', ('dev ops',)),
+    ('sre', 'Site Reliability Engineering', ('site reliability engineering', 'sre')),
+    ('prometheus', 'Prometheus', ()),
+    ('grafana', 'Grafana', ()),
+    ('datadog', 'Datadog', ()),
+    ('splunk', 'Splunk', ()),
+    ('nginx', 'Nginx', ()),
+    ('serverless', 'Serverless', ('serverless architecture',)),
+    ('networking', 'Networking', ('tcp/ip', 'dns', 'load balancing', 'vpn', 'routing and switching')),
+    ('cybersecurity', 'Cybersecurity', ('cyber security', 'information security', 'infosec', 'network security')),
+    ('penetration_testing', 'Penetration Testing', ('penetration testing', 'pen testing', 'ethical hacking', 'vulnerability assessment')),
+    ('siem', 'SIEM', ('security information and event management',)),
+    ('iam', 'Identity and Access Management', ('identity and access management', 'iam', 'oauth', 'oauth2', 'saml', 'sso')),
+    ('cryptography', 'Cryptography', ('encryption', 'pki')),
+    # testing and quality
+    ('unit_testing', 'Unit Testing', ('unit testing', 'unit tests', 'tdd', 'test driven development', 'test-driven development')),
+    ('pytest', 'pytest', ()),
+    ('junit', 'JUnit', ()),
+    ('selenium', 'Selenium', ('selenium webdriver',)),
+    ('cypress', 'Cypress', ()),
+    ('jest', 'Jest', ()),
+    ('qa', 'Quality Assurance', ('quality assurance', 'qa testing', 'manual testing', 'test automation', 'automation testing')),
+    ('performance_testing', 'Performance Testing', ('load testing', 'jmeter', 'performance testing', 'gatling')),
+    # software engineering practice
+    ('oop', 'Object-Oriented Programming', ('oop', 'object oriented programming', 'object-oriented programming', 'object oriented design')),
+    ('design_patterns', 'Design Patterns', ('design patterns',)),
+    ('system_design', 'System Design', ('system design', 'distributed systems', 'software architecture', 'scalability')),
+    ('data_structures', 'Data Structures & Algorithms', ('data structures', 'algorithms', 'dsa')),
+    ('api_design', 'API Design', ('api design', 'api development', 'openapi', 'swagger')),
+    ('agile', 'Agile', ('agile methodology', 'agile methodologies', 'agile development')),
+    ('scrum', 'Scrum', ('scrum master', 'sprint planning')),
+    ('kanban', 'Kanban', ()),
+    ('jira', 'Jira', ('atlassian jira', 'confluence')),
+    ('code_review', 'Code Review', ('code review', 'code reviews', 'peer review')),
+    ('debugging', 'Debugging', ('troubleshooting',)),
+    ('embedded_systems', 'Embedded Systems', ('embedded systems', 'firmware', 'microcontrollers', 'rtos', 'arduino', 'raspberry pi')),
+    ('blockchain', 'Blockchain', ('ethereum', 'smart contracts', 'web3')),
+    ('game_development', 'Game Development', ('game development', 'unity', 'unreal engine', 'unity3d')),
+    ('ar_vr', 'AR/VR', ('augmented reality', 'virtual reality', 'ar/vr')),
+    ('robotics', 'Robotics', ('ros', 'robot operating system')),
+    ('iot', 'IoT', ('internet of things', 'iot')),
+    # design
+    ('ui_ux', 'UI/UX Design', ('ui/ux', 'ux design', 'ui design', 'user experience', 'user interface design', 'usability testing', 'wireframing')),
+    ('figma', 'Figma', ()),
+    ('sketch', 'Sketch', ()),
+    ('adobe_xd', 'Adobe XD', ('adobe xd',)),
+    ('photoshop', 'Photoshop', ('adobe photoshop',)),
+    ('illustrator', 'Illustrator', ('adobe illustrator',)),
+    ('indesign', 'InDesign', ('adobe indesign',)),
+    ('premiere', 'Premiere Pro', ('premiere pro', 'adobe premiere', 'video editing', 'final cut pro')),
+    ('after_effects', 'After Effects', ('after effects', 'motion graphics')),
+    ('graphic_design', 'Graphic Design', ('graphic design', 'visual design', 'branding')),
+    ('autocad', 'AutoCAD', ('auto cad', 'cad')),
+    ('solidworks', 'SolidWorks', ('solid works',)),
+    ('revit', 'Revit', ('bim',)),
+    # business, product and management
+    ('project_management', 'Project Management', ('project management', 'project planning', 'pmp', 'prince2')),
+    ('product_management', 'Product Management', ('product management', 'product roadmap', 'product strategy', 'product owner')),
+    ('program_management', 'Program Management', ('program management', 'programme management')),
+    ('stakeholder_management', 'Stakeholder Management', ('stakeholder management', 'stakeholder engagement')),
+    ('business_analysis', 'Business Analysis', ('business analysis', 'requirements gathering', 'requirements analysis', 'business requirements')),
+    ('business_intelligence', 'Business Intelligence', ('business intelligence', 'bi reporting')),
+    ('strategy', 'Strategic Planning', ('strategic planning', 'business strategy', 'corporate strategy')),
+    ('leadership', 'Leadership', ('team leadership', 'people management', 'team management', 'mentoring', 'coaching')),
+    ('communication', 'Communication', ('communication skills', 'verbal communication', 'written communication', 'public speaking', 'presentation skills')),
+    ('negotiation', 'Negotiation', ('contract negotiation',)),
+    ('problem_solving', 'Problem Solving', ('problem solving', 'problem-solving', 'critical thinking', 'analytical skills')),
+    ('teamwork', 'Teamwork', ('collaboration', 'cross-functional collaboration', 'team player')),
+    ('time_management', 'Time Management', ('time management', 'prioritization', 'multitasking')),
+    ('change_management', 'Change Management', ('change management',)),
+    ('risk_management', 'Risk Management', ('risk management', 'risk assessment', 'risk analysis')),
+    ('process_improvement', 'Process Improvement', ('process improvement', 'six sigma', 'lean six sigma', 'kaizen', 'continuous improvement')),
+    ('operations_management', 'Operations Management', ('operations management',)),
+    ('supply_chain', 'Supply Chain Management', ('supply chain', 'supply chain management', 'logistics', 'procurement', 'inventory management', 'sourcing')),
+    ('erp', 'ERP', ('erp systems', 'sap', 'oracle erp', 'netsuite', 'dynamics 365')),
+    ('crm', 'CRM', ('salesforce', 'hubspot', 'customer relationship management', 'zoho crm')),
+    ('budgeting', 'Budgeting', ('budget management', 'forecasting', 'financial planning', 'fp&a')),
+    ('vendor_management', 'Vendor Management', ('vendor management', 'supplier management')),
+    ('consulting', 'Consulting', ('management consulting', 'client advisory')),
+    ('entrepreneurship', 'Entrepreneurship', ('business development',)),
+    # finance and accounting
+    ('accounting', 'Accounting', ('bookkeeping', 'general ledger', 'accounts payable', 'accounts receivable', 'reconciliation', 'gaap', 'ifrs')),
+    ('financial_analysis', 'Financial Analysis', ('financial analysis', 'financial modeling', 'financial modelling', 'valuation', 'dcf')),
+    ('auditing', 'Auditing', ('internal audit', 'external audit', 'sox compliance')),
+    ('taxation', 'Taxation', ('tax preparation', 'tax compliance', 'tax planning')),
+    ('quickbooks', 'QuickBooks', ('quick books', 'xero', 'tally')),
+    ('investment', 'Investment Analysis', ('investment analysis', 'portfolio management', 'equity research', 'asset management')),
+    ('banking', 'Banking', ('retail banking', 'investment banking', 'credit analysis', 'kyc', 'aml', 'anti-money laundering')),
+    ('payroll', 'Payroll', ('payroll processing', 'adp')),
+    ('cfa', 'CFA', ('chartered financial analyst',)),
+    ('cpa', 'CPA', ('certified public accountant', 'chartered accountant', 'acca')),
+    # marketing and sales
+    ('digital_marketing', 'Digital Marketing', ('digital marketing', 'online marketing', 'performance marketing')),
+    ('seo', 'SEO', ('search engine optimization', 'search engine optimisation')),
+    ('sem', 'SEM', ('search engine marketing', 'google ads', 'adwords', 'ppc', 'pay per click')),
+    ('social_media', 'Social Media Marketing', ('social media', 'social media marketing', 'instagram marketing', 'linkedin marketing')),
+    ('content_marketing', 'Content Marketing', ('content marketing', 'content strategy', 'copywriting', 'content writing', 'blogging')),
+    ('email_marketing', 'Email Marketing', ('email marketing', 'mailchimp', 'email campaigns')),
+    ('marketing_analytics', 'Marketing Analytics', ('marketing analytics', 'google analytics', 'ga4', 'web analytics')),
+    ('market_research', 'Market Research', ('market research', 'competitive analysis', 'customer research', 'surveys')),
+    ('brand_management', 'Brand Management', ('brand management', 'brand strategy')),
+    ('public_relations', 'Public Relations', ('public relations', 'media relations')),
+    ('sales', 'Sales', ('b2b sales', 'b2c sales', 'inside sales', 'lead generation', 'cold calling', 'account management', 'business-to-business')),
+    ('customer_service', 'Customer Service', ('customer service', 'customer support', 'client relations', 'customer success', 'help desk', 'helpdesk')),
+    ('ecommerce', 'E-commerce', ('e-commerce', 'ecommerce', 'shopify', 'magento', 'woocommerce')),
+    # people and operations
+    ('recruiting', 'Recruiting', ('recruitment', 'talent acquisition', 'sourcing candidates', 'interviewing', 'onboarding')),
+    ('human_resources', 'Human Resources', ('human resources', 'hris', 'employee relations', 'performance management')),
+    ('training', 'Training & Development', ('training and development', 'learning and development', 'l&d', 'curriculum development')),
+    ('administration', 'Office Administration', ('office administration', 'administrative support', 'data entry', 'scheduling', 'calendar management')),
+    ('ms_office', 'Microsoft Office', ('microsoft office', 'ms office', 'microsoft word', 'ms word', 'powerpoint', 'outlook', 'office 365', 'microsoft 365')),
+    ('google_workspace', 'Google Workspace', ('google workspace', 'g suite', 'google sheets', 'google docs')),
+    ('technical_writing', 'Technical Writing', ('technical writing', 'documentation', 'technical documentation')),
+    ('translation', 'Translation', ('translation', 'interpretation', 'localization')),
+    # healthcare and science
+    ('patient_care', 'Patient Care', ('patient care', 'clinical care', 'bedside care')),
+    ('nursing', 'Nursing', ('registered nurse', 'icu', 'intensive care', 'emergency nursing')),
+    ('ehr', 'Electronic Health Records', ('electronic health records', 'electronic health record', 'ehr', 'emr', 'epic systems', 'cerner')),
+    ('medication_administration', 'Medication Administration', ('medication administration',)),
+    ('infection_control', 'Infection Control', ('infection control', 'infection prevention')),
+    ('bls', 'BLS/ACLS', ('bls', 'acls', 'cpr', 'basic life support', 'first aid')),
+    ('medical_coding', 'Medical Coding', ('medical coding', 'icd-10', 'cpt coding', 'medical billing')),
+    ('pharmacology', 'Pharmacology', ('pharmacy', 'pharmacology')),
+    ('clinical_research', 'Clinical Research', ('clinical research', 'clinical trials', 'gcp compliance')),
+    ('laboratory', 'Laboratory Techniques', ('laboratory techniques', 'lab techniques', 'pcr', 'cell culture', 'western blot', 'elisa')),
+    ('bioinformatics', 'Bioinformatics', ('genomics', 'computational biology')),
+    ('hipaa', 'HIPAA', ('hipaa compliance',)),
+    # engineering and trades
+    ('mechanical_engineering', 'Mechanical Engineering', ('mechanical engineering', 'mechanical design', 'thermodynamics', 'fea', 'ansys')),
+    ('electrical_engineering', 'Electrical Engineering', ('electrical engineering', 'circuit design', 'pcb design', 'plc', 'scada')),
+    ('civil_engineering', 'Civil Engineering', ('civil engineering', 'structural engineering', 'structural analysis', 'staad pro')),
+    ('chemical_engineering', 'Chemical Engineering', ('chemical engineering', 'process engineering')),
+    ('quality_control', 'Quality Control', ('quality control', 'qc', 'iso 9001', 'quality management')),
+    ('manufacturing', 'Manufacturing', ('manufacturing', 'production planning', 'cnc', 'lean manufacturing')),
+    ('construction_management', 'Construction Management', ('construction management', 'site management', 'estimating')),
+    ('health_safety', 'Health & Safety', ('health and safety', 'osha', 'ehs', 'hse')),
+    # education and legal
+    ('teaching', 'Teaching', ('lesson planning', 'classroom management', 'tutoring')),
+    ('legal_research', 'Legal Research', ('legal research', 'legal writing', 'litigation', 'contract drafting', 'paralegal')),
+    ('compliance', 'Compliance', ('regulatory compliance', 'gdpr', 'compliance')),
+    # languages
+    ('english', 'English', ('fluent english', 'english proficiency')),
+    ('spanish', 'Spanish', ()),
+    ('french', 'French', ()),
+    ('german', 'German', ()),
+    ('mandarin', 'Mandarin', ('chinese mandarin',)),
+    ('hindi', 'Hindi', ()),
+    ('arabic', 'Arabic', ()),
+    ('japanese', 'Japanese', ()),
+)
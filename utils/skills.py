@@ -0,0 +1,242 @@
+"""Skill detection against a taxonomy of canonical skills and their synonyms.
+
+All surface forms of all skills are compiled into one Aho-Corasick automaton, so a resume
+is scanned once, character by character, whatever the size of the taxonomy; one regex
+per skill would rescan the text tens of thousands of times. A match only counts when it
+starts and ends on a word boundary ("java" does not fire inside "javascript", "aws"
+not inside "laws"), runs of whitespace in the text match a single space in a pattern,
+and overlapping matches resolve to the longest one ("machine learning" rather than
+"learning").
+
+Building the automaton for a large taxonomy takes a while, so the built tables are
+written as plain JSON to a cache directory keyed by a hash of the taxonomy; later
+processes load them instead of rebuilding. The cache is data only (never a pickle), so
+a tampered file in a shared cache dir cannot run code; one that does not check out is
+rebuilt.
+
+The bundled taxonomy lives in `skill_taxonomy.py`. ATS_SKILLS_TAXONOMY can point to a
+larger one: a JSON list of {"id", "name", "synonyms"} objects, or a CSV with
+id,name,synonyms columns (synonyms separated by "|").
+"""
+import csv
+import hashlib
+import json
+import os
+import threading
+from collections import deque
+from pathlib import Path
+from typing import NamedTuple
+
+from .skill_taxonomy import SKILLS
+
+# bump when the cached automaton layout changes
+AUTOMATON_VERSION = '2'
+
+
+class SkillMatch(NamedTuple):
+    id: str        # canonical skill id
+    name: str      # display name
+    start: int     # offsets into the original text
+    end: int
+    surface: str   # the text that matched
+
+
+def _is_word(ch):
+    return ch.isalnum() or ch == '_'
+
+
+def load_taxonomy(path=None):
+    """Return [(id, name, synonyms), ...] from `path`, ATS_SKILLS_TAXONOMY or the bundled list."""
+    path = path or os.environ.get('ATS_SKILLS_TAXONOMY')
+    if not path:
+        return [(sid, name, tuple(syn)) for sid, name, syn in SKILLS]
+    p = Path(path)
+    if p.suffix.lower() == '.json':
+        return [(e['id'], e.get('name', e['id']), tuple(e.get('synonyms', ())))
+                for e in json.loads(p.read_text(encoding='utf-8'))]
+    with open(p, newline='', encoding='utf-8') as f:
+        return [(row['id'], row.get('name') or row['id'],
+                 tuple(s.strip() for s in (row.get('synonyms') or '').split('|') if s.strip()))
+                for row in csv.DictReader(f)]
+
+
+def _surface_forms(name, synonyms):
+    forms = set(' '.join(s.lower().split()) for s in synonyms)
+    if len(name) >= 3:
+        forms.add(' '.join(name.lower().split()))
+    return sorted(f for f in forms if f)
+
+
+class SkillMatcher:
+    def __init__(self, taxonomy):
+        self.skills = []         # skill index -> (id, name)
+        self.patterns = []       # pattern index -> (skill index, length)
+        self._goto = [{}]        # state -> {char: state}
+        self._fail = [0]
+        self._out = [()]         # state -> pattern indexes ending here (incl. via fail links)
+        self._build(taxonomy)
+
+    def to_json(self):
+        """The built tables as JSON-compatible data, for the on-disk cache."""
+        return {'skills': self.skills, 'patterns': self.patterns, 'goto': self._goto,
+                'fail': self._fail, 'out': self._out}
+
+    @classmethod
+    def from_json(cls, data):
+        """Rebuild a matcher from `to_json` output. Raises ValueError when the tables are
+        malformed or inconsistent, so a corrupt cache falls back to a rebuild."""
+        try:
+            skills, patterns = data['skills'], data['patterns']
+            goto, fail, out = data['goto'], data['fail'], data['out']
+            # checked in bulk: converting element by element would cost as much as a rebuild
+            targets = [nxt for edges in goto for nxt in edges.values()] + fail
+            pids = [pid for ids in out for pid in ids]
+            n = len(goto)
+            ok = (n and len(fail) == n and len(out) == n
+                  and set(map(type, targets)) <= {int} and set(map(type, pids)) <= {int}
+                  and 0 <= min(targets) and max(targets) < n
+                  and (not pids or (0 <= min(pids) and max(pids) < len(patterns)))
+                  and all(len(p) == 2 and type(p[0]) is int and type(p[1]) is int
+                          and 0 <= p[0] < len(skills) and p[1] > 0 for p in patterns)
+                  and all(len(sk) == 2 and type(sk[0]) is str and type(sk[1]) is str for sk in skills))
+        except (KeyError, TypeError, AttributeError) as e:
+            raise ValueError(f'malformed skill automaton tables: {e}')
+        if not ok:
+            raise ValueError('inconsistent skill automaton tables')
+        matcher = cls.__new__(cls)
+        matcher.skills, matcher.patterns = skills, patterns
+        matcher._goto, matcher._fail, matcher._out = goto, fail, out
+        return matcher
+
+    def _build(self, taxonomy):
+        seen = {}
+        for sid, name, synonyms in taxonomy:
+            if sid in seen:
+                continue
+            seen[sid] = len(self.skills)
+            self.skills.append((sid, name))
+            for form in _surface_forms(name, synonyms):
+                state = 0
+                for ch in form:
+                    nxt = self._goto[state].get(ch)
+                    if nxt is None:
+                        nxt = len(self._goto)
+                        self._goto[state][ch] = nxt
+                        self._goto.append({})
+                        self._fail.append(0)
+                        self._out.append(())
+                    state = nxt
+                self.patterns.append((seen[sid], len(form)))
+                self._out[state] = self._out[state] + (len(self.patterns) - 1,)
+        # breadth-first fail links; outputs are merged so a scan never walks fail chains for them
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                if self._out[self._fail[nxt]]:
+                    self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text):
+        """All skill mentions in `text` as `SkillMatch`es, in order, without overlaps."""
+        if not isinstance(text, str) or not text:
+            return []
+        goto, fail, out, patterns = self._goto, self._fail, self._out, self.patterns
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # rare case-folding that changes length (e.g. 'İ'); keep offsets aligned
+            lowered = ''.join(c.lower()[0] for c in text)
+        positions = []   # original offset of every character fed to the automaton
+        hits = []
+        state = 0
+        prev_space = True
+        for pos, ch in enumerate(lowered):
+            if ch.isspace():
+                if prev_space:
+                    continue
+                ch, prev_space = ' ', True
+            else:
+                prev_space = False
+            positions.append(pos)
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for pid in out[state]:
+                skill, length = patterns[pid]
+                start, end = positions[len(positions) - length], pos + 1
+                # word boundaries, checked only where the pattern itself starts/ends with a word char
+                if _is_word(lowered[start]) and start > 0 and _is_word(lowered[start - 1]):
+                    continue
+                if _is_word(lowered[pos]) and end < len(lowered) and _is_word(lowered[end]):
+                    continue
+                hits.append((start, end, skill))
+        # leftmost-longest, non-overlapping
+        hits.sort(key=lambda h: (h[0], -(h[1] - h[0])))
+        matches, last_end = [], -1
+        for start, end, skill in hits:
+            if start < last_end:
+                continue
+            sid, name = self.skills[skill]
+            matches.append(SkillMatch(sid, name, start, end, text[start:end]))
+            last_end = end
+        return matches
+
+    def skill_names(self, text):
+        """Display names of the distinct skills found, in order of first mention."""
+        seen, names = set(), []
+        for m in self.find(text):
+            if m.id not in seen:
+                seen.add(m.id)
+                names.append(m.name)
+        return names
+
+
+def _cache_dir():
+    return Path(os.environ.get('ATS_SKILLS_CACHE_DIR') or Path.home() / '.cache' / 'ats-resume-analyzer')
+
+
+def build_matcher(taxonomy=None, cache_dir=None):
+    """Build a SkillMatcher, loading the automaton from the on-disk cache when possible."""
+    taxonomy = load_taxonomy() if taxonomy is None else taxonomy
+    digest = hashlib.sha256(repr((AUTOMATON_VERSION, list(taxonomy))).encode('utf-8')).hexdigest()[:24]
+    path = Path(cache_dir or _cache_dir()) / f'skills-{digest}.json'
+    try:
+        data = json.loads(path.read_text(encoding='utf-8'))
+        if data.get('version') == AUTOMATON_VERSION and data.get('digest') == digest:
+            return SkillMatcher.from_json(data)
+    except (OSError, ValueError, AttributeError):
+        pass
+    matcher = SkillMatcher(taxonomy)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f'.{os.getpid()}.tmp')
+        tmp.write_text(json.dumps(dict(matcher.to_json(), version=AUTOMATON_VERSION, digest=digest),
+                                  ensure_ascii=False, separators=(',', ':')), encoding='utf-8')
+        os.replace(tmp, path)
+    except OSError:
+        # read-only home or cache dir: keep the in-memory automaton only
+        pass
+    return matcher
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def get_matcher():
+    """Process-wide SkillMatcher for the configured taxonomy."""
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = build_matcher()
+    return _default
+
+
+def find_skills(text):
+    return get_matcher().find(text)
@@ -0,0 +1,37 @@
+"""Cold-start timing for the app process.
+
+`mark(name)` records how long the process had been alive the first time a milestone is
+reached (later calls are no-ops), so container cold-start latency can be tracked from
+interpreter start rather than from when the app module happened to be imported.
+"""
+import os
+import time
+
+_IMPORTED_AT = time.perf_counter()
+_marks = {}
+
+
+def process_age():
+    """Seconds since this process started (Linux /proc), else since this module loaded."""
+    try:
+        with open('/proc/self/stat') as f:
+            # fields after the ')' closing the command name start at field 3 (state);
+            # starttime is field 22, in clock ticks since boot
+            fields = f.read().rsplit(')', 1)[1].split()
+        start = int(fields[19]) / os.sysconf('SC_CLK_TCK')
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        return max(uptime - start, 0.0)
+    except Exception:
+        return time.perf_counter() - _IMPORTED_AT
+
+
+def mark(name):
+    """Record the process age at the first occurrence of `name` and return it."""
+    if name not in _marks:
+        _marks[name] = round(process_age(), 4)
+    return _marks[name]
+
+
+def marks():
+    return dict(_marks)
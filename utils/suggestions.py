@@ -1,21 +1,9 @@
-import re
-from pathlib import Path
-from .helpers import extract_skills_from_text
+from .features import analyze
+from .metrics import timed
 
-def _has_email(text):
-    return bool(re.search(r"\b[\w.%+-]+@[\w.-]+\.[A-Za-z]{2,}\b", text))
 
-def _has_phone(text):
-    return bool(re.search(r"\b(\+?\d[\d\s\-()]{6,}\d)\b", text))
-
-def _word_count(text):
-    return len(text.split()) if isinstance(text, str) else 0
-
-def _has_numbers(text):
-    return bool(re.search(r"\d", text))
-
-
-def generate_suggestions(text: str, max_suggestions: int = 6):
+@timed('suggestions')
+def generate_suggestions(text: str, max_suggestions: int = 6, features=None):
     """Return a list of suggestion strings for the given resume text.
 
     The rules are simple and heuristic-based:
@@ -25,19 +13,23 @@ def generate_suggestions(text: str, max_suggestions: int = 6):
     - Suggest listing more skills when few detected.
     - Recommend adding bullets or sections if content looks like a paragraph.
     - Recommend quantifying achievements if no numbers are present.
+
+    `features` is the `utils.features.analyze` record for `text`; it is computed (and
+    memoized) here when not given.
     """
-    if not isinstance(text, str) or not text.strip():
+    f = features if features is not None else analyze(text)
+    if f.empty:
         return [
             "Resume text is empty — add a brief summary, contact info, and key skills.",
         ]
 
     suggestions = []
-    wc = _word_count(text)
+    wc = f.words
 
     # Contact info
-    if not _has_email(text):
+    if not f.has_email:
         suggestions.append("Add an email address at the top so recruiters can contact you.")
-    if not _has_phone(text):
+    if not f.has_phone:
         suggestions.append("Add a phone number or other contact method (phone/LinkedIn).")
 
     # Summary / objective
@@ -47,25 +39,21 @@ def generate_suggestions(text: str, max_suggestions: int = 6):
         suggestions.append("The resume looks long — condense to 1-2 pages and keep only most relevant experience.")
 
     # Skills
-    skills = extract_skills_from_text(text)
-    if len(skills) < 3:
+    if len(f.skills) < 3:
         suggestions.append("List 5–10 concrete technical or domain skills (e.g., Python, SQL, Project Management).")
 
     # Bullets / readability
     # Count newlines and sentences approximated by periods
-    newlines = text.count('\n')
-    sentences = text.count('.')
-    if newlines < 3 and sentences > 3:
+    if f.lines < 3 and f.sentences > 3:
         suggestions.append("Use bullet points for responsibilities and achievements rather than long paragraphs for readability.")
 
     # Quantify achievements
-    if not _has_numbers(text):
+    if not f.digits:
         suggestions.append("Where possible, quantify achievements (e.g., 'Improved X by 30%') to show impact.")
 
     # Formatting / grammar hints (basic)
     # If too many uppercase words (possible ALL CAPS sections)
-    uppercase_words = sum(1 for w in re.findall(r"\b[A-Z]{2,}\b", text))
-    if uppercase_words > 10:
+    if f.caps_words > 10:
         suggestions.append("Avoid ALL-CAPS sections; use normal sentence case for readability.")
 
     # Deduplicate and limit
@@ -81,14 +69,17 @@ def generate_suggestions(text: str, max_suggestions: int = 6):
     return final
 
 
-def generate_deep_suggestions(text: str, max_paragraphs: int = 6):
+@timed('suggestions')
+def generate_deep_suggestions(text: str, max_paragraphs: int = 6, features=None):
     """Generate longer, resume-specific suggestions (paragraphs) tailored to the resume text.
 
     Each suggestion is a multi-sentence paragraph explaining what to improve and how,
     plus concrete examples or templates where applicable. This function uses heuristic
-    rules and simple templates; it does not call external APIs.
+    rules and simple templates; it does not call external APIs. `features` is as for
+    `generate_suggestions`.
     """
-    if not isinstance(text, str) or not text.strip():
+    f = features if features is not None else analyze(text)
+    if f.empty:
         return [
             (
                 "Resume is empty — add a concise professional summary at the top, include contact "
@@ -100,21 +91,8 @@ def generate_deep_suggestions(text: str, max_paragraphs: int = 6):
 
     paragraphs = []
 
-    def has_email(t):
-        return bool(re.search(r"\b[\w.%+-]+@[\w.-]+\.[A-Za-z]{2,}\b", t))
-
-    def has_phone(t):
-        return bool(re.search(r"\b(\+?\d[\d\s\-()]{6,}\d)\b", t))
-
-    def extract_head(text):
-        # first few lines, used to show current top-of-resume content
-        head_lines = [ln.strip() for ln in text.strip().splitlines() if ln.strip()]
-        if head_lines:
-            return ' '.join(head_lines[:3])[:600]
-        return text[:600]
-
     # 1) Contact & header
-    if not has_email(text) or not has_phone(text):
+    if not f.has_email or not f.has_phone:
         paragraphs.append(
             (
                 "Contact and header: Your resume should start with a clear header containing your full name, "
@@ -125,9 +103,8 @@ def generate_deep_suggestions(text: str, max_paragraphs: int = 6):
         )
 
     # 2) Summary / Objective rewrite with sample
-    summary = extract_head(text)
-    skills = extract_skills_from_text(text)
-    top_skills = [s.title() for s in skills[:6]]
+    summary = f.head
+    top_skills = f.skills[:6]
     skill_phrase = ', '.join(top_skills) if top_skills else ''
     suggested_summary = (
         (f"Experienced {skill_phrase} professional" if skill_phrase else "Experienced professional")
@@ -178,13 +155,7 @@ def generate_deep_suggestions(text: str, max_paragraphs: int = 6):
     )
 
     # Optional: provide a concrete rewrite for a short sentence
-    sentences = re.split(r'[\n\.]\s*', text)
-    short_sent = None
-    for s in sentences:
-        s = s.strip()
-        if 8 < len(s.split()) < 25:
-            short_sent = s
-            break
+    short_sent = f.rewrite_candidates[0] if f.rewrite_candidates else None
     if short_sent:
         example = (
             "Example rewrite: Transform a generic responsibility into a quantified achievement.\n"